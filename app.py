@@ -14,7 +14,7 @@ st.markdown(
     Use the **page selector** in the **top-left sidebar** to access:
 
     - 📈 **NSE500 Charts** — 2-year daily close for all Nifty 500 stocks  
-    - 🔄 **Top Gainers / Losers** — Live 1-min charts based on uploaded CSVs  
+    - 🔄 **Top Gainers / Losers** — Live 1-min charts of the day's biggest movers across the Nifty 500 (uploaded CSVs as a fallback)  
     - 📅 **NSE500 Weekly-Charts** — Weekly close trends across Nifty 500  
     """
 )
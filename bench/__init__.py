@@ -0,0 +1 @@
+"""Offline benchmarks on synthetic data (run with ``python -m bench.<name>``)."""
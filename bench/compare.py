@@ -0,0 +1,57 @@
+"""Compare two ``bench.stages`` runs, e.g. before and after a commit.
+
+    python -m bench.compare old.json new.json [--threshold 1.2]
+
+Prints new/old time ratios per universe and stage and exits with status 1
+if any stage got slower than ``threshold`` (so it can gate CI).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+MIN_SECONDS = 0.005  # stages faster than this are too noisy to judge
+
+
+def compare(old: dict, new: dict, threshold: float) -> tuple[list[dict], list[dict]]:
+    rows, slower = [], []
+    for size, stages in new["universes"].items():
+        before = old.get("universes", {}).get(size, {})
+        for stage, seconds in stages.items():
+            if not stage.endswith("_s") or stage not in before:
+                continue
+            ratio = seconds / before[stage] if before[stage] else float("inf")
+            row = {"tickers": size, "stage": stage, "old_s": before[stage], "new_s": seconds,
+                   "ratio": round(ratio, 2)}
+            rows.append(row)
+            if ratio > threshold and max(seconds, before[stage]) >= MIN_SECONDS:
+                slower.append(row)
+    return rows, slower
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.2, help="new/old ratio that counts as a regression")
+    args = parser.parse_args(argv)
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    rows, slower = compare(old, new, args.threshold)
+    print(json.dumps({
+        "benchmark": "compare",
+        "old_commit": old.get("commit"),
+        "new_commit": new.get("commit"),
+        "threshold": args.threshold,
+        "stages": rows,
+        "regressions": slower,
+    }, indent=2))
+    sys.exit(1 if slower else 0)
+
+
+if __name__ == "__main__":
+    main()
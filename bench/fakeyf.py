@@ -0,0 +1,86 @@
+"""Local fake of the parts of yfinance the app uses.
+
+``yf.download`` answers from ``SyntheticSource`` in the same multi-ticker
+``group_by="ticker"`` layout as the real thing, and ``yf.Ticker(...).info``
+/ ``.isin`` return made-up metadata; both sleep for a configurable latency
+so network-bound code paths can be timed offline::
+
+    with fake_yfinance(latency=0.2, info_latency=0.05):
+        ...  # any code that imports and calls yfinance
+"""
+from __future__ import annotations
+
+import sys
+import time
+import types
+import zlib
+from contextlib import contextmanager
+
+import pandas as pd
+
+from core.fetch import SyntheticSource
+
+
+class FakeYFinance:
+    def __init__(self, latency: float = 0.0, per_ticker: float = 0.0, info_latency: float = 0.0,
+                 source: SyntheticSource | None = None):
+        self.latency = latency          # per download call
+        self.per_ticker = per_ticker    # added per requested ticker
+        self.info_latency = info_latency
+        self.source = source or SyntheticSource()
+        self.calls = {"download": 0, "info": 0}
+
+    def download(self, tickers, period: str | None = None, interval: str = "1d", start=None,
+                 group_by: str = "column", **kwargs) -> pd.DataFrame:
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        self.calls["download"] += 1
+        time.sleep(self.latency + self.per_ticker * len(tickers))
+        frames = self.source(tickers, period=period or "1mo", interval=interval, start=start)
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, axis=1)  # (ticker, field) columns, as group_by="ticker"
+        if group_by != "ticker":
+            df = df.swaplevel(axis=1).sort_index(axis=1, level=0)
+        return df
+
+    def ticker(self, symbol: str):
+        fake = self
+
+        class Ticker:
+            def __init__(self, symbol: str):
+                self.ticker = symbol
+
+            @property
+            def info(self) -> dict:
+                fake.calls["info"] += 1
+                time.sleep(fake.info_latency)
+                name = self.ticker.split(".")[0].title()
+                return {"longName": f"{name} Limited", "shortName": name, "industry": "Synthetic"}
+
+            @property
+            def isin(self) -> str:
+                return f"INE{zlib.crc32(self.ticker.encode()) % 10**9:09d}"
+
+        return Ticker(symbol)
+
+
+@contextmanager
+def fake_yfinance(**kwargs):
+    """Swap ``yfinance.download``/``yfinance.Ticker`` for a ``FakeYFinance``."""
+    fake = FakeYFinance(**kwargs)
+    try:
+        import yfinance as module
+        added = False
+    except ImportError:  # benchmarks do not need the real package
+        module = sys.modules["yfinance"] = types.ModuleType("yfinance")
+        added = True
+    saved = {name: getattr(module, name, None) for name in ("download", "Ticker")}
+    module.download, module.Ticker = fake.download, fake.ticker
+    try:
+        yield fake
+    finally:
+        if added:
+            del sys.modules["yfinance"]
+        else:
+            for name, value in saved.items():
+                setattr(module, name, value)
@@ -0,0 +1,55 @@
+"""Per-figure chart rendering vs. the small-multiples batch renderer.
+
+    python -m bench.render [--tickers 40] [--repeat 3]
+
+Prints one JSON document with the best-of-``repeat`` seconds per path.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from core.fetch import SyntheticSource
+from core.multiples import render_small_multiples
+from core.renderers import daily_chart
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--period", default="2y")
+    args = parser.parse_args()
+
+    symbols = [f"SYN{i:04d}.NS" for i in range(args.tickers)]
+    data = SyntheticSource()(symbols, period=args.period)
+    series = list(data.items())
+
+    per_figure_s = best_of(args.repeat, lambda: [daily_chart(s, df, s) for s, df in series])
+    multiples_s = best_of(args.repeat, lambda: render_small_multiples(series))
+    print(json.dumps({
+        "benchmark": "render",
+        "tickers": args.tickers,
+        "bars_per_ticker": len(series[0][1]) if series else 0,
+        "per_figure_s": round(per_figure_s, 4),
+        "small_multiples_s": round(multiples_s, 4),
+        "speedup": round(per_figure_s / multiples_s, 2) if multiples_s else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Stage-by-stage timings of the pages on synthetic universes.
+
+    python -m bench.stages [--tickers 500 5000] [--latency 0.2] [--out results.json]
+
+For each universe size a temporary store is filled through the real
+``OHLCVStore.refresh`` path with ``yfinance`` replaced by ``FakeYFinance``
+(so the scheduler, batching and Parquet writes are all exercised), then
+each stage is timed on its own:
+
+- ``download.*``: cold and incremental universe download (daily and 1m),
+  metadata back-fill through ``yf.Ticker``
+- ``resample.*`` / ``panel.build``: weekly/monthly bars, shared panel
+- ``correlation.*``: blocked correlation matrix, plus hierarchical clusters
+- ``indicators.*``: the whole indicator set, and one appended bar
+- ``angle.*``: ``calculate_angle`` per ticker vs. the batched and
+  streaming fits
+- ``replay.*``: one day of the trend replay, and re-bucketing its slopes
+- ``filter.*``: the original per-ticker sidebar loops vs. the screener
+- ``ranking.*``: live gainers/losers table from the 1m panel, and the four
+  top-k lists by partial sort vs. a full sort
+- ``downsample.*``: one page of 5y closes cut to a compact-view cell's width (min/max, LTTB)
+- ``render.*``: one page of charts as each page draws them
+
+Prints (or writes) one JSON document; compare two runs with
+``python -m bench.compare old.json new.json``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+import core.scheduler
+from bench.fakeyf import fake_yfinance
+from bench.render import best_of
+from core.correlation import Correlation
+from core.downsample import points_for, positions
+from core.fetch import IST, SyntheticSource
+from core.indicators import IndicatorSet
+from core.metadata import SymbolIndex, fetch_info
+from core.multiples import CELL_SIZE, render_small_multiples
+from core.panel import MarketPanel
+from core.ranking import Ranking
+from core.renderers import daily_chart, live_chart, session_chart
+from core.replay import bucket_report, closes_by_day, replay_day
+from core.resample import FREQS, build_panel, resample_panel, split_panel
+from core.scheduler import FetchScheduler
+from core.screener import Screener
+from core.store import DAILY_PERIOD, OHLCVStore
+from core.trend import TREND_BUCKETS, StreamingTrends, calculate_angle, compute_trends
+
+# A Friday mid-session, so the 1m bars cover a partial day
+TODAY = datetime(2026, 10, 16, 12, 0, tzinfo=IST)
+LATER = datetime(2026, 10, 16, 12, 15, tzinfo=IST)
+
+# Page 5's trend buckets as the original if/elif chain tested them
+LEGACY_BUCKETS = {
+    "Strong Uptrend (≈45°)": lambda a: 35 <= a <= 55,
+    "Moderate Uptrend (15-45°)": lambda a: 15 <= a < 35,
+    "Sideways (-15° to 15°)": lambda a: -15 < a < 15,
+    "Moderate Downtrend (-15° to -45°)": lambda a: -35 < a <= -15,
+    "Strong Downtrend (≈-45°)": lambda a: -55 <= a <= -35,
+    "Very Steep (>60°)": lambda a: a > 60,
+    "Very Steep (<-60°)": lambda a: a < -60,
+}
+
+
+def git_commit(cwd: str | None = None) -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=cwd).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def drain(store: OHLCVStore, tickers: list[str], interval: str, period: str) -> int:
+    return sum(len(frames) for _, frames in store.refresh(tickers, interval, period))
+
+
+# -------------------- Filters --------------------
+def legacy_price_filter(tickers: list[str], data: dict, letter: str, lo: float, hi: float) -> list[str]:
+    """Page 1/3's original loop over every ticker's frame."""
+    out = []
+    for symbol in tickers:
+        if letter != "All" and not symbol.upper().startswith(letter):
+            continue
+        df = data.get(symbol)
+        if df is None or df.empty:
+            continue
+        if lo <= float(df["Close"].iloc[-1]) <= hi:
+            out.append(symbol)
+    return out
+
+
+def legacy_trend_filter(data: dict, angles: dict, choice: str) -> list[str]:
+    """Page 5's original if/elif chain, sorted by absolute angle."""
+    test = LEGACY_BUCKETS[choice]
+    filtered = [(t, angles.get(t, 0.0)) for t in data if test(angles.get(t, 0.0))]
+    return [t for t, _ in sorted(filtered, key=lambda x: abs(x[1]), reverse=True)]
+
+
+# -------------------- Stages --------------------
+def run_universe(n: int, args) -> dict:
+    tickers = [f"SYN{i:04d}.NS" for i in range(n)]
+    source = SyntheticSource(today=TODAY)
+    out: dict[str, float | int] = {}
+    fake_kwargs = dict(latency=args.latency, per_ticker=args.per_ticker, info_latency=args.info_latency,
+                       source=source)
+
+    with tempfile.TemporaryDirectory(prefix="bench-store-") as root, fake_yfinance(**fake_kwargs) as fake:
+        store = OHLCVStore(root)
+
+        # Download: full history, then an incremental top-up of the last bar(s)
+        out["download.daily_s"], got = timed(lambda: drain(store, tickers, "1d", DAILY_PERIOD))
+        out["download.daily_tickers"] = got
+        out["download.daily_incremental_s"], _ = timed(lambda: drain(store, tickers, "1d", DAILY_PERIOD))
+        out["download.1m_s"], _ = timed(lambda: drain(store, tickers, "1m", "1d"))
+        source.today = LATER
+        out["download.1m_incremental_s"], _ = timed(lambda: drain(store, tickers, "1m", "1d"))
+        source.today = TODAY
+        metadata = SymbolIndex(os.path.join(root, "metadata.json"))
+        sample = tickers[:args.metadata]
+        out["download.metadata_s"], _ = timed(lambda: metadata.backfill(sample, fetch=fetch_info))
+        out["download.metadata_tickers"] = len(sample)
+        out["download.calls"] = fake.calls["download"]
+
+    daily_5y = source(tickers, period=DAILY_PERIOD)
+    daily = source(tickers, period="2y")
+    intraday = {t: df.tz_convert(IST).tz_localize(None) for t, df in source(tickers, interval="1m").items()}
+
+    # Resampling and shared panels
+    panel = build_panel(daily_5y)
+    for rule in FREQS:
+        out[f"resample.{rule}_s"] = best_of(args.repeat, lambda: resample_panel(panel, rule))
+    out["panel.build_s"] = best_of(args.repeat, lambda: MarketPanel.from_frames(daily))
+    shared = MarketPanel.from_frames(daily)
+    out["panel.mb"] = round(shared.nbytes / 2**20, 2)
+    live = MarketPanel.from_frames(intraday)
+    out["correlation.matrix_s"] = best_of(args.repeat, lambda: Correlation.from_panel(shared))
+    out["correlation.clusters_s"] = best_of(args.repeat, lambda: Correlation.from_panel(shared).clusters())
+    out["indicators.full_s"] = best_of(args.repeat, lambda: IndicatorSet.from_panel(shared))
+    indicators = IndicatorSet.from_panel(shared)
+    last = shared.array[:, :, -1:]
+    fields = shared.fields.index
+    out["indicators.append_s"] = best_of(args.repeat, lambda: indicators.extend(
+        last[:, fields("High")], last[:, fields("Low")], last[:, fields("Close")]))
+
+    # Trend angles
+    out["angle.reference_s"] = best_of(1, lambda: {t: calculate_angle(df) for t, df in intraday.items()})
+    out["angle.batch_s"] = best_of(args.repeat, lambda: compute_trends(live))
+
+    def stream():
+        streams = StreamingTrends()
+        for t, df in intraday.items():
+            streams.update(t, df)
+        return streams
+
+    out["angle.streaming_build_s"] = best_of(1, stream)
+    streams = stream()
+    later = {t: df.tz_convert(IST).tz_localize(None)
+             for t, df in SyntheticSource(today=LATER)(tickers, interval="1m").items()}
+    out["angle.streaming_update_s"] = best_of(1, lambda: [streams.update(t, later[t].iloc[-16:]) for t in later])
+
+    day_closes = next(iter(closes_by_day(intraday).values()))
+    out["replay.day_s"] = best_of(args.repeat, lambda: replay_day(day_closes))
+    slopes = replay_day(day_closes)
+    out["replay.buckets_s"] = best_of(args.repeat, lambda: bucket_report(slopes))
+
+    # Sidebar filters
+    trends = compute_trends(live)
+    angles = trends["angle"].to_dict()
+    out["filter.page1_legacy_s"] = best_of(args.repeat, lambda: legacy_price_filter(tickers, daily, "S", 100, 2000))
+    out["filter.page1_screener_build_s"] = best_of(args.repeat, lambda: Screener.from_frames(shared))
+    screener = Screener.from_frames(shared)
+
+    def page1_query():
+        mask = screener.between("close", 100, 2000) & screener.equals("letter", "S")
+        return screener.select(mask & screener.between("1M", 5))
+
+    out["filter.page1_screener_query_s"] = best_of(args.repeat, page1_query)
+    out["filter.page5_legacy_s"] = best_of(
+        args.repeat, lambda: [legacy_trend_filter(live, angles, c) for c in LEGACY_BUCKETS])
+    live_screener = Screener.from_frames(live, angles, windows={})
+    out["filter.page5_screener_s"] = best_of(args.repeat, lambda: [
+        live_screener.select(live_screener.between("angle", *b), by="angle", descending=True, key=np.abs)
+        for b in TREND_BUCKETS.values() if b is not None])
+
+    # Live gainers/losers: one ranking per refresh, then the page's four lists
+    out["ranking.build_s"] = best_of(args.repeat, lambda: Ranking.from_panels(live, shared))
+    ranked = Ranking.from_panels(live, shared)
+    out["ranking.topk_s"] = best_of(args.repeat, lambda: (
+        ranked.gainers(), ranked.losers(), ranked.top("volume"), ranked.top("turnover")))
+    out["ranking.sort_s"] = best_of(args.repeat, lambda: [
+        np.argsort(ranked.columns[c], kind="stable") for c in ("pct_change", "pct_change", "volume", "turnover")])
+
+    # One page of charts per page, rendered cold (no chart cache)
+    page = tickers[:args.charts]
+    for method in ("minmax", "lttb"):
+        out[f"downsample.{method}_s"] = best_of(args.repeat, lambda: [
+            positions(daily_5y[t].index.asi8.astype("float64"), daily_5y[t]["Close"].to_numpy(dtype="float64"),
+                      points_for(CELL_SIZE[0]), method) for t in page])
+    weekly = split_panel(resample_panel({f: frame[page] for f, frame in panel.items()}, "W"))
+    out["render.page1_s"] = best_of(args.repeat, lambda: [daily_chart(t, shared[t], t) for t in page])
+    out["render.page2_s"] = best_of(args.repeat, lambda: [session_chart(t, intraday[t]) for t in page])
+    out["render.page3_s"] = best_of(args.repeat, lambda: [daily_chart(t, weekly[t], t) for t in page])
+    out["render.page5_s"] = best_of(args.repeat, lambda: [
+        live_chart(t, live[t], angles[t], trends.loc[t]) for t in page])
+    out["render.multiples_s"] = best_of(args.repeat, lambda: render_small_multiples([(t, shared[t]) for t in page]))
+    return {k: round(v, 4) if isinstance(v, float) else v for k, v in out.items()}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, nargs="+", default=[500, 5000], help="universe sizes")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per fake yf.download call")
+    parser.add_argument("--per-ticker", type=float, default=0.0, help="extra seconds per requested ticker")
+    parser.add_argument("--info-latency", type=float, default=0.0, help="seconds per fake yf.Ticker().info")
+    parser.add_argument("--rate", type=float, default=1000.0,
+                        help="scheduler requests/second (the app default is FETCH_RATE=2)")
+    parser.add_argument("--metadata", type=int, default=100, help="tickers to back-fill metadata for")
+    parser.add_argument("--charts", type=int, default=20, help="charts per page render")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # Fresh scheduler with the requested rate limit (stats start at zero)
+    core.scheduler._scheduler = FetchScheduler(rate=args.rate, burst=max(core.scheduler.BURST, args.rate))
+
+    report = {
+        "benchmark": "stages",
+        "commit": git_commit(),
+        "created": datetime.now(IST).isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "universes": {},
+    }
+    for n in args.tickers:
+        report["universes"][str(n)] = run_universe(n, args)
+    report["fetch"] = core.scheduler._scheduler.stats.stats()
+
+    text = json.dumps(report, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
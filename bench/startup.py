@@ -0,0 +1,164 @@
+"""Cold and warm page-load times of every page.
+
+    python -m bench.startup [--tickers 500] [--out startup.json]
+    python -m bench.startup --root ../stocks-old --out old.json   # another checkout
+
+Each page runs headless through ``streamlit.testing`` in a fresh Python
+process, with ``yfinance`` replaced by ``FakeYFinance`` and a temporary
+data directory. Its store is warmed first as the prefetch worker would
+(daily bars, weekly/monthly panels, marked current), and one priming run
+per page adds what the page fetches itself (e.g. today's 1m bars):
+
+- ``<page>.import_s``: the page's top-level imports in a fresh interpreter
+- ``<page>.cold_s``: the first run in a new process (imports, store reads,
+  panels, chart renders), i.e. the first visit after a server start
+- ``<page>.warm_s``: a rerun in the same process, i.e. any widget change or
+  page switch afterwards
+
+``--root`` times the pages of another checkout (e.g. a ``git worktree`` of
+an older commit) with this benchmark; compare two reports with
+``python -m bench.compare old.json new.json``.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, time
+
+from bench.stages import git_commit
+from core.fetch import IST, SyntheticSource
+from core.prefetch import warm
+from core.store import STORE_DIR, OHLCVStore, get_cache_date
+from core.universe import normalize
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIRS = ("data/Charts-data", "data/TOP-Gain-loosers")
+
+# Run inside the child: time the page's first run and its reruns
+PAGE_CHILD = """
+import json, sys, time
+from datetime import datetime, time as clock
+root, page, runs = sys.argv[1], sys.argv[2], int(sys.argv[3])
+sys.path.insert(0, root)
+from streamlit.testing.v1 import AppTest
+from bench.fakeyf import fake_yfinance
+from core.fetch import IST, SyntheticSource
+source = SyntheticSource(today=datetime.combine(datetime.now(IST).date(), clock(15, 29), IST))
+times = []
+with fake_yfinance(source=source):
+    at = AppTest.from_file(page, default_timeout=900)
+    for _ in range(runs):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+print(json.dumps({"times": times, "exceptions": [e.message for e in at.exception]}))
+"""
+
+IMPORT_CHILD = """
+import json, sys, time
+root, code = sys.argv[1], sys.argv[2]
+sys.path.insert(0, root)
+start = time.perf_counter()
+exec(code)
+print(json.dumps({"times": [time.perf_counter() - start]}))
+"""
+
+
+def page_imports(path: str) -> str:
+    """The page's module-level import statements as source."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def child(code: str, args: list[str], cwd: str) -> dict:
+    # core and pages come from the measured checkout; bench falls back to this one
+    env = {**os.environ, "PYTHONPATH": REPO}
+    proc = subprocess.run([sys.executable, "-c", code, *args], cwd=cwd, env=env, capture_output=True, text=True)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode or not lines:
+        raise RuntimeError(f"benchmark child failed:\n{proc.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def bench_source() -> SyntheticSource:
+    """The bars every child sees: today's session up to 15:29 IST."""
+    return SyntheticSource(today=datetime.combine(datetime.now(IST).date(), time(15, 29), IST))
+
+
+def make_workdir(root: str, n: int) -> str:
+    """Temporary cwd with the first ``n`` tickers, the CSVs the pages read and a warm store."""
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    for rel in DATA_DIRS:
+        if os.path.isdir(os.path.join(root, rel)):
+            shutil.copytree(os.path.join(root, rel), os.path.join(workdir, rel))
+    path = os.path.join(workdir, "data/Charts-data/tickers_Nifty500.txt")
+    with open(path) as f:
+        tickers = [line for line in f if line.strip()][:n]
+    with open(path, "w") as f:
+        f.writelines(tickers)
+    # Otherwise the daily pages would be timed against an empty store
+    warm(OHLCVStore(os.path.join(workdir, STORE_DIR)), [normalize(t) for t in tickers], get_cache_date(),
+         source=bench_source())
+    return workdir
+
+
+def run_pages(root: str, n: int, pages: list[str], repeat: int) -> dict:
+    out: dict[str, float] = {}
+    workdir = make_workdir(root, n)
+    try:
+        for page in pages:
+            path = os.path.join(root, "pages", page)
+            name = page.split("_", 1)[0]
+            label = f"page{name}"
+            child(PAGE_CHILD, [root, path, "1"], workdir)  # fills the store, metadata and CSV history
+            imports = [child(IMPORT_CHILD, [root, page_imports(path)], workdir)["times"][0] for _ in range(repeat)]
+            runs = [child(PAGE_CHILD, [root, path, "2"], workdir) for _ in range(repeat)]
+            errors = [e for r in runs for e in r["exceptions"]]
+            if errors:
+                raise RuntimeError(f"{page} raised: {errors[0]}")
+            out[f"{label}.import_s"] = min(imports)
+            out[f"{label}.cold_s"] = min(r["times"][0] for r in runs)
+            out[f"{label}.warm_s"] = min(r["times"][1] for r in runs)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {k: round(v, 4) for k, v in out.items()}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=REPO, help="checkout whose pages are timed")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[500], help="universe sizes")
+    parser.add_argument("--pages", nargs="+", help="page files (default: all in pages/)")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per page; the best is kept")
+    parser.add_argument("--out", help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    root = os.path.abspath(args.root)
+    pages = args.pages or sorted(p for p in os.listdir(os.path.join(root, "pages"))
+                                 if p.endswith(".py") and not p.startswith("_"))
+    report = {
+        "benchmark": "startup",
+        "commit": git_commit(root),
+        "created": datetime.now(IST).isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "python": platform.python_version(),
+        "universes": {str(n): run_pages(root, n, pages, args.repeat) for n in args.tickers},
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
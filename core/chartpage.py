@@ -0,0 +1,165 @@
+"""Header, sidebar, download button and chart grid shared by the daily and weekly chart pages.
+
+Both pages draw one close-price chart per ticker from a shared panel and
+filter it with the same sidebar: first letter, latest close, a return
+window, an indicator screen and indicator overlays. ``chart_universe``
+loads the tickers and their names, ``filter_sidebar`` draws the widgets
+and returns the choices; ``ChartFilters.mask`` applies them to the panel's
+screener and ``chart_grid`` pages through the matches.
+"""
+from __future__ import annotations
+
+import numpy as np
+import streamlit as st
+
+from core.charts import chart_cache, fingerprint
+from core.grid import paginated_grid
+from core.indicators import OVERLAYS, SCREENS, universe_indicators
+from core.metadata import SymbolIndex, symbol_index
+from core.panel import MarketPanel, panels
+from core.renderers import daily_chart
+from core.scheduler import fetch_scheduler
+from core.screener import RETURN_WINDOWS, Screener
+from core.store import DAILY_PERIOD, OHLCVStore, get_cache_date
+from core.universe import TICKERS_FILE, universe
+
+PRICE_RANGE = (0, 10000)
+
+
+class ChartFilters:
+    """The sidebar's choices for one rerun."""
+
+    def __init__(self, letter: str, price_range: tuple[float, float], return_window: str,
+                 min_return: float | None, indicator_screen: str, overlays: list[str],
+                 compact: bool, full: bool):
+        self.letter = letter
+        self.price_range = price_range
+        self.return_window = return_window
+        self.min_return = min_return
+        self.indicator_screen = indicator_screen
+        self.overlays = overlays
+        self.compact = compact
+        self.full = full
+
+    def mask(self, screener: Screener) -> np.ndarray:
+        mask = screener.between("close", *self.price_range)
+        if self.letter != "All":
+            mask &= screener.equals("letter", self.letter)
+        if self.return_window != "Off":
+            mask &= screener.between(self.return_window, self.min_return)
+        if SCREENS[self.indicator_screen] is not None:
+            mask &= screener.between(*SCREENS[self.indicator_screen])
+        return mask
+
+
+def chart_universe() -> tuple[list[str], SymbolIndex, str]:
+    """The universe, its company names and the cache date, with the page's header lines."""
+    # Rolls over at 3:45 PM IST; `python -m core.prefetch` warms the store for it
+    cache_date = get_cache_date()
+
+    # Parsed once per process, not on every rerun
+    tickers = universe()
+    if not tickers:
+        st.error(f"Ticker file not found: {TICKERS_FILE}")
+
+    # Company names come from the persisted symbol index; missing ones are
+    # back-filled in the background instead of one .info call per chart
+    symbols = symbol_index()
+    symbols.start_backfill(tickers)
+
+    st.markdown(f"**🧾 Total Tickers:** {len(tickers)}")
+    st.markdown(f"**📅 Last Refreshed:** {cache_date} *(updates daily post 3:45 PM IST)*")
+    return tickers, symbols, cache_date
+
+
+def filter_sidebar(tickers: list[str]) -> ChartFilters:
+    st.sidebar.header("🔍 Filter Stocks")
+
+    # Alphabetical filter
+    alphabet_options = sorted(set([symbol[0].upper() for symbol in tickers if symbol]))
+    letter = st.sidebar.selectbox("Start with Letter", options=["All"] + list(alphabet_options), index=0)
+
+    # Price range filter
+    price_range = st.sidebar.slider("Latest Close Price Range", min_value=PRICE_RANGE[0], max_value=PRICE_RANGE[1],
+                                    value=PRICE_RANGE, step=10)
+
+    # Return filter, e.g. "1M return above 10%"
+    return_window = st.sidebar.selectbox("Return Filter", options=["Off"] + list(RETURN_WINDOWS), index=0)
+    min_return = None
+    if return_window != "Off":
+        min_return = st.sidebar.number_input(f"Minimum {return_window} Return (%)", value=10.0, step=1.0)
+
+    # Many tickers drawn on one canvas instead of one figure each
+    compact = st.sidebar.toggle("🧩 Compact view (small multiples)")
+    full = st.sidebar.toggle("🔍 Full resolution", disabled=not compact,
+                             help="Plot every bar in the compact view instead of about one point per pixel")
+
+    # Indicator screen (e.g. RSI oversold) and lines drawn over the close
+    indicator_screen = st.sidebar.selectbox("Indicator Filter", options=list(SCREENS), index=0)
+    overlays = st.sidebar.multiselect("Chart Overlays", options=list(OVERLAYS))
+    return ChartFilters(letter, price_range, return_window, min_return, indicator_screen, overlays, compact, full)
+
+
+def panel_screener(data: MarketPanel) -> Screener:
+    # Snapshot is built once per panel and shared, not rebuilt on every filter change
+    return data.derived("screener", lambda panel: Screener.from_frames(panel, indicators=True))
+
+
+def download_daily(store: OHLCVStore, tickers: list[str], cache_date: str) -> bool:
+    """Fetch the daily bars after each ticker's last stored one, with a progress bar.
+
+    The store is marked refreshed for ``cache_date`` only if every download
+    succeeded; otherwise it stays stale so the next click retries.
+    """
+    progress = st.progress(0)
+    done = 0
+    failed = []
+    for batch, _ in store.refresh(tickers, "1d", DAILY_PERIOD, failed=failed):
+        done += len(batch)
+        progress.progress(done / len(tickers))
+    if failed:
+        st.warning(f"⚠️ {len(failed)} of {len(tickers)} tickers failed to download: {', '.join(failed[:10])}")
+        return False
+    store.mark_refreshed("1d", cache_date)
+    return True
+
+
+def chart_grid(data: MarketPanel, tickers: list[str], filters: ChartFilters, symbols: SymbolIndex,
+               style: str) -> None:
+    """Paginated grid of ``tickers`` from ``data``; ``style`` tells the pages' charts apart in the cache."""
+    def chart_spec(symbol: str):
+        df = data.get(symbol)
+        if df is None or df.empty:
+            return None
+        name = symbols.name(symbol)
+        # Indicators come from the same shared panel, computed once for all tickers
+        overlays = universe_indicators(data).overlays(symbol, filters.overlays)
+        return (symbol, fingerprint(df), style, name, tuple(filters.overlays)), \
+            lambda: daily_chart(symbol, df, name, overlays)
+
+    def chart_series(symbol: str):
+        df = data.get(symbol)
+        return None if df is None or df.empty else (symbol, df)
+
+    if not tickers:
+        st.warning("No stocks found for the selected filters.")
+        return
+    screener = panel_screener(data)
+    paginated_grid(
+        tickers, chart_spec, key="charts_grid",
+        sort_options={
+            "Symbol": None,
+            "Latest close": screener.column("close").get,
+            "Change over period": screener.column("change").get,
+            "RSI": screener.column("rsi").get,
+        },
+        series=chart_series, compact=filters.compact, full=filters.full,
+    )
+
+
+def status_sidebar(symbols: SymbolIndex) -> None:
+    st.sidebar.caption(chart_cache().summary())
+    st.sidebar.caption(fetch_scheduler().summary())
+    st.sidebar.caption(panels().summary())
+    if symbols.backfilling:
+        st.sidebar.caption("🏷️ Fetching company names in the background...")
@@ -0,0 +1,125 @@
+"""Chart rendering helpers shared by the pages.
+
+Rendered charts are kept as PNG bytes in one process-wide LRU cache keyed by
+``(ticker, series fingerprint, chart style)``, so a rerun that only moved a
+sidebar widget, or another user's session showing the same series, does not
+redraw anything.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+from core.instrument import metrics
+from core.singleton import lazy_singleton
+
+# Same defaults st.pyplot uses, so cached images look identical
+SAVEFIG_KWARGS = dict(format="png", dpi=200, bbox_inches="tight")
+CHART_CACHE_MB = float(os.environ.get("CHART_CACHE_MB", 256))
+
+
+def figure_png(fig, **kwargs) -> bytes:
+    """Render a Matplotlib figure to PNG bytes (the figure is not closed)."""
+    buf = io.BytesIO()
+    fig.savefig(buf, **{**SAVEFIG_KWARGS, **kwargs})
+    return buf.getvalue()
+
+
+def fingerprint(df: pd.DataFrame, columns: tuple[str, ...] = ("Close",)) -> str:
+    """Content hash of a series' timestamps and values."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(df.index.asi8).tobytes())
+    h.update(np.ascontiguousarray(df[list(columns)].to_numpy(dtype="float64")).tobytes())
+    return h.hexdigest()
+
+
+def chart_style(key: Hashable) -> str:
+    """Metrics label for a cache key: the page's chart style, e.g. ``"daily"`` or ``"live"``."""
+    if not isinstance(key, tuple) or not key:
+        return "chart"
+    return key[2] if len(key) > 2 and isinstance(key[2], str) else str(key[0])
+
+
+class ChartCache:
+    """Thread-safe LRU of rendered images bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable) -> bytes | None:
+        with self._lock:
+            png = self._items.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key: Hashable, png: bytes) -> None:
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._items[key] = png
+            self.nbytes += len(png)
+            while self.nbytes > self.max_bytes and len(self._items) > 1:
+                _, dropped = self._items.popitem(last=False)
+                self.nbytes -= len(dropped)
+                self.evictions += 1
+
+    def render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        with metrics().timer("render_seconds", chart=chart_style(key)):
+            return render()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        png = self.get(key)
+        if png is None:
+            png = self.render(key, render)
+            self.put(key, png)
+        return png
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "items": len(self._items),
+            "mb": self.nbytes / 2**20,
+            "budget_mb": self.max_bytes / 2**20,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"🖼️ Chart cache: {s['items']} charts, {s['mb']:.1f}/{s['budget_mb']:.0f} MB | "
+                f"{s['hits']} hits, {s['misses']} misses ({s['hit_ratio']:.0%})")
+
+
+@lazy_singleton
+def chart_cache() -> ChartCache:
+    """Rendered chart PNGs of every page, up to ``CHART_CACHE_MB``."""
+    cache = ChartCache(int(CHART_CACHE_MB * 2**20))
+    metrics().collect("chart_cache", cache.stats)
+    return cache
@@ -0,0 +1,201 @@
+"""Cross-sectional correlation of daily returns and clusters of co-moving names.
+
+``blocked_correlation`` standardizes every ticker's returns once and then
+fills the tickers x tickers matrix block by block with plain matrix
+products, so memory stays at the float32 result plus one block of
+temporaries. Products are averaged over the days both tickers traded, so
+recent listings stay usable; for pairs with the same history this is
+exactly Pearson's correlation.
+
+``correlation(panel)`` shares the result per panel and persists it under
+``data/store/correlation/`` keyed on the panel's last date, so it is
+computed once per trading day. Clusters come from average-linkage
+hierarchical clustering on the distance ``1 - rho``.
+"""
+from __future__ import annotations
+
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from core.instrument import metrics
+from core.panel import MarketPanel
+
+CACHE_DIR = "data/store/correlation"
+LOOKBACK = 250      # trading days of returns (about one year)
+MIN_PERIODS = 60    # fewer common days than this and the pair is NaN
+BLOCK = 256         # tickers per block
+N_CLUSTERS = 20
+KEEP_FILES = 10     # cached matrices kept on disk
+
+
+def daily_returns(close: np.ndarray, lookback: int = LOOKBACK) -> np.ndarray:
+    """(tickers, lookback) % returns from (tickers, bars) closes; NaN before a listing."""
+    close = close[:, -(lookback + 1):].astype("float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (close[:, 1:] / close[:, :-1] - 1) * 100
+
+
+def blocked_correlation(returns: np.ndarray, block: int = BLOCK, min_periods: int = MIN_PERIODS) -> np.ndarray:
+    """Correlation of the rows of ``returns``, averaged over the days both rows have."""
+    valid = ~np.isnan(returns)
+    n = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(returns, axis=1) / n
+        z = np.where(valid, returns - mean[:, None], 0.0)
+        z /= np.sqrt((z * z).sum(axis=1) / n)[:, None]
+    z = np.nan_to_num(z)
+    mask = valid.astype("float64")
+    size = len(returns)
+    out = np.empty((size, size), dtype="float32")
+    for i in range(0, size, block):
+        zi, mi = z[i:i + block], mask[i:i + block]
+        for j in range(i, size, block):
+            overlap = mi @ mask[j:j + block].T
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rho = (zi @ z[j:j + block].T) / overlap
+            rho = np.where(overlap >= min_periods, np.clip(rho, -1, 1), np.nan)
+            out[i:i + block, j:j + block] = rho
+            out[j:j + block, i:i + block] = rho.T
+    np.fill_diagonal(out, np.where(n >= min_periods, 1.0, np.nan))
+    return out
+
+
+class Correlation:
+    def __init__(self, tickers: list[str], matrix: np.ndarray, date: str, lookback: int = LOOKBACK):
+        self.tickers = list(tickers)
+        self.matrix = matrix
+        self.date = date
+        self.lookback = lookback
+        self._linkage: np.ndarray | None = None
+
+    @classmethod
+    def from_panel(cls, panel: MarketPanel, lookback: int = LOOKBACK) -> "Correlation":
+        with metrics().timer("compute_seconds", stage="correlation"):
+            returns = daily_returns(panel.array[:, panel.fields.index("Close"), :], lookback)
+            matrix = blocked_correlation(returns)
+        # Tickers without enough history would only add NaN rows
+        keep = ~np.isnan(np.diag(matrix))
+        tickers = [t for t, k in zip(panel.tickers, keep) if k]
+        return cls(tickers, matrix[np.ix_(keep, keep)], panel.index[-1].date().isoformat(), lookback)
+
+    @property
+    def universe(self) -> int:
+        """CRC of the correlated tickers, for cache keys of anything drawn from the matrix."""
+        return universe_crc(self.tickers)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.matrix, index=self.tickers, columns=self.tickers)
+
+    # -------------------- Persistence --------------------
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, tickers=np.array(self.tickers), matrix=self.matrix)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, date: str, lookback: int) -> "Correlation":
+        with np.load(path) as f:
+            return cls(f["tickers"].tolist(), f["matrix"], date, lookback)
+
+    # -------------------- Clusters --------------------
+    def linkage(self) -> np.ndarray:
+        # scipy is imported on first use so pages that never cluster skip it
+        from scipy.cluster.hierarchy import linkage
+        from scipy.spatial.distance import squareform
+
+        if self._linkage is None:
+            with metrics().timer("compute_seconds", stage="clustering"):
+                # Pairs without enough overlap count as unrelated
+                distance = 1 - np.nan_to_num(self.matrix.astype("float64"), nan=0.0)
+                np.fill_diagonal(distance, 0.0)
+                self._linkage = linkage(squareform(np.clip(distance, 0, 2), checks=False), method="average")
+        return self._linkage
+
+    def clusters(self, n: int = N_CLUSTERS) -> pd.Series:
+        """Cluster number (1 = largest) per ticker."""
+        from scipy.cluster.hierarchy import fcluster
+
+        if len(self.tickers) < 2:
+            return pd.Series(1, index=self.tickers, name="cluster")
+        labels = fcluster(self.linkage(), t=min(n, len(self.tickers)), criterion="maxclust")
+        # Renumber by size so cluster 1 is the biggest group
+        sizes = pd.Series(labels).value_counts()
+        rank = {label: i for i, label in enumerate(sizes.index, start=1)}
+        return pd.Series([rank[label] for label in labels], index=self.tickers, name="cluster")
+
+    def order(self) -> list[str]:
+        """Tickers in dendrogram order, which puts clusters next to each other."""
+        from scipy.cluster.hierarchy import leaves_list
+
+        if len(self.tickers) < 2:
+            return list(self.tickers)
+        return [self.tickers[i] for i in leaves_list(self.linkage())]
+
+    def cluster_table(self, n: int = N_CLUSTERS) -> pd.DataFrame:
+        """Size, mean within-cluster correlation and members of each cluster."""
+        clusters = self.clusters(n)
+        rows = []
+        for cluster, members in clusters.groupby(clusters, sort=True):
+            idx = [self.tickers.index(t) for t in members.index]
+            block = self.matrix[np.ix_(idx, idx)]
+            off_diagonal = block[~np.eye(len(idx), dtype=bool)]
+            rows.append({
+                "cluster": cluster,
+                "size": len(idx),
+                "mean_rho": float(np.nanmean(off_diagonal)) if off_diagonal.size else np.nan,
+                "members": ", ".join(t.removesuffix(".NS") for t in members.index),
+            })
+        return pd.DataFrame(rows).set_index("cluster")
+
+
+def one_per_cluster(tickers: list[str], clusters: pd.Series) -> list[str]:
+    """Keep the first ticker of each cluster (``tickers`` is ranked best first).
+
+    Tickers without a cluster (no daily history) are kept.
+    """
+    seen, out = set(), []
+    for ticker in tickers:
+        cluster = clusters.get(ticker)
+        if cluster is not None:
+            if cluster in seen:
+                continue
+            seen.add(cluster)
+        out.append(ticker)
+    return out
+
+
+def universe_crc(tickers: list[str]) -> int:
+    return zlib.crc32("\n".join(tickers).encode())
+
+
+def _cache_path(panel: MarketPanel, lookback: int, root: str) -> str:
+    universe = universe_crc(panel.tickers)
+    return os.path.join(root, f"{panel.index[-1]:%Y-%m-%d}-{lookback}-{universe:08x}.npz")
+
+
+def _prune(root: str, keep: int = KEEP_FILES) -> None:
+    files = sorted((e for e in os.scandir(root) if e.name.endswith(".npz")), key=lambda e: e.stat().st_mtime)
+    for entry in files[:-keep]:
+        os.remove(entry.path)
+
+
+def correlation(panel: MarketPanel, lookback: int = LOOKBACK, root: str = CACHE_DIR) -> Correlation | None:
+    """Correlation of ``panel``'s daily returns; computed once per data date."""
+    if len(panel) == 0:
+        return None
+
+    def build(panel: MarketPanel) -> Correlation:
+        path = _cache_path(panel, lookback, root)
+        date = panel.index[-1].date().isoformat()
+        if os.path.exists(path):
+            return Correlation.load(path, date, lookback)
+        result = Correlation.from_panel(panel, lookback)
+        result.save(path)
+        _prune(root)
+        return result
+
+    return panel.derived(("correlation", lookback), build)
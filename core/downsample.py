@@ -0,0 +1,151 @@
+"""Shape-preserving downsampling of price series before they are plotted.
+
+A small-multiples cell a few hundred pixels wide cannot show 500 daily
+closes or a full day of minutes, yet every point still costs path building
+and rasterizing. ``thin`` keeps about one point per pixel column:
+
+- ``minmax``: the first and last point plus each bucket's low and high, in
+  time order, found with one padded array pass. Every extreme survives, so
+  the drawn line is indistinguishable from the full one at that width.
+- ``lttb``: Largest-Triangle-Three-Buckets, one point per bucket chosen to
+  keep the line's visual shape; the series' overall low and high are added
+  back so the extremes survive here too.
+
+Both return row positions, so overlays aligned with the bars (indicators,
+trend lines) are thinned with the same positions. Positions are cached per
+series fingerprint, width and method; pass ``full=True`` to plot every bar.
+The full-size grid charts are not thinned: at ``points_for(6)`` (600) they
+already have fewer bars (about 520 daily, 375 per session) than columns.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from core.charts import fingerprint
+from core.instrument import metrics
+from core.singleton import lazy_singleton
+
+METHOD = os.environ.get("STOCKS_DOWNSAMPLE", "minmax")
+POINTS_PER_INCH = 100  # roughly the on-screen pixels per figure inch in the grids
+CACHE_ENTRIES = 4096
+
+
+def points_for(width_inches: float) -> int:
+    """Target points for a figure (or axes) ``width_inches`` wide."""
+    return int(width_inches * POINTS_PER_INCH)
+
+
+# -------------------- Algorithms --------------------
+def _buckets(size: int, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Positions (``n``, width) of ``n`` equal buckets over rows 1..size-2, and their validity."""
+    edges = np.linspace(1, size - 1, n + 1).astype("int64")
+    width = int(np.diff(edges).max())
+    idx = edges[:-1, None] + np.arange(width)
+    return np.minimum(idx, size - 2), idx < edges[1:, None]
+
+
+def minmax(y: np.ndarray, points: int) -> np.ndarray:
+    """Positions of the first/last value and each bucket's min and max."""
+    size = len(y)
+    n = min(points // 2, size - 2)
+    if size <= points or n < 1:
+        return np.arange(size)
+    idx, valid = _buckets(size, n)
+    values = y[idx]
+    lo = np.where(valid, values, np.inf).argmin(axis=1)
+    hi = np.where(valid, values, -np.inf).argmax(axis=1)
+    rows = np.arange(n)
+    return np.unique(np.concatenate([[0, size - 1], idx[rows, lo], idx[rows, hi]]))
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets positions, plus the overall min and max."""
+    size = len(y)
+    n = min(points - 2, size - 2)
+    if size <= points or n < 1:
+        return np.arange(size)
+    idx, valid = _buckets(size, n)
+    # Each bucket is compared against the mean of the next one (the last point after the final bucket)
+    counts = valid.sum(axis=1)
+    mean_x = np.append((np.where(valid, x[idx], 0.0).sum(axis=1) / counts)[1:], x[-1])
+    mean_y = np.append((np.where(valid, y[idx], 0.0).sum(axis=1) / counts)[1:], y[-1])
+    out = np.empty(n + 2, dtype="int64")
+    out[0], out[-1] = 0, size - 1
+    anchor = 0
+    for i in range(n):
+        cand = idx[i, :counts[i]]
+        area = np.abs((x[anchor] - mean_x[i]) * (y[cand] - y[anchor])
+                      - (x[anchor] - x[cand]) * (mean_y[i] - y[anchor]))
+        anchor = out[i + 1] = cand[area.argmax()]
+    return np.unique(np.concatenate([out, [y.argmin(), y.argmax()]]))
+
+
+def positions(x: np.ndarray, y: np.ndarray, points: int, method: str = METHOD) -> np.ndarray:
+    """Row positions to plot; NaN rows are skipped (they draw nothing anyway)."""
+    keep = np.flatnonzero(~np.isnan(y))
+    if method == "lttb":
+        picked = lttb(x[keep], y[keep], points)
+    elif method == "minmax":
+        picked = minmax(y[keep], points)
+    else:
+        raise ValueError(f"unknown downsampling method {method!r}")
+    return keep[picked]
+
+
+# -------------------- Cached --------------------
+class PositionCache:
+    """LRU of thinned row positions by (series fingerprint, points, method)."""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._items: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, df: pd.DataFrame, points: int, method: str = METHOD, column: str = "Close",
+            key: str | None = None) -> np.ndarray:
+        cache_key = (key or fingerprint(df, (column,)), points, method)
+        with self._lock:
+            pos = self._items.get(cache_key)
+            if pos is not None:
+                self._items.move_to_end(cache_key)
+                self.hits += 1
+                return pos
+            self.misses += 1
+        with metrics().timer("compute_seconds", stage="downsample"):
+            pos = positions(df.index.asi8.astype("float64"), df[column].to_numpy(dtype="float64"), points, method)
+        with self._lock:
+            self._items[cache_key] = pos
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return pos
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"items": len(self._items), "hits": self.hits, "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+
+@lazy_singleton
+def position_cache() -> PositionCache:
+    """Thinned row positions of the compact-view cells."""
+    cache = PositionCache()
+    metrics().collect("downsample_cache", cache.stats)
+    return cache
+
+
+def thin(df: pd.DataFrame, points: int, full: bool = False, method: str = METHOD,
+         key: str | None = None) -> tuple[pd.DataFrame, np.ndarray | slice]:
+    """``df`` cut to about ``points`` rows, and the positions to cut aligned overlays with.
+
+    ``key`` is the series' fingerprint when the caller already has it.
+    """
+    if full or len(df) <= points:
+        return df, slice(None)
+    pos = position_cache().get(df, points, method, key=key)
+    return df.iloc[pos], pos
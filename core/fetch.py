@@ -0,0 +1,155 @@
+"""OHLCV data sources.
+
+A *source* is any callable ``source(tickers, period=..., interval=..., start=...)``
+returning ``{ticker: DataFrame}`` with flat ``Open/High/Low/Close/Volume``
+columns. ``YFinanceSource`` is the live one; ``SyntheticSource`` is a local
+stand-in for testing and benchmarking without network access. Batching,
+rate limiting and retries live in ``core.scheduler``.
+"""
+from __future__ import annotations
+
+import random
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+BATCH_SIZE = 50
+
+Source = Callable[..., dict[str, pd.DataFrame]]
+
+
+def chunked(items: list[str], size: int) -> list[list[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def split_frame(df: pd.DataFrame, tickers: list[str]) -> dict[str, pd.DataFrame]:
+    """Split a multi-ticker ``yf.download`` frame into one frame per ticker."""
+    if df is None or df.empty:
+        return {}
+    out = {}
+    if not isinstance(df.columns, pd.MultiIndex):
+        # Single ticker with flat columns
+        frame = df.dropna(how="all")
+        if len(tickers) == 1 and not frame.empty:
+            out[tickers[0]] = frame
+        return out
+    level = 0 if set(tickers) & set(df.columns.get_level_values(0)) else 1
+    for ticker in tickers:
+        if ticker not in df.columns.get_level_values(level):
+            continue
+        frame = df.xs(ticker, axis=1, level=level).dropna(how="all")
+        if not frame.empty:
+            out[ticker] = frame[[c for c in FIELDS if c in frame.columns]]
+    return out
+
+
+class YFinanceSource:
+    """Multi-ticker ``yf.download`` calls, one round trip per batch."""
+
+    def __call__(self, tickers: list[str], period: str | None = "2y", interval: str = "1d",
+                 start=None, **kwargs) -> dict[str, pd.DataFrame]:
+        import yfinance as yf
+
+        params = dict(interval=interval, group_by="ticker", auto_adjust=True,
+                      progress=False, threads=False, **kwargs)
+        if start is not None:
+            params["start"] = start
+        else:
+            params["period"] = period
+        df = yf.download(list(tickers), **params)
+        return split_frame(df, list(tickers))
+
+
+# -------------------- Local Stand-in --------------------
+PERIODS = {
+    "1d": pd.DateOffset(days=1), "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1), "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6), "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2), "5y": pd.DateOffset(years=5),
+}
+
+
+SYNTHETIC_START = "2018-01-01"
+
+
+class SyntheticSource:
+    """Deterministic random-walk OHLCV bars, optionally with simulated faults.
+
+    Each ticker's path depends only on its symbol and ``seed``, so repeated or
+    overlapping requests return consistent bars. ``latency`` (seconds, give
+    ``jitter`` to spread it), ``error_rate`` (whole request raises) and
+    ``drop_rate`` (a symbol is silently missing, as when ``yf.download`` is
+    throttled) mimic a flaky network.
+    """
+
+    def __init__(self, latency: float = 0.0, seed: int = 0, today: datetime | None = None,
+                 jitter: float = 0.0, error_rate: float = 0.0, drop_rate: float = 0.0):
+        self.latency = latency
+        self.seed = seed
+        self.today = today
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self._faults = random.Random(seed)
+
+    def _index(self, interval: str) -> pd.DatetimeIndex:
+        now = self.today or datetime.now(IST)
+        if interval == "1m":
+            day = pd.Timestamp(now.date())
+            idx = pd.date_range(day + pd.Timedelta("9h15min"), day + pd.Timedelta("15h29min"), freq="min")
+            idx = idx[idx <= pd.Timestamp(now.replace(tzinfo=None))]
+            return idx.tz_localize(IST)
+        # Fixed start so a ticker's path does not shift as ``today`` moves
+        idx = pd.date_range(SYNTHETIC_START, pd.Timestamp(now.date()), freq="D")
+        idx = idx[idx.weekday < 5]
+        if interval == "1wk":
+            idx = idx[idx.weekday == 0]
+        return idx
+
+    def frame(self, ticker: str, interval: str = "1d", idx: pd.DatetimeIndex | None = None) -> pd.DataFrame:
+        idx = self._index(interval) if idx is None else idx
+        # One stream per field so a longer window only extends each series
+        seed = zlib.crc32(ticker.encode()) ^ self.seed
+        rng, rng_spread, rng_volume = (np.random.default_rng([seed, k]) for k in range(3))
+        scale = 0.0008 if interval == "1m" else 0.02
+        base = float(rng.uniform(20, 5000))
+        close = base * np.exp(np.cumsum(rng.normal(0, scale, len(idx))))
+        open_ = np.concatenate([[base], close[:-1]])
+        spread = np.abs(rng_spread.normal(0, scale / 2, len(idx))) * close
+        return pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": rng_volume.integers(1_000, 1_000_000, len(idx)).astype(float),
+        }, index=idx)
+
+    def __call__(self, tickers: list[str], period: str | None = "2y", interval: str = "1d",
+                 start=None, **kwargs) -> dict[str, pd.DataFrame]:
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + self._faults.uniform(-self.jitter, self.jitter)))
+        if self._faults.random() < self.error_rate:
+            raise ConnectionError(f"synthetic failure for {len(tickers)} tickers")
+        out = {}
+        idx = self._index(interval)
+        for ticker in tickers:
+            if self.drop_rate and self._faults.random() < self.drop_rate:
+                continue
+            df = self.frame(ticker, interval, idx)
+            if start is not None:
+                start_ts = pd.Timestamp(start)
+                if df.index.tz is not None and start_ts.tz is None:
+                    start_ts = start_ts.tz_localize(df.index.tz)
+                df = df[df.index >= start_ts]
+            elif period in PERIODS and len(df):
+                df = df[df.index > df.index[-1] - PERIODS[period]]
+            if not df.empty:
+                out[ticker] = df
+        return out
@@ -0,0 +1,111 @@
+"""Paginated chart grid that only renders the visible page.
+
+Pages pass the full (filtered) list of items and a ``chart(item)`` callback
+returning ``(cache_key, render)`` or ``None`` when there is nothing to draw.
+Charts come from the shared ``chart_cache()``; after the visible page is
+drawn, the next page is rendered into the cache on a background thread so
+paging forward is instant. ``render`` therefore has to be thread-safe: build
+a ``matplotlib.figure.Figure`` directly instead of going through pyplot.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable
+
+import streamlit as st
+
+from core.charts import ChartCache, chart_cache
+from core.multiples import multiples_spec
+
+PAGE_SIZES = [10, 20, 50, 100]
+
+ChartSpec = tuple[Hashable, Callable[[], bytes]]
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chart-prefetch")
+_pending: set[Hashable] = set()
+_pending_lock = threading.Lock()
+
+
+def _render_into(cache: ChartCache, key: Hashable, render: Callable[[], bytes]) -> None:
+    try:
+        if key not in cache:
+            cache.put(key, cache.render(key, render))
+    except Exception:
+        pass  # The page will retry (and report) when it is actually shown
+    finally:
+        with _pending_lock:
+            _pending.discard(key)
+
+
+def prefetch(specs: list[ChartSpec | None]) -> None:
+    """Render charts into the cache in the background, skipping known ones."""
+    cache = chart_cache()
+    for spec in specs:
+        if spec is None:
+            continue
+        key, render = spec
+        with _pending_lock:
+            if key in _pending or key in cache:
+                continue
+            _pending.add(key)
+        _executor.submit(_render_into, cache, key, render)
+
+
+def paginated_grid(items: list[str], chart: Callable[[str], ChartSpec | None], key: str,
+                   sort_options: dict[str, Callable[[str], object] | None] | None = None,
+                   columns: int = 2, page_size: int = 20, series: Callable[[str], tuple | None] | None = None,
+                   compact: bool = False, compact_columns: int = 4, full: bool = False) -> list[str]:
+    """Draw one page of ``items`` as a grid of cached chart images.
+
+    ``sort_options`` maps a label to a sort key (``None`` keeps the given
+    order). With ``compact`` and a ``series(item) -> (label, bars[, color])``
+    callback the page is drawn as one small-multiples image instead, at full
+    resolution only with ``full``. Returns the items shown on the current page.
+    """
+    controls = st.columns([2, 1, 1, 1])
+    if sort_options:
+        sort_by = controls[0].selectbox("Sort by", list(sort_options), key=f"{key}_sort")
+        descending = controls[1].toggle("Descending", key=f"{key}_desc")
+        sort_key = sort_options[sort_by]
+        if sort_key is not None:
+            items = sorted(items, key=sort_key, reverse=descending)
+        elif descending:
+            items = items[::-1]
+    size = controls[2].selectbox("Per page", PAGE_SIZES, index=PAGE_SIZES.index(page_size), key=f"{key}_size")
+
+    n_pages = max(1, math.ceil(len(items) / size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = 1
+    page = controls[3].number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    start = (page - 1) * size
+    visible = items[start:start + size]
+    st.caption(f"Showing {start + 1}–{start + len(visible)} of {len(items)}")
+
+    cache = chart_cache()
+    if compact and series is not None:
+        spec = multiples_spec(visible, series, compact_columns, full)
+        if spec is None:
+            st.warning("No data for the charts on this page.")
+        else:
+            st.image(cache.get_or_render(*spec), width="stretch")
+        prefetch([multiples_spec(items[start + size:start + 2 * size], series, compact_columns, full)])
+        return visible
+
+    for row in range(0, len(visible), columns):
+        cols = st.columns(columns)
+        for col, item in zip(cols, visible[row:row + columns]):
+            spec = chart(item)
+            if spec is None:
+                col.warning(f"No data for {item}.")
+                continue
+            try:
+                col.image(cache.get_or_render(*spec), width="stretch")
+            except Exception:
+                col.warning(f"Couldn't display chart for {item}")
+
+    prefetch([chart(item) for item in items[start + size:start + 2 * size]])
+    return visible
@@ -0,0 +1,272 @@
+"""Technical indicators for the whole universe in one vectorized pass.
+
+Every function takes 2-D float arrays of shape (tickers, bars), e.g. one
+field of a ``MarketPanel`` (``panel.array[:, field, :]``), and returns the
+same shape. Leading NaNs (bars before a ticker's listing) stay NaN; gaps
+inside a ticker's history are forward-filled first.
+
+Window indicators (SMA, Bollinger, returns, volatility) use cumulative
+sums; exponential ones (EMA, Wilder's RSI/ATR) step through the bars with
+one array operation per bar across all tickers. ``IndicatorSet`` keeps the
+last window of inputs and the exponential state, so appended bars cost
+only their own columns; ``carry_indicators`` uses that when a daily
+refresh rebuilds the shared panel.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from core.instrument import metrics
+from core.panel import MarketPanel
+
+SMA_FAST, SMA_SLOW = 20, 50
+EMA_SPAN = 20
+RSI_BARS = 14
+ATR_BARS = 14
+BOLLINGER = (20, 2.0)  # bars, standard deviations
+RETURN_BARS = 20
+
+# Longest window an appended bar can look back over (plus one for diffs)
+TAIL = max(SMA_FAST, SMA_SLOW, BOLLINGER[0], RETURN_BARS) + 1
+
+# Chart overlays: label -> indicator arrays drawn on the price axis
+OVERLAYS = {
+    f"SMA {SMA_FAST}": ("sma_fast",),
+    f"SMA {SMA_SLOW}": ("sma_slow",),
+    f"EMA {EMA_SPAN}": ("ema",),
+    f"Bollinger ({BOLLINGER[0]}, {BOLLINGER[1]:g})": ("bb_upper", "bb_lower"),
+}
+
+# Sidebar screens: label -> (screener column, low, high, inclusive bounds)
+SCREENS = {
+    "Off": None,
+    f"RSI {RSI_BARS} oversold (< 30)": ("rsi", -np.inf, 30, "neither"),
+    f"RSI {RSI_BARS} overbought (> 70)": ("rsi", 70, np.inf, "neither"),
+    f"Above SMA {SMA_SLOW}": ("sma_gap", 0, np.inf, "neither"),
+    f"Below SMA {SMA_SLOW}": ("sma_gap", -np.inf, 0, "neither"),
+    "Above upper Bollinger band": ("bb_pct", 100, np.inf, "neither"),
+    "Below lower Bollinger band": ("bb_pct", -np.inf, 0, "neither"),
+}
+
+
+# -------------------- Primitives --------------------
+def ffill(x: np.ndarray, last: np.ndarray | None = None) -> np.ndarray:
+    """Forward-fill NaNs along the bars, starting from ``last`` (one value per ticker)."""
+    if last is not None:
+        x = np.concatenate([last[:, None], x], axis=1)
+    valid = ~np.isnan(x)
+    pos = np.where(valid, np.arange(x.shape[1]), 0)
+    np.maximum.accumulate(pos, axis=1, out=pos)
+    out = np.take_along_axis(x, pos, axis=1)
+    return out[:, 1:] if last is not None else out
+
+
+def _window_sums(x: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Rolling sum and count of valid values over the last ``n`` bars."""
+    valid = ~np.isnan(x)
+    cs = np.cumsum(np.where(valid, x, 0.0), axis=1)
+    cn = np.cumsum(valid, axis=1)
+    pad = np.zeros((x.shape[0], 1))
+    cs, cn = np.concatenate([pad, cs], axis=1), np.concatenate([pad, cn], axis=1)
+    lag = np.maximum(np.arange(1, x.shape[1] + 1) - n, 0)
+    return cs[:, 1:] - cs[:, lag], cn[:, 1:] - cn[:, lag]
+
+
+def sma(x: np.ndarray, n: int) -> np.ndarray:
+    total, count = _window_sums(x, n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count == n, total / n, np.nan)
+
+
+def rolling_std(x: np.ndarray, n: int) -> np.ndarray:
+    """Population standard deviation over the last ``n`` bars."""
+    # Centre each ticker on its first value so the sums of squares stay small
+    ref = ffill(x[:, ::-1])[:, -1:]
+    ref = np.where(np.isnan(ref), 0.0, ref)
+    d = x - ref
+    total, count = _window_sums(d, n)
+    squares, _ = _window_sums(d * d, n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = squares / n - (total / n) ** 2
+        return np.where(count == n, np.sqrt(np.maximum(var, 0.0)), np.nan)
+
+
+def ema(x: np.ndarray, alpha: float, init: np.ndarray | None = None) -> np.ndarray:
+    """Exponential average seeded with each ticker's first value (or ``init``)."""
+    out = np.empty_like(x, dtype="float64")
+    prev = np.full(x.shape[0], np.nan) if init is None else init.astype("float64")
+    for t in range(x.shape[1]):
+        col = x[:, t]
+        prev = np.where(np.isnan(prev), col, np.where(np.isnan(col), prev, prev + alpha * (col - prev)))
+        out[:, t] = prev
+    return out
+
+
+def rsi_from(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100 * avg_gain / (avg_gain + avg_loss)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, prev_close: np.ndarray) -> np.ndarray:
+    # fmax skips NaN, so the first bar (no previous close) is just high - low
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def shift(x: np.ndarray, n: int, head: np.ndarray | None = None) -> np.ndarray:
+    """``x`` moved ``n`` bars later; the first bars come from ``head`` or are NaN."""
+    pad = np.full((x.shape[0], n), np.nan) if head is None else head[:, -n:]
+    return np.concatenate([pad, x], axis=1)[:, :x.shape[1]]
+
+
+# -------------------- Universe --------------------
+class IndicatorSet:
+    """Indicator arrays for a fixed list of tickers, extendable bar by bar.
+
+    ``values[name]`` is a (tickers, bars) float32 array; ``latest()`` gives
+    the screener columns from the last bar.
+    """
+
+    NAMES = ["sma_fast", "sma_slow", "ema", "bb_upper", "bb_lower", "rsi", "atr", "ret", "vol"]
+
+    def __init__(self, tickers: list[str], bounds: np.ndarray | None = None):
+        self.tickers = list(tickers)
+        self.bounds = bounds  # per-ticker (start, stop) bars, as in MarketPanel
+        self._positions = {t: i for i, t in enumerate(self.tickers)}
+        n = len(self.tickers)
+        self.values = {name: np.empty((n, 0), dtype="float32") for name in self.NAMES}
+        self._tail = {f: np.empty((n, 0)) for f in ("high", "low", "close")}
+        self._state = {k: np.full(n, np.nan) for k in ("ema", "gain", "loss", "atr")}
+        self._seen = np.zeros(n, dtype="int64")  # bars with a close, for the warm-up
+
+    @classmethod
+    def from_panel(cls, panel) -> "IndicatorSet":
+        field = panel.fields.index
+        indicators = cls(panel.tickers, panel.bounds)
+        indicators.extend(panel.array[:, field("High"), :], panel.array[:, field("Low"), :],
+                          panel.array[:, field("Close"), :])
+        return indicators
+
+    def trimmed(self, bars: int, bounds: np.ndarray | None) -> "IndicatorSet":
+        """A copy without the first ``bars`` bars; extending it leaves this set as it is."""
+        out = type(self)(self.tickers, bounds)
+        out.values = {name: values[:, bars:] for name, values in self.values.items()}
+        out._tail, out._state, out._seen = dict(self._tail), dict(self._state), self._seen.copy()
+        return out
+
+    def extend(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> dict[str, np.ndarray]:
+        """Append (tickers, new bars) inputs; returns the new columns of every indicator."""
+        with metrics().timer("compute_seconds", stage="indicators"):
+            return self._extend(high, low, close)
+
+    def _extend(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> dict[str, np.ndarray]:
+        k = close.shape[1]
+        tail = self._tail
+        last = tail["close"][:, -1] if tail["close"].shape[1] else None
+        close = ffill(np.asarray(close, dtype="float64"), last)
+        high = np.where(np.isnan(high), close, high).astype("float64")
+        low = np.where(np.isnan(low), close, low).astype("float64")
+        # Window indicators see the stored tail followed by the new bars
+        window = np.concatenate([tail["close"], close], axis=1)
+        prev_close = shift(close, 1, tail["close"] if last is not None else None)
+        seen = self._seen[:, None] + np.cumsum(~np.isnan(close), axis=1)
+
+        out = {
+            "sma_fast": sma(window, SMA_FAST)[:, -k:],
+            "sma_slow": sma(window, SMA_SLOW)[:, -k:],
+            "ema": ema(close, 2 / (EMA_SPAN + 1), self._state["ema"]),
+        }
+        n, width = BOLLINGER
+        mid, std = sma(window, n)[:, -k:], rolling_std(window, n)[:, -k:]
+        out["bb_upper"], out["bb_lower"] = mid + width * std, mid - width * std
+
+        change = close - prev_close
+        gain = ema(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), 1 / RSI_BARS,
+                   self._state["gain"])
+        loss = ema(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), 1 / RSI_BARS,
+                   self._state["loss"])
+        out["rsi"] = np.where(seen > RSI_BARS, rsi_from(gain, loss), np.nan)
+        atr = ema(true_range(high, low, prev_close), 1 / ATR_BARS, self._state["atr"])
+        out["atr"] = np.where(seen >= ATR_BARS, atr, np.nan)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["ret"] = ((window / shift(window, RETURN_BARS) - 1) * 100)[:, -k:]
+            returns = window / shift(window, 1) - 1
+        out["vol"] = (rolling_std(returns, RETURN_BARS) * 100)[:, -k:]
+
+        self._state.update(ema=out["ema"][:, -1], gain=gain[:, -1], loss=loss[:, -1], atr=atr[:, -1])
+        self._seen = seen[:, -1]
+        for field, x in (("high", high), ("low", low), ("close", close)):
+            tail[field] = np.concatenate([tail[field], x], axis=1)[:, -TAIL:]
+        for name, x in out.items():
+            self.values[name] = np.concatenate([self.values[name], x.astype("float32")], axis=1)
+        return out
+
+    # -------------------- Access --------------------
+    def series(self, ticker: str, name: str) -> np.ndarray:
+        """One indicator for one ticker, over the same bars as ``panel[ticker]``."""
+        i = self._positions[ticker]
+        row = self.values[name][i]
+        if self.bounds is None:
+            return row
+        start, stop = self.bounds[i]
+        return row[start:stop]
+
+    def overlays(self, ticker: str, labels: list[str]) -> dict[str, list[np.ndarray]]:
+        """``{label: [lines]}`` for the chart overlays picked in the sidebar."""
+        if ticker not in self._positions:
+            return {}
+        return {label: [self.series(ticker, name) for name in OVERLAYS[label]] for label in labels}
+
+    def latest(self, close: np.ndarray | None = None) -> pd.DataFrame:
+        """Screener columns from the last bar, indexed by ticker."""
+        last = {name: values[:, -1].astype("float64") if values.shape[1] else np.full(len(self.tickers), np.nan)
+                for name, values in self.values.items()}
+        close = self._tail["close"][:, -1] if close is None and self._tail["close"].shape[1] else close
+        with np.errstate(invalid="ignore", divide="ignore"):
+            band = last["bb_upper"] - last["bb_lower"]
+            table = {
+                "rsi": last["rsi"],
+                "atr_pct": last["atr"] / close * 100,
+                "sma_gap": (close / last["sma_slow"] - 1) * 100,
+                "bb_pct": np.where(band > 0, (close - last["bb_lower"]) / band * 100, np.nan),
+                "ret_20": last["ret"],
+                "vol_20": last["vol"],
+            }
+        return pd.DataFrame(table, index=pd.Index(self.tickers, name="Ticker"))
+
+
+def universe_indicators(frames: Mapping[str, pd.DataFrame]) -> IndicatorSet:
+    """Indicators for a panel (shared via ``panel.derived``) or a ``{ticker: frame}`` dict."""
+    panel = frames if isinstance(frames, MarketPanel) else MarketPanel.from_frames(frames)
+    return panel.derived("indicators", IndicatorSet.from_panel)
+
+
+def carry_indicators(previous: MarketPanel, panel: MarketPanel) -> IndicatorSet | None:
+    """Seed ``panel``'s indicators from ``previous``'s when a refresh only appended bars.
+
+    The previous set loses the bars the window dropped and is extended with the new bars
+    alone. Nothing is carried if ``previous`` had no indicators yet or the bars both panels
+    hold differ (a corrected close, another universe); ``panel`` then computes its own on
+    first use. Carried values keep the warm-up from the dropped bars, so the first bars'
+    averages are filled in where a fresh computation would start with NaN.
+    """
+    old = previous.cached("indicators")
+    if old is None or panel.tickers != previous.tickers or panel.fields != previous.fields:
+        return None
+    drop = previous.index.searchsorted(panel.index[0])
+    overlap = len(previous.index) - drop
+    if overlap <= 0 or not previous.index[drop:].equals(panel.index[:overlap]) \
+            or not np.array_equal(previous.array[:, :, drop:], panel.array[:, :, :overlap], equal_nan=True):
+        return None
+
+    def build(panel: MarketPanel) -> IndicatorSet:
+        carried = old.trimmed(drop, panel.bounds)
+        if len(panel.index) > overlap:
+            field = panel.fields.index
+            carried.extend(*(panel.array[:, field(f), overlap:] for f in ("High", "Low", "Close")))
+        return carried
+
+    return panel.derived("indicators", build)
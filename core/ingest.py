@@ -0,0 +1,156 @@
+"""Ingestion of NSE CSV exports and the gainers/losers history.
+
+NSE downloads come with a UTF-8 BOM, quoted headers with embedded newlines
+(``"SYMBOL \\n"``), trailing spaces (``"CA "``), Indian digit grouping
+(``"3,04,52,79,437"``) and ``-`` for missing values; ``read_nse_csv`` turns
+any of them into a clean frame with upper-case single-spaced headers.
+
+``GainersLosers`` folds every dated ``T20-GL-<side>-<segment>-<dd-Mon-yyyy>.csv``
+drop into one compact table indexed by ``(date, symbol)`` and persisted to
+``data/store/gainers_losers.parquet``. A manifest of file sizes and mtimes
+means later runs only parse files that are new or changed.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+
+import pandas as pd
+
+from core.singleton import lazy_singleton
+from core.universe import normalize
+
+GAIN_LOSS_DIR = "data/TOP-Gain-loosers"
+HISTORY_PATH = "data/store/gainers_losers.parquet"
+SIDES = ["gainers", "loosers"]  # spelled as in the NSE file names
+
+FILE_RE = re.compile(r"T20-GL-(?P<side>gainers|loosers)-(?P<segment>[^-]+)-(?P<date>\d{2}-[A-Za-z]{3}-\d{4})\.csv$")
+COLUMNS = {"SYMBOL": "symbol", "%CHNG": "pct_change", "LTP": "ltp", "PREV. CLOSE": "prev_close",
+           "VOLUME": "volume", "VALUE": "value"}
+
+
+def normalize_header(name) -> str:
+    """``'SYMBOL \\n'`` -> ``'SYMBOL'``, ``'30 D   %CHNG \\n'`` -> ``'30 D %CHNG'``."""
+    return " ".join(str(name).replace("\ufeff", "").split()).upper()
+
+
+def read_nse_csv(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path, encoding="utf-8-sig", thousands=",", na_values=["-"], skipinitialspace=True)
+    df.columns = [normalize_header(c) for c in df.columns]
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        df[col] = df[col].str.strip()
+    return df
+
+
+def parse_gainers_losers(path: str) -> pd.DataFrame | None:
+    """One dated T20 file as rows of the history table, or None if not one."""
+    match = FILE_RE.search(os.path.basename(path))
+    if match is None:
+        return None
+    raw = read_nse_csv(path)
+    if "SYMBOL" not in raw.columns:
+        return None
+    df = pd.DataFrame({name: raw[col] for col, name in COLUMNS.items() if col in raw.columns})
+    df = df.dropna(subset=["symbol"])
+    df["symbol"] = df["symbol"].str.upper()
+    df["rank"] = range(1, len(df) + 1)
+    df["side"] = match["side"]
+    df["date"] = pd.to_datetime(match["date"], format="%d-%b-%Y")
+    return df
+
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.astype({"symbol": "category", "side": pd.CategoricalDtype(SIDES), "rank": "int16"})
+    for col in ("pct_change", "ltp", "prev_close"):
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+    # The same (date, side, symbol) from a re-downloaded file keeps the newest row
+    df = df.drop_duplicates(["date", "side", "symbol"], keep="last")
+    return df.sort_values(["date", "side", "rank"]).set_index(["date", "symbol"])
+
+
+class GainersLosers:
+    def __init__(self, root: str = GAIN_LOSS_DIR, path: str = HISTORY_PATH):
+        self.root = root
+        self.path = path
+        self.manifest_path = os.path.splitext(path)[0] + ".json"
+        self._lock = threading.Lock()
+        self.table = pd.read_parquet(path) if os.path.exists(path) else _compact(pd.DataFrame(
+            {"date": pd.Series(dtype="datetime64[ns]"), "symbol": [], "side": [], "rank": []}))
+        try:
+            with open(self.manifest_path) as f:
+                self.manifest: dict[str, list] = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    # -------------------- Ingestion --------------------
+    def ingest(self) -> list[str]:
+        """Parse new or changed files in ``root``; returns their names."""
+        with self._lock:
+            fresh, seen = [], {}
+            for entry in os.scandir(self.root) if os.path.isdir(self.root) else []:
+                if not FILE_RE.search(entry.name):
+                    continue
+                stat = entry.stat()
+                seen[entry.name] = [stat.st_size, stat.st_mtime]
+                if self.manifest.get(entry.name) != seen[entry.name]:
+                    fresh.append(entry.name)
+            if not fresh:
+                return []
+            frames = [parse_gainers_losers(os.path.join(self.root, name)) for name in sorted(fresh)]
+            frames = [f for f in frames if f is not None]
+            if frames:
+                new = pd.concat(frames, ignore_index=True)
+                # A changed file replaces everything previously loaded for its date and side
+                old = self.table.reset_index()
+                replaced = old.set_index(["date", "side"]).index.isin(new.set_index(["date", "side"]).index)
+                merged = pd.concat([old[~replaced].astype({"symbol": str, "side": str}), new], ignore_index=True)
+                self.table = _compact(merged)
+            self.manifest.update({name: seen[name] for name in fresh})
+            self._save()
+            return fresh
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        self.table.to_parquet(tmp)
+        os.replace(tmp, self.path)
+        with open(self.manifest_path, "w") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+
+    # -------------------- Queries --------------------
+    def dates(self) -> pd.DatetimeIndex:
+        return self.table.index.get_level_values("date").unique()
+
+    def on(self, date=None, side: str = "gainers") -> pd.DataFrame:
+        """Rows for one file (the latest date by default), in NSE rank order."""
+        if self.table.empty:
+            return self.table
+        date = self.dates().max() if date is None else pd.Timestamp(date)
+        rows = self.table.loc[date] if date in self.dates() else self.table.iloc[:0].droplevel("date")
+        return rows[rows["side"] == side]
+
+    def tickers(self, date=None, side: str = "gainers") -> list[str]:
+        return [normalize(s) for s in self.on(date, side).index]
+
+    def frequent_symbols(self, min_days: int = 3, start=None, end=None, side: str | None = None) -> pd.Series:
+        """Days each symbol made the list between ``start`` and ``end``, most first."""
+        rows = self.table.loc[pd.Timestamp(start) if start else None:pd.Timestamp(end) if end else None]
+        if side is not None:
+            rows = rows[rows["side"] == side]
+        days = rows.reset_index().groupby("symbol", observed=True)["date"].nunique()
+        return days[days >= min_days].sort_values(ascending=False, kind="stable")
+
+
+@lazy_singleton
+def _history() -> GainersLosers:
+    return GainersLosers()
+
+
+def gainers_losers() -> GainersLosers:
+    """The ``T20-GL-*`` history, with any newly dropped files ingested."""
+    history = _history()
+    history.ingest()
+    return history
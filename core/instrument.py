@@ -0,0 +1,284 @@
+"""Timers, counters and latency histograms for the fetch/compute/render stages.
+
+Disabled by default. While off, ``timer`` hands back one shared no-op
+context manager and ``count``/``observe`` return after a flag check, so the
+instrumented code paths cost next to nothing. Turn it on for the whole
+server with ``STOCKS_METRICS=1`` or from the sidebar diagnostics panel.
+
+Histograms use fixed Prometheus-style buckets, so they stay small however
+many tickers are observed. Owners of process-wide caches register a
+``collect`` callback; their stats (hit ratios, sizes) are read only when a
+snapshot is taken. ``export`` writes the snapshot as JSON or, for a
+``.prom``/``.txt`` path, in the Prometheus text format.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable
+
+from core.singleton import lazy_singleton
+
+METRICS_ENABLED = os.environ.get("STOCKS_METRICS", "") not in ("", "0")
+EXPORT_PATH = "data/store/metrics.json"
+PREFIX = "stocks_"
+# Upper bounds in seconds; one more bucket catches everything slower
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = self.max = 0.0
+
+    def observe(self, value: float, n: int = 1) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += n
+        self.count += n
+        self.sum += value * n
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (``max`` past the last bound)."""
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank and seen:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], self.counts)),
+        }
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics: "Metrics", name: str, labels: dict):
+        self.metrics, self.name, self.labels = metrics, name, labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoTimer":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+NO_TIMER = _NoTimer()
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.since = time.time()
+        self._counters: dict[tuple, float] = {}
+        self._histograms: dict[tuple, Histogram] = {}
+        self._collectors: dict[str, Callable[[], dict]] = {}
+        self._lock = threading.Lock()
+
+    # -------------------- Recording --------------------
+    def timer(self, name: str, **labels):
+        """``with metrics().timer("render_seconds", chart="daily"): ...``"""
+        return _Timer(self, name, labels) if self.enabled else NO_TIMER
+
+    def timed(self, name: str, **labels):
+        """Decorator form of ``timer``; the enabled flag is checked per call."""
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Timer(self, name, labels):
+                    return fn(*args, **kwargs)
+            return inner
+        return wrap
+
+    def count(self, name: str, n: float = 1, **labels) -> None:
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def observe(self, name: str, value: float, n: int = 1, **labels) -> None:
+        """Record ``value`` (seconds) ``n`` times, e.g. one batch's per-ticker latency."""
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(value, n)
+
+    def collect(self, name: str, stats: Callable[[], dict]) -> None:
+        """Register a source of gauges (e.g. a cache's ``stats``), read at snapshot time."""
+        with self._lock:
+            self._collectors[name] = stats
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.since = time.time()
+
+    # -------------------- Reading --------------------
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: hist.as_dict() for key, hist in self._histograms.items()}
+            collectors = dict(self._collectors)
+        gauges = {}
+        for source, stats in collectors.items():
+            for field, value in stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[f"{source}_{field}"] = value
+        # hit/miss counters become ratios, like the chart cache's own
+        ratios: dict[str, list[float]] = {}
+        for (name, labels), value in counters.items():
+            result = dict(labels).get("result")
+            if result in ("hit", "miss"):
+                ratios.setdefault(name, [0.0, 0.0])[result == "miss"] += value
+        for name, (hits, misses) in ratios.items():
+            gauges[f"{name}_hit_ratio"] = hits / (hits + misses) if hits + misses else 0.0
+        return {
+            "enabled": self.enabled,
+            "since": self.since,
+            "taken": time.time(),
+            "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(counters.items())],
+            "histograms": [{"name": n, "labels": dict(l), **h} for (n, l), h in sorted(histograms.items())],
+            "gauges": gauges,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        snap = self.snapshot()
+        lines: list[str] = []
+        typed: set[str] = set()
+
+        def metric(name: str, kind: str) -> str:
+            name = PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+            return name
+
+        def fmt(labels: dict) -> str:
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+        for c in snap["counters"]:
+            name = metric(f"{c['name']}_total", "counter")
+            lines.append(f"{name}{fmt(c['labels'])} {c['value']}")
+        for h in snap["histograms"]:
+            name = metric(h["name"], "histogram")
+            cumulative = 0
+            for bound, n in h["buckets"].items():
+                cumulative += n
+                lines.append(f"{name}_bucket{fmt({**h['labels'], 'le': bound})} {cumulative}")
+            lines.append(f"{name}_sum{fmt(h['labels'])} {h['sum']}")
+            lines.append(f"{name}_count{fmt(h['labels'])} {h['count']}")
+        for gauge, value in sorted(snap["gauges"].items()):
+            lines.append(f"{metric(gauge, 'gauge')} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str = EXPORT_PATH) -> str:
+        """Write a snapshot to ``path`` (Prometheus text for .prom/.txt, else JSON)."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return path
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "🩺 Metrics: off"
+        with self._lock:
+            observed = sum(h.count for h in self._histograms.values())
+            return f"🩺 Metrics: {len(self._histograms)} timers, {observed} samples, {len(self._counters)} counters"
+
+
+@lazy_singleton
+def metrics() -> Metrics:
+    """Counters, timers and collected stats for the diagnostics panel and exports."""
+    return Metrics()
+
+
+# -------------------- Sidebar Panel --------------------
+def diagnostics_sidebar(key: str = "diagnostics") -> None:
+    """Optional sidebar panel with the slowest stages, cache ratios and exports."""
+    import pandas as pd
+    import streamlit as st
+
+    m = metrics()
+
+    def toggled():
+        m.enabled = st.session_state[key]
+
+    st.sidebar.toggle("🩺 Diagnostics", value=m.enabled, key=key, on_change=toggled,
+                      help="Time fetch, compute and render stages for every session on this server")
+    if not m.enabled:
+        return
+    snap = m.snapshot()
+    with st.sidebar.expander("🩺 Diagnostics", expanded=True):
+        st.caption(m.summary())
+        if snap["histograms"]:
+            rows = pd.DataFrame([{
+                "stage": h["name"].removesuffix("_seconds"),
+                "labels": ", ".join(f"{k}={v}" for k, v in h["labels"].items()),
+                "n": h["count"],
+                "total s": h["sum"],
+                "mean ms": h["mean"] * 1000,
+                "p95 ms": h["p95"] * 1000,
+            } for h in snap["histograms"]]).sort_values("total s", ascending=False)
+            st.dataframe(rows, hide_index=True, width="stretch")
+        ratios = {k: v for k, v in snap["gauges"].items() if k.endswith(("hit_ratio", "error_rate"))}
+        for name, value in sorted(ratios.items()):
+            st.caption(f"{name}: {value:.0%}")
+        cols = st.columns(2)
+        cols[0].download_button("JSON", m.to_json(), file_name="metrics.json", mime="application/json")
+        cols[1].download_button("Prometheus", m.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+        if st.button("💾 Export to file", key=f"{key}_export"):
+            st.caption(f"Wrote {m.export()}")
+        if st.button("Reset", key=f"{key}_reset"):
+            m.reset()
@@ -0,0 +1,154 @@
+"""Symbol metadata index (name, industry, ISIN) persisted on disk.
+
+The index is loaded once per process and seeded with every symbol listed in
+``data/Charts-data/Nifty500.csv``. That NSE export carries no company names,
+so names, industries and ISINs are back-filled from ``yf.Ticker`` on a
+background thread pool and written back to ``data/store/metadata.json``;
+page lookups are plain dictionary hits and never wait on the network.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable
+
+from core.ingest import read_nse_csv
+from core.singleton import lazy_singleton
+
+METADATA_PATH = "data/store/metadata.json"
+SEED_CSV = "data/Charts-data/Nifty500.csv"
+BACKFILL_WORKERS = 8
+
+
+def fetch_info(ticker: str) -> dict:
+    import yfinance as yf
+
+    tk = yf.Ticker(ticker)
+    info = tk.info or {}
+    try:
+        isin = tk.isin
+    except Exception:
+        isin = None
+    return {
+        "name": info.get("longName") or info.get("shortName"),
+        "industry": info.get("industry"),
+        "isin": isin if isin and isin != "-" else None,
+    }
+
+
+def seed_symbols(csv_path: str = SEED_CSV) -> list[str]:
+    """``.NS`` tickers listed in an NSE index export (index rows skipped)."""
+    syms = read_nse_csv(csv_path)["SYMBOL"].dropna().astype(str).str.upper()
+    return [f"{s}.NS" for s in syms if s and " " not in s]
+
+
+class SymbolIndex:
+    def __init__(self, path: str = METADATA_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._backfill: threading.Thread | None = None
+        self._mtime = None
+        self.reload()
+
+    def reload(self) -> None:
+        """Merge entries saved by another process since the last load."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        with open(self.path) as f:
+            saved = json.load(f)
+        with self._lock:
+            for ticker, entry in saved.items():
+                self._entries.setdefault(ticker, {}).update(entry)
+            self._mtime = mtime
+
+    # -------------------- Lookups --------------------
+    def get(self, ticker: str) -> dict:
+        return self._entries.get(ticker, {})
+
+    def name(self, ticker: str) -> str:
+        return self.get(ticker).get("name") or ticker
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -------------------- Maintenance --------------------
+    def seed(self, tickers: list[str]) -> None:
+        with self._lock:
+            for ticker in tickers:
+                self._entries.setdefault(ticker, {})
+
+    def missing(self, tickers: list[str] | None = None) -> list[str]:
+        """Tickers without a name that were not already tried today."""
+        today = date.today().isoformat()
+        tickers = list(self._entries) if tickers is None else tickers
+        return [t for t in tickers
+                if not self.get(t).get("name") and self.get(t).get("checked") != today]
+
+    def save(self) -> None:
+        with self._lock:
+            entries = dict(self._entries)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+        self._mtime = os.stat(self.path).st_mtime
+
+    def backfill(self, tickers: list[str], fetch: Callable[[str], dict] = fetch_info,
+                 max_workers: int = BACKFILL_WORKERS) -> int:
+        """Fetch metadata for ``tickers`` concurrently and persist it; blocks."""
+        today = date.today().isoformat()
+
+        def one(ticker: str) -> None:
+            try:
+                fields = {k: v for k, v in fetch(ticker).items() if v}
+            except Exception:
+                fields = {}
+            with self._lock:
+                self._entries.setdefault(ticker, {}).update(fields, checked=today)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(one, tickers))
+        if tickers:
+            self.save()
+        return len(tickers)
+
+    def start_backfill(self, tickers: list[str] | None = None) -> bool:
+        """Back-fill missing entries on a background thread (once at a time)."""
+        todo = self.missing(tickers)
+        if not todo or (self._backfill is not None and self._backfill.is_alive()):
+            return False
+        self._backfill = threading.Thread(target=self.backfill, args=(todo,), daemon=True,
+                                          name="metadata-backfill")
+        self._backfill.start()
+        return True
+
+    @property
+    def backfilling(self) -> bool:
+        return self._backfill is not None and self._backfill.is_alive()
+
+
+@lazy_singleton
+def _index() -> SymbolIndex:
+    index = SymbolIndex()
+    if os.path.exists(SEED_CSV):
+        index.seed(seed_symbols(SEED_CSV))
+    return index
+
+
+def symbol_index() -> SymbolIndex:
+    """Company names and ISINs, seeded from the local Nifty 500 export.
+
+    Entries written by the prefetch worker are merged in on the next call.
+    """
+    index = _index()
+    index.reload()
+    return index
@@ -0,0 +1,101 @@
+"""Small-multiples renderer: many tickers on one shared canvas.
+
+Drawing one ``Figure`` per ticker pays for a figure, locators, formatters
+and ``tight_layout`` every time. Here a template figure with a fixed grid of
+bare axes is built once per layout and reused; each render only swaps one
+``LineCollection`` and a title per cell, then saves a single image.
+"""
+from __future__ import annotations
+
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from core.charts import figure_png, fingerprint
+from core.downsample import points_for, thin
+
+CELL_SIZE = (3.0, 1.5)  # inches per small chart
+CELL_DPI = 120
+
+
+class _Template:
+    def __init__(self, nrows: int, ncols: int):
+        # matplotlib is imported with the first template, not with the module
+        from matplotlib.collections import LineCollection
+        from matplotlib.figure import Figure
+
+        width, height = CELL_SIZE
+        self.fig = Figure(figsize=(width * ncols, height * nrows))
+        self.fig.subplots_adjust(left=0.01, right=0.99, bottom=0.01, top=0.97, wspace=0.04, hspace=0.3)
+        self.axes = self.fig.subplots(nrows, ncols, squeeze=False).ravel()
+        for ax in self.axes:
+            ax.set_xticks([])
+            ax.set_yticks([])
+            ax.autoscale(False)
+        self.lines = [LineCollection([], linewidths=1) for _ in self.axes]
+        for ax, lines in zip(self.axes, self.lines):
+            ax.add_collection(lines)
+        self.lock = threading.Lock()
+
+
+@lru_cache(maxsize=16)
+def _template(nrows: int, ncols: int) -> _Template:
+    return _Template(nrows, ncols)
+
+
+def _segment(df: pd.DataFrame, full: bool = False) -> np.ndarray:
+    import matplotlib.dates as mdates
+
+    df, _ = thin(df, points_for(CELL_SIZE[0]), full)
+    close = df["Close"].to_numpy(dtype="float64")
+    x = mdates.date2num(df.index.tz_localize(None) if df.index.tz is not None else df.index)
+    keep = ~np.isnan(close)
+    return np.column_stack([x[keep], close[keep]])
+
+
+def render_small_multiples(series: list[tuple], ncols: int = 4, full: bool = False) -> bytes:
+    """One PNG with a small close-price chart per ``(label, bars[, color])``.
+
+    Each cell is downsampled to its width unless ``full`` is set.
+    """
+    nrows = max(1, -(-len(series) // ncols))
+    template = _template(nrows, ncols)
+    with template.lock:
+        for i, (ax, lines) in enumerate(zip(template.axes, template.lines)):
+            if i >= len(series):
+                ax.set_visible(False)
+                continue
+            label, df, *rest = series[i]
+            segment = _segment(df, full)
+            ax.set_visible(True)
+            lines.set_segments([segment])
+            lines.set_color(rest[0] if rest else "C0")
+            if len(segment):
+                lo, hi = segment.min(axis=0), segment.max(axis=0)
+                pad = (hi - lo) * 0.05
+                ax.set_xlim(lo[0] - pad[0] - 1e-9, hi[0] + pad[0] + 1e-9)
+                ax.set_ylim(lo[1] - pad[1] - 1e-9, hi[1] + pad[1] + 1e-9)
+            last = segment[-1, 1] if len(segment) else float("nan")
+            ax.set_title(f"{label}  {last:,.2f}", fontsize=7, pad=2)
+        # Layout is fixed, so no tight bbox pass is needed
+        return figure_png(template.fig, dpi=CELL_DPI, bbox_inches=None)
+
+
+def render_tiles(series: list[tuple], ncols: int = 4, per_tile: int = 40, full: bool = False) -> list[bytes]:
+    """Split a long list into several small-multiples images."""
+    return [render_small_multiples(series[i:i + per_tile], ncols, full) for i in range(0, len(series), per_tile)]
+
+
+def multiples_spec(items: list[str], series, ncols: int = 4, full: bool = False):
+    """``(cache_key, render)`` for one small-multiples image, as used by the grid.
+
+    ``series(item)`` returns ``(label, bars[, color])`` or ``None``.
+    """
+    entries = [(item, series(item)) for item in items]
+    entries = [(item, s) for item, s in entries if s is not None]
+    if not entries:
+        return None
+    key = ("multiples", ncols, full) + tuple((item, fingerprint(s[1]), *s[2:]) for item, s in entries)
+    return key, lambda: render_small_multiples([s for _, s in entries], ncols, full)
@@ -0,0 +1,183 @@
+"""Process-wide, read-only market panels shared by every session.
+
+A ``MarketPanel`` holds a whole universe as one contiguous float32 array of
+shape (tickers, fields, dates) over a shared date index. It behaves like the
+``{ticker: DataFrame}`` dicts the pages used to keep per session, but
+``panel[ticker]`` is a copy-free view into the array, so N sessions cost one
+copy of the data instead of N.
+
+Panels are never modified. A refresh builds a new panel and ``publish``es
+it under the same key (copy-on-refresh); sessions still drawing from the
+old one keep a consistent snapshot until their next rerun.
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+from collections.abc import Mapping
+from typing import Callable, Hashable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from core.fetch import FIELDS
+from core.instrument import metrics
+from core.singleton import lazy_singleton
+
+
+class MarketPanel(Mapping):
+    def __init__(self, index: pd.DatetimeIndex, tickers: list[str], array: np.ndarray,
+                 bounds: np.ndarray, fields: list[str] = FIELDS):
+        array.setflags(write=False)
+        self.index = index
+        self.tickers = list(tickers)
+        self.fields = list(fields)
+        self.array = array          # (tickers, fields, dates) float32
+        self.bounds = bounds        # (tickers, 2): first and one-past-last row with data
+        self._positions = {t: i for i, t in enumerate(self.tickers)}
+        self._derived: dict[Hashable, object] = {}
+        self._lock = threading.RLock()  # a derived build may ask for another (screener -> indicators)
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame], fields: list[str] = FIELDS) -> "MarketPanel":
+        frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            return cls(pd.DatetimeIndex([]), [], np.empty((0, len(fields), 0), dtype="float32"),
+                       np.empty((0, 2), dtype="int64"), fields)
+        index = pd.concat({t: df.index.to_series() for t, df in frames.items()}).drop_duplicates().sort_values()
+        index = pd.DatetimeIndex(index.to_numpy(), name="Date")
+        values = np.full((len(frames), len(fields), len(index)), np.nan, dtype="float32")
+        bounds = np.zeros((len(frames), 2), dtype="int64")
+        for i, df in enumerate(frames.values()):
+            rows = index.get_indexer(df.index)
+            values[i][:, rows] = df.reindex(columns=fields).to_numpy(dtype="float32").T
+            bounds[i] = rows.min(), rows.max() + 1
+        return cls(index, list(frames), values, bounds, fields)
+
+    # -------------------- Mapping --------------------
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        i = self._positions[ticker]
+        start, stop = self.bounds[i]
+        # (fields, rows) slice transposed: pandas keeps it as its block, no copy
+        return pd.DataFrame(self.array[i, :, start:stop].T, index=self.index[start:stop],
+                            columns=self.fields, copy=False)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tickers)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker) -> bool:
+        return ticker in self._positions
+
+    # -------------------- Whole-universe access --------------------
+    def field(self, name: str) -> pd.DataFrame:
+        """Dates x tickers frame of one field."""
+        return pd.DataFrame(self.array[:, self.fields.index(name), :].T, index=self.index,
+                            columns=self.tickers, copy=False)
+
+    def same_bars(self, ticker: str, df: pd.DataFrame | None, column: str = "Close") -> bool:
+        """Whether ``df`` holds the bars already stored for ``ticker``, at the panel's float32 precision.
+
+        Rows that are NaN only because other tickers traded then (the shared
+        index) are ignored.
+        """
+        if ticker not in self._positions or df is None or column not in df:
+            return False
+        old, new = self[ticker][column].dropna(), df[column].dropna()
+        return len(old) == len(new) and old.index.equals(new.index) \
+            and np.array_equal(old.to_numpy(), new.to_numpy(dtype="float32"))
+
+    def derived(self, key: Hashable, build: Callable[["MarketPanel"], object]):
+        """Compute something from this panel once (e.g. a screener) and share it."""
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = build(self)
+            return self._derived[key]
+
+    def cached(self, key: Hashable):
+        """What ``derived`` built under ``key``, or ``None`` if nothing has asked for it yet."""
+        return self._derived.get(key)
+
+    @property
+    def nbytes(self) -> int:
+        return self.array.nbytes + self.index.nbytes + self.bounds.nbytes
+
+    def describe(self) -> str:
+        return f"{len(self.tickers)} tickers x {len(self.index)} bars, {self.nbytes / 2**20:.1f} MB"
+
+
+class PanelRegistry:
+    """Named panels shared across sessions, swapped atomically on refresh."""
+
+    def __init__(self):
+        self._panels: dict[Hashable, tuple[Hashable, MarketPanel, int]] = {}
+        self._lock = threading.Lock()
+        self._building: dict[Hashable, threading.Lock] = {}
+        self._published = itertools.count(1)
+
+    def get(self, key: Hashable) -> MarketPanel | None:
+        entry = self._panels.get(key)
+        return None if entry is None else entry[1]
+
+    def version(self, key: Hashable) -> Hashable:
+        """The version the panel under ``key`` was published with (``None`` if missing)."""
+        entry = self._panels.get(key)
+        return None if entry is None else entry[0]
+
+    def stamp(self, key: Hashable) -> tuple[Hashable, int] | None:
+        """``(version, publish number)`` of the panel under ``key``; changes on every publish,
+        even of a panel republished under the same version (e.g. corrected closes)."""
+        entry = self._panels.get(key)
+        return None if entry is None else (entry[0], entry[2])
+
+    def publish(self, key: Hashable, panel: MarketPanel, version: Hashable = None) -> MarketPanel:
+        with self._lock:
+            self._panels[key] = (version, panel, next(self._published))
+        return panel
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Mapping[str, pd.DataFrame]],
+                     version: Hashable = None) -> MarketPanel:
+        """The panel under ``key``, (re)built from ``build()`` if missing or of another version.
+
+        Concurrent sessions asking for the same missing panel build it once.
+        """
+        entry = self._panels.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            entry = self._panels.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            with metrics().timer("compute_seconds", stage="panel"):
+                frames = build()
+                panel = frames if isinstance(frames, MarketPanel) else MarketPanel.from_frames(frames)
+            return self.publish(key, panel, version)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._panels.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            panels = {key: panel for key, (_, panel, _) in self._panels.items()}
+        return {
+            "panels": len(panels),
+            "mb": sum(p.nbytes for p in panels.values()) / 2**20,
+            "detail": {str(key): p.describe() for key, p in panels.items()},
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return f"🧮 Shared panels: {s['panels']}, {s['mb']:.1f} MB (one copy for all sessions)"
+
+
+@lazy_singleton
+def panels() -> PanelRegistry:
+    """The daily, weekly and live panels the pages publish and read."""
+    registry = PanelRegistry()
+    metrics().collect("panels", registry.stats)
+    return registry
@@ -0,0 +1,123 @@
+"""Headless worker that warms the shared store after the daily cutoff.
+
+    python -m core.prefetch            # run as a daemon, once per cache date
+    python -m core.prefetch --once     # warm now if needed, then exit (cron)
+
+Uses the same ``get_cache_date`` rollover (3:45 PM IST) as the pages. For
+each new cache date it brings the daily bars of every ticker in
+``tickers_Nifty500.txt`` up to date, stores the weekly and monthly panels
+the weekly page reads, back-fills company metadata and records what it did
+in ``data/store/prefetch.json``, so the first page open after the close
+finds everything on disk.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from core.fetch import IST, SyntheticSource
+from core.instrument import metrics
+from core.metadata import SEED_CSV, SymbolIndex, seed_symbols
+from core.resample import FREQS, build_panel, resample_panel
+from core.store import CUTOFF, DAILY_PERIOD, STORE_DIR, OHLCVStore, get_cache_date
+from core.universe import TICKERS_FILE, read_tickers
+
+RETRY_SECONDS = 15 * 60  # wait before retrying a failed warm-up
+
+
+def seconds_until_cutoff(now: datetime | None = None) -> float:
+    """Seconds until the next 3:45 PM IST rollover."""
+    now = now or datetime.now(IST)
+    cutoff = now.replace(hour=CUTOFF.hour, minute=CUTOFF.minute, second=0, microsecond=0)
+    if cutoff <= now:
+        cutoff += timedelta(days=1)
+    return (cutoff - now).total_seconds()
+
+
+def warm(store: OHLCVStore, tickers: list[str], cache_date: str, source=None,
+         metadata: SymbolIndex | None = None) -> dict:
+    """Refresh daily bars, derived panels and metadata; returns stage timings."""
+    report = {"cache_date": cache_date, "tickers": len(tickers), "seconds": {}}
+
+    start = time.perf_counter()
+    before = {t: store.last_timestamp(t, "1d") for t in tickers}
+    failed: list[str] = []
+    for _ in store.refresh(tickers, "1d", DAILY_PERIOD, source=source, failed=failed):
+        pass
+    # Stored frames handed back for failed tickers do not count as warmed
+    report["daily"] = sum(store.last_timestamp(t, "1d") not in (None, before[t]) for t in tickers)
+    report["seconds"]["daily"] = round(time.perf_counter() - start, 2)
+    if failed:
+        # The store stays marked with the old date, so the pages keep showing it as stale
+        raise RuntimeError(f"{len(failed)}/{len(tickers)} daily downloads failed: {', '.join(failed[:5])}")
+    store.mark_refreshed("1d", cache_date)
+
+    start = time.perf_counter()
+    panel = build_panel(store.load(tickers, "1d", DAILY_PERIOD))
+    for rule in FREQS:
+        store.write_panel(rule, resample_panel(panel, rule))
+        store.mark_refreshed(rule, cache_date)
+    report["seconds"]["resample"] = round(time.perf_counter() - start, 2)
+
+    if metadata is not None:
+        start = time.perf_counter()
+        report["metadata"] = metadata.backfill(metadata.missing(tickers))
+        report["seconds"]["metadata"] = round(time.perf_counter() - start, 2)
+
+    report["finished"] = datetime.now(IST).isoformat(timespec="seconds")
+    with open(os.path.join(store.root, "prefetch.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="warm once (if needed) and exit")
+    parser.add_argument("--force", action="store_true", help="warm even if the store is already current")
+    parser.add_argument("--tickers", default=TICKERS_FILE)
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--no-metadata", action="store_true", help="skip the company metadata back-fill")
+    parser.add_argument("--synthetic", action="store_true", help="use generated bars instead of yfinance (dry run)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="record stage timings and write them here after each warm-up (.json or .prom)")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        metrics().enabled = True
+
+    tickers = read_tickers(args.tickers)
+    source = SyntheticSource() if args.synthetic else None
+    force = args.force
+    while True:
+        store = OHLCVStore(args.store)  # fresh view of the files on every pass
+        cache_date = get_cache_date()
+        if force or store.refreshed_on("1d") != cache_date or any(store.refreshed_on(r) != cache_date for r in FREQS):
+            metadata = None
+            if not args.no_metadata and not args.synthetic:
+                metadata = SymbolIndex(os.path.join(args.store, "metadata.json"))
+                if os.path.exists(SEED_CSV):
+                    metadata.seed(seed_symbols(SEED_CSV))
+            try:
+                report = warm(store, tickers, cache_date, source=source, metadata=metadata)
+                print(f"[{report['finished']}] warmed {len(tickers)} tickers for {cache_date} "
+                      f"({report['daily']} with new bars): {report['seconds']}", flush=True)
+                if args.metrics:
+                    metrics().export(args.metrics)
+            except Exception as exc:
+                print(f"[{datetime.now(IST):%Y-%m-%d %H:%M}] warm-up for {cache_date} failed: {exc!r}", flush=True)
+                if args.once:
+                    raise SystemExit(1)
+                time.sleep(RETRY_SECONDS)
+                continue
+            force = False
+        elif args.once:
+            print(f"Store already current for {cache_date}", flush=True)
+        if args.once:
+            return
+        time.sleep(seconds_until_cutoff() + 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Live gainers, losers and most-active names ranked across the universe.
+
+The Gainers/Losers page used to chart whatever a hand-dropped ``T20-GL-*``
+CSV listed, which is stale as soon as it is written. ``Ranking`` reduces the
+latest session of the shared intraday panel to one row per ticker — % change
+against the previous daily close, volume and turnover — and answers "top k
+by X" with ``np.argpartition`` (O(n)) plus a sort of the k winners only, so
+it can be rebuilt on every refresh.
+
+The intraday panel itself is shared: the NSE 500 Live Charts page publishes
+its panel under ``LIVE_PANEL`` after every refresh, and ``live_panel`` only
+polls the store itself when nobody has refreshed it recently.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.fetch import IST
+from core.indicators import carry_indicators, ffill
+from core.instrument import metrics
+from core.panel import MarketPanel, panels
+from core.store import ohlcv_store
+
+LIVE_PANEL = ("1m", "live")
+DAILY_PANEL = ("1d", "2y")
+TOP_K = 20
+COLUMNS = ("last", "prev_close", "pct_change", "volume", "turnover")
+
+
+def _local(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """Naive IST timestamps, whether the bars came from the store or a page's prepared panel."""
+    return index if index.tz is None else index.tz_convert(IST).tz_localize(None)
+
+
+def top_k(values: np.ndarray, k: int = TOP_K, descending: bool = True) -> np.ndarray:
+    """Row positions of the ``k`` largest (or smallest) values, best first; NaN never ranks."""
+    rows = np.flatnonzero(~np.isnan(values))
+    k = min(k, len(rows))
+    if k == 0:
+        return rows[:0]
+    keys = -values[rows] if descending else values[rows]
+    if k < len(rows):
+        rows = rows[np.argpartition(keys, k - 1)[:k]]
+        keys = -values[rows] if descending else values[rows]
+    return rows[np.argsort(keys, kind="stable")]
+
+
+class Ranking:
+    """One row per ticker of the latest session, with top-k lookups by any column."""
+
+    def __init__(self, tickers: list[str], columns: dict[str, np.ndarray], session: pd.Timestamp | None):
+        self.tickers = np.asarray(tickers, dtype=object)
+        self.columns = columns
+        self.session = session
+
+    @classmethod
+    def from_panels(cls, intraday: MarketPanel, daily: MarketPanel | None = None) -> "Ranking":
+        """Rank the last session in ``intraday`` against the closes in ``daily``.
+
+        Tickers without a daily close before the session are measured
+        against their first open of the session instead.
+        """
+        with metrics().timer("compute_seconds", stage="ranking"):
+            if not len(intraday) or not len(intraday.index):
+                return cls([], {c: np.empty(0) for c in COLUMNS}, None)
+            days = _local(intraday.index).normalize()
+            session = days[-1]
+            bars = intraday.array[:, :, days == session].astype("float64")
+            close = bars[:, intraday.fields.index("Close")]
+            volume = np.nan_to_num(bars[:, intraday.fields.index("Volume")])
+            first_open = ffill(bars[:, intraday.fields.index("Open")][:, ::-1])[:, -1]
+            last = ffill(close)[:, -1]
+
+            prev_close = np.full(len(intraday), np.nan)
+            if daily is not None and len(daily):
+                before = _local(daily.index).normalize().searchsorted(session, side="left")
+                if before:
+                    closes = ffill(daily.array[:, daily.fields.index("Close"), :before].astype("float64"))[:, -1]
+                    rows = pd.Index(daily.tickers).get_indexer(intraday.tickers)
+                    prev_close = np.where(rows >= 0, closes[rows], np.nan)
+            prev_close = np.where(np.isnan(prev_close), first_open, prev_close)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pct_change = (last / prev_close - 1) * 100
+            columns = {
+                "last": last,
+                "prev_close": prev_close,
+                "pct_change": pct_change,
+                "volume": volume.sum(axis=1),
+                "turnover": np.nansum(close * volume, axis=1),
+            }
+            return cls(intraday.tickers, columns, session)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def top(self, column: str, k: int = TOP_K, descending: bool = True) -> list[str]:
+        return self.tickers[top_k(self.columns[column], k, descending)].tolist()
+
+    def gainers(self, k: int = TOP_K) -> list[str]:
+        rows = top_k(self.columns["pct_change"], k)
+        return self.tickers[rows[self.columns["pct_change"][rows] > 0]].tolist()
+
+    def losers(self, k: int = TOP_K) -> list[str]:
+        rows = top_k(self.columns["pct_change"], k, descending=False)
+        return self.tickers[rows[self.columns["pct_change"][rows] < 0]].tolist()
+
+    def table(self, tickers: list[str] | None = None) -> pd.DataFrame:
+        """The ranked columns plus each ticker's rank (1 = highest) across the universe."""
+        table = pd.DataFrame(self.columns, index=pd.Index(self.tickers, name="Ticker"))
+        for column in ("pct_change", "volume", "turnover"):
+            table[f"{column}_rank"] = table[column].rank(ascending=False, method="min").astype("Int64")
+        return table if tickers is None else table.loc[tickers]
+
+
+def ranking(intraday: MarketPanel) -> Ranking:
+    """The ranking of a published panel against the published daily one (see ``daily_panel``).
+
+    Computed once per daily publish and shared by every session reading
+    ``intraday``; a republished daily panel is ranked against again.
+    """
+    registry = panels()
+    stamp = registry.stamp(DAILY_PANEL)  # read first: a publish in between only costs a recompute
+    daily = registry.get(DAILY_PANEL)
+    return intraday.derived(("ranking", stamp), lambda panel: Ranking.from_panels(panel, daily))
+
+
+_refreshing = threading.Lock()
+
+
+def live_panel(tickers: list[str], max_age: float) -> tuple[MarketPanel, float]:
+    """The shared intraday panel of ``tickers`` and when it was refreshed.
+
+    Polls the store for new minutes only when the published panel is older
+    than ``max_age`` seconds; while another session is polling, the current
+    panel is returned as is.
+    """
+    registry = panels()
+    panel, refreshed = registry.get(LIVE_PANEL), registry.version(LIVE_PANEL) or 0.0
+    if panel is not None and time.time() - refreshed < max_age:
+        return panel, refreshed
+    if not _refreshing.acquire(blocking=panel is None):
+        return panel, refreshed
+    try:
+        store = ohlcv_store()
+        for _ in store.refresh(tickers, "1m", "1d"):
+            pass
+        refreshed = time.time()
+        panel = registry.publish(LIVE_PANEL, MarketPanel.from_frames(store.load(tickers, "1m", "1d")), refreshed)
+        return panel, refreshed
+    finally:
+        _refreshing.release()
+
+
+def daily_panel(tickers: list[str]) -> MarketPanel:
+    """The shared 2y daily panel: the NSE500 Charts and Correlation pages draw it, the ranking
+    takes its previous closes from it. Rebuilt when the daily store is marked refreshed, with
+    the previous panel's indicators extended by the new bars instead of recomputed."""
+    registry, store = panels(), ohlcv_store()
+    previous = registry.get(DAILY_PANEL)
+    panel = registry.get_or_build(DAILY_PANEL, lambda: store.load(tickers, "1d", "2y"),
+                                  version=store.refreshed_on("1d"))
+    if previous is not None and panel is not previous:
+        carry_indicators(previous, panel)
+    return panel
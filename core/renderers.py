@@ -0,0 +1,95 @@
+"""The pages' per-ticker chart renderers, as PNG bytes.
+
+Pages are scripts and cannot be imported, so the functions that draw their
+charts live here; the pages wrap them in ``chart_cache()`` keys and the
+benchmarks time exactly the code the app runs. Every renderer uses the
+Figure API (not pyplot) so grids can pre-render on background threads, and
+imports Matplotlib on the first call only: cached charts never need it.
+"""
+from __future__ import annotations
+
+import pandas as pd
+
+from core.charts import figure_png
+from core.trend import trend_line
+
+
+def trend_color(angle: float) -> str:
+    return "green" if angle > 5 else "red" if angle < -5 else "gray"
+
+
+def trend_emoji(angle: float) -> str:
+    if angle >= 55: return "🚀"
+    if angle >= 35: return "📈↑↑"
+    if angle >= 15: return "📈↑"
+    if angle <= -55: return "💥"
+    if angle <= -35: return "📉↓↓"
+    if angle <= -15: return "📉↓"
+    return "➡️"
+
+
+def daily_chart(symbol: str, df: pd.DataFrame, name: str, overlays: dict | None = None) -> bytes:
+    """Close over the period with optional indicator lines (daily and weekly/monthly pages)."""
+    from matplotlib.artist import setp
+    from matplotlib.dates import DateFormatter, MonthLocator
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(6, 3))
+    ax = fig.subplots()
+    ax.plot(df.index, df["Close"], linewidth=1)
+    for n, (label, lines) in enumerate((overlays or {}).items(), start=1):
+        for line in lines:
+            ax.plot(df.index, line, linewidth=0.8, alpha=0.8, color=f"C{n}", label=label)
+            label = "_nolegend_"  # one legend entry per overlay (Bollinger has two lines)
+    if overlays:
+        ax.legend(fontsize=7, loc="upper left")
+    ax.set_title(f"{symbol} — {name}", fontsize=11)
+    ax.set_ylabel("Close", fontsize=9)
+    ax.xaxis.set_major_locator(MonthLocator(interval=3))
+    ax.xaxis.set_major_formatter(DateFormatter("%b %Y"))
+    setp(ax.get_xticklabels(), rotation=45, ha="right", fontsize=7)
+    fig.tight_layout()
+    return figure_png(fig)
+
+
+def session_chart(symbol: str, df: pd.DataFrame) -> bytes:
+    """One session of 1-minute closes (Top Gainers/Losers page)."""
+    from matplotlib.dates import DateFormatter, MinuteLocator
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(6, 3))
+    ax = fig.subplots()
+    ax.plot(df.index, df["Close"], lw=1)
+    ax.set_title(symbol)
+    ax.xaxis.set_major_locator(MinuteLocator(5))
+    ax.xaxis.set_major_formatter(DateFormatter("%H:%M"))
+    ax.tick_params(labelbottom=False)
+    fig.tight_layout()
+    return figure_png(fig)
+
+
+def live_chart(ticker: str, df: pd.DataFrame, angle: float, trend: pd.Series | None = None) -> bytes:
+    """Intraday close with its fitted trend line and angle (NSE 500 Live Charts page)."""
+    from matplotlib.artist import setp
+    from matplotlib.dates import DateFormatter, MinuteLocator
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 4.5))
+    ax = fig.subplots()
+    # Fit reused from the batched trend pass
+    line = trend_line(df, trend) if trend is not None else None
+    if line is not None:
+        ax.plot(df.index, line, "--", color="orange", alpha=0.7, linewidth=2, label="Trend Line")
+    color = trend_color(angle)
+    ax.plot(df.index, df["Close"], color=color, linewidth=2.5, label="Price")
+    ax.annotate(f"Angle: {angle:.1f}°", xy=(0.02, 0.95), xycoords="axes fraction",
+                bbox=dict(boxstyle="round", alpha=0.2))
+    ax.set_title(f"{trend_emoji(angle)} {ticker} ({angle:.1f}°)", fontsize=12, pad=12, color=color)
+    ax.set_ylabel("Price", fontsize=10)
+    ax.xaxis.set_major_locator(MinuteLocator(byminute=[0, 30]))
+    ax.xaxis.set_major_formatter(DateFormatter("%H:%M"))
+    setp(ax.get_xticklabels(), rotation=45, ha="right", fontsize=9)
+    ax.grid(alpha=0.2)
+    ax.legend()
+    fig.tight_layout()
+    return figure_png(fig)
@@ -0,0 +1,175 @@
+"""Replay page 5's trend classifier over every stored day of 1-minute bars.
+
+    python -m core.replay                        # all stored days, default thresholds
+    python -m core.replay --steep 60 --damping 0.5 --days 20
+
+For each day and checkpoint (minutes after the 09:15 open) the whole
+universe is fitted at once with ``batch_trends`` on the bars so far, which
+is what the live page would have shown at that time, and forward returns are
+measured from the checkpoint's close. Days run in a process pool.
+
+Only the undamped slopes and forward returns are cached, one parquet file
+per day under ``data/store/replay/``; angles, damping and buckets are
+applied afterwards, so re-running with other thresholds reads the cache and
+costs well under a second.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core.fetch import IST
+from core.instrument import metrics
+from core.store import STORE_DIR, OHLCVStore
+from core.trend import MIN_POINTS, STEEP_ANGLE, STEEP_DAMPING, TREND_BUCKETS, batch_trends, damp_angle
+from core.universe import TICKERS_FILE, read_tickers
+
+CACHE_DIR = "data/store/replay"
+SESSION_START = pd.Timedelta(hours=9, minutes=15)
+CHECKPOINTS = (30, 60, 120, 180, 240)  # minutes after the open
+HORIZONS = (15, 60)                    # minutes ahead; the day's close is always added
+
+
+def closes_by_day(frames: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """``{day: minutes x tickers closes}`` in IST wall time, from 09:00 as on page 5."""
+    series = {}
+    for ticker, df in frames.items():
+        if df is None or df.empty:
+            continue
+        index = df.index.tz_convert(IST).tz_localize(None) if df.index.tz is not None else df.index
+        series[ticker] = pd.Series(df["Close"].to_numpy(dtype="float64"), index=index)
+    if not series:
+        return {}
+    close = pd.concat(series, axis=1, sort=True)
+    close = close[close.index - close.index.normalize() >= pd.Timedelta(hours=9)]
+    return {f"{day:%Y-%m-%d}": group for day, group in close.groupby(close.index.normalize())}
+
+
+def replay_day(close: pd.DataFrame, checkpoints=CHECKPOINTS, horizons=HORIZONS) -> pd.DataFrame:
+    """Slope and forward returns per (checkpoint, ticker) for one day's closes."""
+    index = close.index
+    values = close.to_numpy()
+    filled = close.ffill().to_numpy()
+    minutes = np.asarray((index - index.normalize() - SESSION_START).total_seconds() // 60)
+    last = filled[-1]
+    rows = []
+    for checkpoint in checkpoints:
+        upto = int(np.searchsorted(minutes, checkpoint))  # bars before the checkpoint
+        if upto < MIN_POINTS:
+            continue
+        fit = batch_trends(index[:upto], values[:upto])
+        base = filled[upto - 1]
+        frame = {"checkpoint": checkpoint, "ticker": close.columns, "slope": fit["slope"], "n": fit["n"]}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for horizon in horizons:
+                ahead = int(np.searchsorted(minutes, checkpoint + horizon))
+                frame[f"fwd_{horizon}"] = (filled[ahead - 1] / base - 1) * 100 if ahead < len(minutes) else np.nan
+            frame["fwd_close"] = (last / base - 1) * 100
+        rows.append(pd.DataFrame(frame))
+    if not rows:
+        return pd.DataFrame()
+    out = pd.concat(rows, ignore_index=True)
+    return out[out["n"] > 0].reset_index(drop=True)
+
+
+def _cache_path(root: str, day: str, close: pd.DataFrame, checkpoints, horizons) -> str:
+    # A day still being filled in (or another universe) gets a new file
+    key = f"{list(close.columns)}|{int(close.notna().sum().sum())}|{checkpoints}|{horizons}"
+    return os.path.join(root, f"{day}-{zlib.crc32(key.encode()):08x}.parquet")
+
+
+def _replay_cached(args) -> pd.DataFrame:
+    day, close, path, checkpoints, horizons = args
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    result = replay_day(close, checkpoints, horizons)
+    tmp = f"{path}.tmp"
+    result.to_parquet(tmp)
+    os.replace(tmp, path)
+    return result
+
+
+def replay(frames: dict[str, pd.DataFrame], days: int | None = None, workers: int | None = None,
+           checkpoints=CHECKPOINTS, horizons=HORIZONS, root: str = CACHE_DIR) -> pd.DataFrame:
+    """Slopes and forward returns for every stored day (the last ``days`` if given)."""
+    by_day = closes_by_day(frames)
+    chosen = sorted(by_day)[-days:] if days else sorted(by_day)
+    if not chosen:
+        return pd.DataFrame()
+    os.makedirs(root, exist_ok=True)
+    jobs = [(day, by_day[day], _cache_path(root, day, by_day[day], checkpoints, horizons), checkpoints, horizons)
+            for day in chosen]
+    with metrics().timer("compute_seconds", stage="replay"):
+        missing = [job for job in jobs if not os.path.exists(job[2])]
+        if len(missing) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_replay_cached, missing))
+        results = [_replay_cached(job).assign(day=job[0]) for job in jobs]
+    return pd.concat(results, ignore_index=True)
+
+
+def classify(slopes: pd.DataFrame, steep: float = STEEP_ANGLE, damping: float = STEEP_DAMPING,
+             min_points: int = MIN_POINTS) -> pd.Series:
+    """Page 5's angle for replayed slopes, under the given thresholds."""
+    angle = damp_angle(np.degrees(np.arctan(slopes["slope"].to_numpy())), steep, damping)
+    return pd.Series(np.where(slopes["n"] >= min_points, angle, 0.0), index=slopes.index, name="angle")
+
+
+def bucket_report(slopes: pd.DataFrame, buckets: dict = TREND_BUCKETS, **thresholds) -> pd.DataFrame:
+    """Per trend bucket: share of ticker-checkpoints, hit rate and forward returns.
+
+    The hit rate is the share of forward returns with the bucket's sign
+    (up buckets should rise, down buckets fall); sideways has none.
+    """
+    angle = classify(slopes, **thresholds)
+    forwards = [c for c in slopes.columns if c.startswith("fwd_")]
+    rows = []
+    for label, bucket in buckets.items():
+        if bucket is None:
+            continue
+        lo, hi, inclusive = bucket
+        picked = slopes[angle.between(lo, hi, inclusive=inclusive)]
+        direction = np.sign(np.clip(lo, -90, 90) + np.clip(hi, -90, 90))
+        row = {"bucket": label, "count": len(picked), "share": len(picked) / len(slopes) if len(slopes) else 0.0}
+        for col in forwards:
+            returns = picked[col].dropna()
+            row[f"mean_{col}"] = returns.mean()
+            row[f"hit_{col}"] = (np.sign(returns) == direction).mean() if direction and len(returns) else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows).set_index("bucket")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", default=TICKERS_FILE)
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--cache", default=CACHE_DIR)
+    parser.add_argument("--days", type=int, help="only the last N stored days")
+    parser.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=list(CHECKPOINTS),
+                        help="minutes after the open to classify at")
+    parser.add_argument("--steep", type=float, default=STEEP_ANGLE, help="angle above which trends are damped")
+    parser.add_argument("--damping", type=float, default=STEEP_DAMPING)
+    parser.add_argument("--min-points", type=int, default=MIN_POINTS)
+    parser.add_argument("--out", help="also write the report here (.csv)")
+    args = parser.parse_args(argv)
+
+    frames = OHLCVStore(args.store).load(read_tickers(args.tickers), "1m")
+    slopes = replay(frames, args.days, args.workers, tuple(args.checkpoints), root=args.cache)
+    if slopes.empty:
+        raise SystemExit("No stored 1-minute bars to replay")
+    report = bucket_report(slopes, steep=args.steep, damping=args.damping, min_points=args.min_points)
+    print(f"{slopes['day'].nunique()} days, {slopes['ticker'].nunique()} tickers, {len(slopes)} ticker-checkpoints")
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.precision", 3):
+        print(report)
+    if args.out:
+        report.to_csv(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Weekly and monthly OHLCV bars derived from the stored daily bars.
+
+Work happens on a *panel*: one dates x tickers DataFrame per field, so each
+aggregation runs once for the whole universe. NSE weeks run Monday to Sunday,
+which keeps the occasional special Saturday session (e.g. Budget day) in the
+week it belongs to; bars are labelled with the period start like ``yf``'s
+``1wk`` bars.
+"""
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.fetch import FIELDS
+from core.instrument import metrics
+
+AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+FREQS = {"W": "W-SUN", "M": "M"}
+
+
+def build_panel(frames: dict[str, pd.DataFrame], fields: list[str] = FIELDS) -> dict[str, pd.DataFrame]:
+    """Align per-ticker frames into one dates x tickers frame per field."""
+    frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return {}
+    return {f: pd.concat({t: df[f] for t, df in frames.items()}, axis=1).sort_index() for f in fields}
+
+
+def split_panel(panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """Inverse of ``build_panel``; rows without a close are dropped."""
+    if not panel:
+        return {}
+    fields = list(panel)
+    close = panel["Close"]
+    values = np.stack([panel[f].to_numpy(dtype="float64") for f in fields], axis=2)
+    valid = close.notna().to_numpy()
+    out = {}
+    for i, ticker in enumerate(close.columns):
+        rows = valid[:, i]
+        if rows.any():
+            out[ticker] = pd.DataFrame(values[rows, i, :], index=close.index[rows], columns=fields)
+    return out
+
+
+@metrics().timed("compute_seconds", stage="resample")
+def resample_panel(panel: dict[str, pd.DataFrame], rule: str = "W") -> dict[str, pd.DataFrame]:
+    close = panel["Close"]
+    keys = close.index.to_period(FREQS[rule])
+    traded = close.notna().groupby(keys).any()
+    out = {}
+    for field, frame in panel.items():
+        bars = frame.groupby(keys).agg(AGG[field]).where(traded)
+        bars.index = bars.index.start_time
+        bars.index.name = "Date"
+        out[field] = bars
+    return out
+
+
+class Resampler:
+    """Keeps the resampled panel and only recomputes periods touched by new days.
+
+    The period holding the previously last daily bar is always recomputed,
+    since that bar may have been replaced by a later (complete) download.
+    """
+
+    def __init__(self, rule: str = "W"):
+        self.rule = rule
+        self.bars: dict[str, pd.DataFrame] = {}
+        self._first = self._last = self._columns = None
+        self._lock = threading.Lock()
+
+    def update(self, daily: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        panel = build_panel(daily)
+        if not panel:
+            return {}
+        idx, columns = panel["Close"].index, panel["Close"].columns
+        with self._lock:
+            if not self.bars or not columns.equals(self._columns) or idx[0] < self._first:
+                self.bars = resample_panel(panel, self.rule)
+            else:
+                since = self._last.to_period(FREQS[self.rule]).start_time
+                start = idx[0].to_period(FREQS[self.rule]).start_time
+                fresh = resample_panel({f: p[p.index >= since] for f, p in panel.items()}, self.rule)
+                self.bars = {
+                    f: pd.concat([old[(old.index >= start) & (old.index < since)], fresh[f]])
+                    for f, old in self.bars.items()
+                }
+            self._first, self._last, self._columns = idx[0], idx[-1], columns
+            return self.bars
+
+    def frames(self, daily: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        return split_panel(self.update(daily))
@@ -0,0 +1,199 @@
+"""Shared asyncio scheduler for all OHLCV downloads.
+
+Batches from every page and session go through one event loop running on a
+background thread, so the process as a whole keeps to one concurrency cap
+and one token-bucket request rate. A batch that raises, times out or comes
+back with symbols missing (how ``yf.download`` reports throttled tickers)
+is requeued for just those symbols with exponential backoff and jitter;
+only symbols that still fail after ``retries`` attempts are given up on.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import pandas as pd
+
+from core.fetch import BATCH_SIZE, Source, YFinanceSource, chunked
+from core.instrument import metrics
+from core.singleton import lazy_singleton
+
+MAX_CONCURRENCY = 4
+RATE = float(os.environ.get("FETCH_RATE", 2.0))  # requests per second
+BURST = 4
+RETRIES = 3
+BACKOFF = 1.0       # seconds before the first retry ...
+MAX_BACKOFF = 30.0  # ... doubling up to this
+TIMEOUT = 60.0      # per request
+STATS_WINDOW = 60.0  # seconds of history behind the live rates
+
+
+class TokenBucket:
+    """``rate`` tokens per second with room for ``capacity`` in a burst."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FetchStats:
+    """Lifetime counters plus a sliding window for live throughput/error rate."""
+
+    def __init__(self, window: float = STATS_WINDOW):
+        self.window = window
+        self.requests = self.errors = self.timeouts = self.retries = 0
+        self.tickers_ok = self.tickers_failed = 0
+        self._events: deque[tuple[float, int, bool]] = deque()  # (time, tickers, ok)
+        self._lock = threading.Lock()
+
+    def record(self, tickers: int, ok: bool, timeout: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            self.errors += not ok
+            self.timeouts += timeout
+            self._events.append((now, tickers if ok else 0, ok))
+            while self._events and self._events[0][0] < now - self.window:
+                self._events.popleft()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            recent = [e for e in self._events if e[0] >= now - self.window]
+            span = max(now - recent[0][0], 1.0) if recent else self.window
+            failed = sum(1 for e in recent if not e[2])
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "retries": self.retries,
+                "tickers_ok": self.tickers_ok,
+                "tickers_failed": self.tickers_failed,
+                "tickers_per_min": sum(e[1] for e in recent) / span * 60,
+                "error_rate": failed / len(recent) if recent else 0.0,
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"📶 Fetch: {s['tickers_per_min']:.0f} tickers/min, {s['error_rate']:.0%} errors | "
+                f"{s['requests']} requests, {s['retries']} retries, {s['tickers_failed']} given up")
+
+
+class FetchScheduler:
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, rate: float = RATE, burst: float = BURST,
+                 retries: int = RETRIES, backoff: float = BACKOFF, max_backoff: float = MAX_BACKOFF,
+                 timeout: float = TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.stats = FetchStats()
+        self._rate, self._burst = rate, burst
+        # Timed-out calls cannot be cancelled, so leave headroom for stragglers
+        self._pool = ThreadPoolExecutor(max_workers=2 * max_concurrency, thread_name_prefix="fetch")
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True, name="fetch-scheduler").start()
+        self._bucket: TokenBucket | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    def _delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def _call(self, source: Source, batch: list[str], kwargs: dict) -> dict[str, pd.DataFrame]:
+        if self._bucket is None:
+            self._bucket = TokenBucket(self._rate, self._burst)
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        await self._bucket.acquire()
+        async with self._slots:
+            call = self._loop.run_in_executor(self._pool, self._timed_call, source, batch, kwargs)
+            return await asyncio.wait_for(call, self.timeout)
+
+    @staticmethod
+    def _timed_call(source: Source, batch: list[str], kwargs: dict) -> dict[str, pd.DataFrame]:
+        start = time.perf_counter()
+        frames = source(batch, **kwargs)
+        m = metrics()
+        if m.enabled:
+            # One round trip serves the whole batch; its share is each ticker's latency
+            elapsed = time.perf_counter() - start
+            interval = kwargs.get("interval", "1d")
+            m.observe("fetch_batch_seconds", elapsed, interval=interval)
+            m.observe("fetch_ticker_seconds", elapsed / len(batch), n=len(batch), interval=interval)
+        return frames
+
+    async def _run(self, tickers: list[str], source: Source, batch_size: int, kwargs: dict,
+                   out: queue.Queue) -> None:
+        async def batch_job(batch: list[str], attempt: int) -> None:
+            if attempt:
+                await asyncio.sleep(self._delay(attempt - 1))
+            try:
+                frames = await self._call(source, batch, kwargs)
+                self.stats.record(len(frames), ok=True)
+            except Exception as exc:
+                frames = {}
+                self.stats.record(0, ok=False, timeout=isinstance(exc, asyncio.TimeoutError))
+            got = [t for t in batch if t in frames]
+            missing = [t for t in batch if t not in frames]
+            self.stats.tickers_ok += len(got)
+            if got:
+                out.put((got, {t: frames[t] for t in got}))
+            if not missing:
+                return
+            if attempt < self.retries:
+                self.stats.retries += 1
+                jobs.append(asyncio.ensure_future(batch_job(missing, attempt + 1)))
+            else:
+                self.stats.tickers_failed += len(missing)
+                out.put((missing, {}))
+
+        jobs = [asyncio.ensure_future(batch_job(batch, 0)) for batch in chunked(tickers, batch_size)]
+        try:
+            while jobs:
+                await jobs.pop(0)
+        finally:
+            out.put(None)
+
+    def fetch(self, tickers: list[str], source: Source | None = None, batch_size: int = BATCH_SIZE,
+              **kwargs) -> Iterator[tuple[list[str], dict[str, pd.DataFrame]]]:
+        """Download ``tickers`` and yield ``(symbols, frames)`` as results land.
+
+        Every symbol is yielded exactly once: with its frame once a request
+        returns it, or with an empty dict after the last retry failed.
+        """
+        out: queue.Queue = queue.Queue()
+        source = source or YFinanceSource()
+        asyncio.run_coroutine_threadsafe(self._run(list(tickers), source, batch_size, kwargs, out), self._loop)
+        while (item := out.get()) is not None:
+            yield item
+
+    def summary(self) -> str:
+        return self.stats.summary()
+
+
+@lazy_singleton
+def fetch_scheduler() -> FetchScheduler:
+    """The one rate limit and retry policy all yfinance downloads go through."""
+    scheduler = FetchScheduler()
+    metrics().collect("fetch", scheduler.stats.stats)
+    return scheduler
@@ -0,0 +1,138 @@
+"""Columnar per-ticker snapshot and an indexed screener over it.
+
+``snapshot_table`` reduces the loaded bars to one row per ticker (last
+close, first letter, returns, volatility and, when given, trend angle). It
+is built once per data refresh; the sidebar filters are then answered by
+``Screener`` with sorted-array range lookups and boolean masks instead of
+walking every ticker's frame on each rerun. With ``indicators=True`` the
+latest RSI, ATR, Bollinger %B, SMA gap, 20-bar return and volatility from
+``core.indicators`` become filterable columns too.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from core.indicators import IndicatorSet, universe_indicators
+from core.instrument import metrics
+from core.panel import MarketPanel
+from core.resample import build_panel
+
+RETURN_WINDOWS = {
+    "1W": pd.DateOffset(weeks=1),
+    "1M": pd.DateOffset(months=1),
+    "3M": pd.DateOffset(months=3),
+    "1Y": pd.DateOffset(years=1),
+}
+VOL_BARS = 60  # bar-to-bar changes used for volatility
+
+INCLUSIVE = {"both": (True, True), "left": (True, False), "right": (False, True), "neither": (False, False)}
+
+
+def snapshot_table(frames: Mapping[str, pd.DataFrame], angles: dict[str, float] | None = None,
+                   windows: dict[str, pd.DateOffset] = RETURN_WINDOWS, indicators: bool = False) -> pd.DataFrame:
+    """One row per ticker with data, in the order of ``frames``.
+
+    Returns are in % against the last close on or before the window start
+    (NaN when the history is shorter); ``change`` covers all loaded bars and
+    ``volatility`` is the standard deviation of the last ``VOL_BARS``
+    bar-to-bar % changes.
+    """
+    if isinstance(frames, MarketPanel):
+        close = frames.field("Close")  # already aligned, no per-ticker work
+    else:
+        close = build_panel(frames, ["Close"]).get("Close")
+    if close is None or close.empty:
+        extra = IndicatorSet([]).latest().columns if indicators else []
+        return pd.DataFrame(columns=["close", "letter", "change", "volatility", *windows, "angle", *extra])
+    tickers = list(close.columns)
+    index = close.index
+    values = close.ffill().to_numpy(dtype="float64")
+    last = values[-1]
+    first = close.bfill().to_numpy(dtype="float64")[0]
+
+    table = {"close": last, "letter": np.array([t[:1].upper() for t in tickers])}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        table["change"] = (last / first - 1) * 100
+        recent = values[-VOL_BARS - 1:]
+        table["volatility"] = np.nanstd(np.diff(recent, axis=0) / recent[:-1], axis=0) * 100 if len(recent) > 1 \
+            else np.full(len(tickers), np.nan)
+        for label, offset in windows.items():
+            row = index.searchsorted(index[-1] - offset, side="right") - 1
+            base = values[row] if row >= 0 else np.full(len(tickers), np.nan)
+            table[label] = (last / base - 1) * 100
+    angles = angles or {}
+    table["angle"] = np.array([angles.get(t, np.nan) for t in tickers], dtype="float64")
+    table = pd.DataFrame(table, index=pd.Index(tickers, name="Ticker"))
+    if indicators:
+        table = table.join(universe_indicators(frames).latest())
+    return table
+
+
+class Screener:
+    """Range and equality queries over a snapshot table.
+
+    Numeric columns get a sorted index (built on first use), so a range is
+    two ``searchsorted`` calls; queries return boolean masks that combine
+    with ``&``/``|`` and are turned into tickers with ``select``.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table
+        self.tickers = table.index.to_numpy()
+        self._columns = {c: table[c].to_numpy() for c in table.columns}
+        self._sorted: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame], angles: dict[str, float] | None = None,
+                    windows: dict[str, pd.DateOffset] = RETURN_WINDOWS, indicators: bool = False) -> "Screener":
+        with metrics().timer("compute_seconds", stage="screener"):
+            return cls(snapshot_table(frames, angles, windows, indicators))
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def all(self) -> np.ndarray:
+        return np.ones(len(self.tickers), dtype=bool)
+
+    def _index(self, column: str) -> tuple[np.ndarray, np.ndarray]:
+        if column not in self._sorted:
+            values = self._columns[column].astype("float64")
+            order = np.argsort(values, kind="stable")  # NaN sorts last
+            self._sorted[column] = order, values[order]
+        return self._sorted[column]
+
+    def between(self, column: str, lo: float = -np.inf, hi: float = np.inf,
+                inclusive: str = "both") -> np.ndarray:
+        """Mask of rows with ``lo <= column <= hi`` (bounds as in ``pd.Series.between``)."""
+        order, values = self._index(column)
+        left, right = INCLUSIVE[inclusive]
+        start = values.searchsorted(lo, side="left" if left else "right")
+        stop = values.searchsorted(hi, side="right" if right else "left")
+        mask = np.zeros(len(self.tickers), dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
+
+    def equals(self, column: str, value) -> np.ndarray:
+        return self._columns[column] == value
+
+    def column(self, column: str) -> dict[str, float]:
+        """``ticker -> value`` mapping, handy as a sort key."""
+        return dict(zip(self.tickers, self._columns[column]))
+
+    def select(self, mask: np.ndarray | None = None, by: str | None = None,
+               descending: bool = False, key=None) -> list[str]:
+        """Tickers in ``mask``, in table order or sorted by column ``by``.
+
+        ``key`` is an optional vectorized transform of the sort column, e.g.
+        ``np.abs`` to rank by magnitude.
+        """
+        rows = np.flatnonzero(self.all() if mask is None else mask)
+        if by is not None:
+            keys = self._columns[by][rows]
+            if key is not None:
+                keys = key(keys)
+            rows = rows[np.argsort(-keys if descending else keys, kind="stable")]
+        return self.tickers[rows].tolist()
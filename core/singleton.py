@@ -0,0 +1,29 @@
+"""Process-wide objects built on first use.
+
+Streamlit runs every session's script in one process, so caches, registries
+and the fetch scheduler are built once and shared: a page calling the
+factory on every rerun gets the same object back.
+"""
+from __future__ import annotations
+
+import functools
+import threading
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def lazy_singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """``factory()`` run on the first call only (under a lock); later calls return its result."""
+    lock = threading.Lock()
+    built: list[T] = []
+
+    @functools.wraps(factory)
+    def instance() -> T:
+        if not built:
+            with lock:
+                if not built:
+                    built.append(factory())
+        return built[0]
+
+    return instance
@@ -0,0 +1,364 @@
+"""Persistent on-disk OHLCV store shared by the chart pages.
+
+One Parquet file per ticker and interval under ``data/store/<interval>/``;
+intraday bars get one file per ticker and session instead
+(``data/store/1m/<ticker>/<date>.parquet``), so a poll rewrites only today's.
+``refresh`` only downloads the bars after each ticker's last stored timestamp
+(re-fetching that last bar, which may have been partial) and appends them;
+``history.json`` records which tickers already had their full period fetched.
+Derived whole-universe panels (e.g. weekly bars) live under
+``data/store/panels/``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import datetime, time, timedelta
+from typing import Iterator
+
+import pandas as pd
+
+from core.fetch import FIELDS, IST, PERIODS, Source, YFinanceSource
+from core.instrument import metrics
+from core.scheduler import fetch_scheduler
+from core.singleton import lazy_singleton
+
+STORE_DIR = "data/store"
+# Daily history kept on disk; long enough to derive the 5y weekly view
+DAILY_PERIOD = "5y"
+# Daily bars are final after the close; the cache date rolls over at this time
+CUTOFF = time(15, 45)
+# yfinance serves 1m bars for the last 30 days, at most 8 days per request, so an
+# incremental fetch from an older last bar fails; those tickers get a fresh ``period``
+FETCH_WINDOW = {"1m": pd.Timedelta(days=7)}
+# Intraday history kept on disk (the trend replay reads it), trimmed on every append
+RETENTION = {"1m": pd.Timedelta(days=30)}
+# Stored one file per session: refresh cost follows the new bars, not the retained history
+PARTITIONED = {"1m"}
+STORE_CACHE_MB = float(os.environ.get("STORE_CACHE_MB", 64))
+
+
+def get_cache_date(now: datetime | None = None) -> str:
+    """Trading date whose daily bars should be in the store (IST)."""
+    now = now or datetime.now(IST)
+    cutoff = now.replace(hour=CUTOFF.hour, minute=CUTOFF.minute, second=0, microsecond=0)
+    return now.date().isoformat() if now >= cutoff else (now.date() - timedelta(days=1)).isoformat()
+
+
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[[c for c in FIELDS if c in df.columns]].astype("float64")
+    df.columns = list(df.columns)
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    df.index.name = "Date"
+    return df
+
+
+def _sessions(index: pd.DatetimeIndex) -> pd.Index:
+    """The IST trading date of each bar, as partition names."""
+    if index.tz is not None:
+        index = index.tz_convert(IST)
+    return index.strftime("%Y-%m-%d")
+
+
+def _covers(fetched: str | None, period: str) -> bool:
+    """Whether a full fetch of ``fetched`` includes all of ``period`` (``PERIODS`` is shortest first)."""
+    order = list(PERIODS)
+    return fetched in PERIODS and period in PERIODS and order.index(fetched) >= order.index(period)
+
+
+class FrameCache:
+    """Thread-safe LRU of stored frames, as float32, bounded by total bytes.
+
+    Entries carry their file's mtime, so files rewritten by another process
+    (e.g. the prefetch worker) are read again instead of served stale.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[tuple, tuple[float, pd.DataFrame]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: tuple, mtime: float) -> pd.DataFrame | None:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry[0] != mtime:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, mtime: float, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.astype("float32")
+        with self._lock:
+            self._discard(key)
+            self._items[key] = (mtime, df)
+            self.nbytes += df.memory_usage(index=True).sum()
+            while self.nbytes > self.max_bytes and len(self._items) > 1:
+                _, (_, dropped) = self._items.popitem(last=False)
+                self.nbytes -= dropped.memory_usage(index=True).sum()
+                self.evictions += 1
+        return df
+
+    def discard(self, key: tuple) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: tuple) -> None:
+        entry = self._items.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1].memory_usage(index=True).sum()
+
+    def stats(self) -> dict:
+        return {"items": len(self._items), "mb": self.nbytes / 2**20, "budget_mb": self.max_bytes / 2**20,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class OHLCVStore:
+    def __init__(self, root: str = STORE_DIR, cache_mb: float = STORE_CACHE_MB):
+        self.root = root
+        self.frames = FrameCache(int(cache_mb * 2**20))
+        self._lock = threading.Lock()
+
+    # -------------------- Files --------------------
+    def path(self, ticker: str, interval: str, session: str | None = None) -> str:
+        if interval in PARTITIONED:
+            return os.path.join(self.root, interval, ticker, f"{session}.parquet")
+        return os.path.join(self.root, interval, f"{ticker}.parquet")
+
+    def sessions(self, ticker: str, interval: str) -> list[str]:
+        """Stored session dates of a partitioned ``interval``, oldest first."""
+        try:
+            names = os.listdir(os.path.join(self.root, interval, ticker))
+        except OSError:
+            return []
+        return sorted(name[:-len(".parquet")] for name in names if name.endswith(".parquet"))
+
+    def _mtime(self, path: str) -> float | None:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def read(self, ticker: str, interval: str, start: pd.Timestamp | None = None) -> pd.DataFrame | None:
+        """Stored bars of ``ticker``; of a partitioned interval, only the sessions from ``start`` on."""
+        if interval not in PARTITIONED:
+            return self._read_file(ticker, interval)
+        sessions = self.sessions(ticker, interval)
+        if start is not None:
+            sessions = [s for s in sessions if s >= _sessions(pd.DatetimeIndex([start]))[0]]
+        frames = [df for df in (self._read_file(ticker, interval, s) for s in sessions) if df is not None]
+        if len(frames) > 1:
+            return pd.concat(frames)
+        return frames[0] if frames else None
+
+    def _read_file(self, ticker: str, interval: str, session: str | None = None) -> pd.DataFrame | None:
+        key = (ticker, interval, session)
+        path = self.path(ticker, interval, session)
+        mtime = self._mtime(path)
+        if mtime is None:
+            return None
+        df = self.frames.get(key, mtime)
+        if df is not None:
+            metrics().count("store_frame_cache", result="hit")
+            return df
+        metrics().count("store_frame_cache", result="miss")
+        return self.frames.put(key, mtime, pd.read_parquet(path))
+
+    def _read_exact(self, ticker: str, interval: str, session: str | None = None) -> pd.DataFrame | None:
+        """The stored float64 bars, bypassing the float32 cache (for rewriting the file)."""
+        path = self.path(ticker, interval, session)
+        return pd.read_parquet(path) if os.path.exists(path) else None
+
+    def write(self, ticker: str, interval: str, df: pd.DataFrame, session: str | None = None) -> pd.DataFrame:
+        df = _clean(df)
+        path = self.path(ticker, interval, session)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        return self.frames.put((ticker, interval, session), self._mtime(path), df)
+
+    def append(self, ticker: str, interval: str, new: pd.DataFrame) -> None:
+        """Merge ``new`` bars into the stored series; overlapping bars are replaced.
+
+        Of a partitioned interval only the sessions ``new`` touches are
+        rewritten, and sessions older than ``RETENTION`` are deleted.
+        """
+        new = _clean(new)
+        with self._lock, metrics().timer("store_write_seconds", interval=interval):
+            if interval not in PARTITIONED:
+                old = self._read_exact(ticker, interval)
+                if old is not None and not old.empty:
+                    new = pd.concat([old, new])
+                self.write(ticker, interval, new)
+                return
+            for session, bars in new.groupby(_sessions(new.index)):
+                old = self._read_exact(ticker, interval, session)
+                if old is not None and not old.empty:
+                    bars = pd.concat([old, bars])
+                self.write(ticker, interval, bars, session)
+            self._trim(ticker, interval)
+
+    def _trim(self, ticker: str, interval: str) -> None:
+        sessions = self.sessions(ticker, interval)
+        if interval not in RETENTION or not sessions:
+            return
+        cutoff = _sessions(pd.DatetimeIndex([pd.Timestamp(sessions[-1]) - RETENTION[interval]]))[0]
+        for session in sessions:
+            if session > cutoff:
+                break
+            os.remove(self.path(ticker, interval, session))
+            self.frames.discard((ticker, interval, session))
+
+    def last_timestamp(self, ticker: str, interval: str) -> pd.Timestamp | None:
+        if interval in PARTITIONED:
+            sessions = self.sessions(ticker, interval)
+            df = self._read_file(ticker, interval, sessions[-1]) if sessions else None
+        else:
+            df = self.read(ticker, interval)
+        return None if df is None or df.empty else df.index[-1]
+
+    def load(self, tickers: list[str], interval: str, period: str | None = None) -> dict[str, pd.DataFrame]:
+        """Stored frames for ``tickers``, trimmed to the trailing ``period`` if given."""
+        out = {}
+        for ticker in tickers:
+            start = None
+            if period in PERIODS and interval in PARTITIONED:
+                last = self.last_timestamp(ticker, interval)
+                start = None if last is None else last - PERIODS[period]
+            df = self.read(ticker, interval, start)
+            if df is None or df.empty:
+                continue
+            if period in PERIODS:
+                df = df[df.index > df.index[-1] - PERIODS[period]]
+            out[ticker] = df
+        return out
+
+    # -------------------- Panels --------------------
+    def panel_path(self, name: str) -> str:
+        return os.path.join(self.root, "panels", f"{name}.parquet")
+
+    def write_panel(self, name: str, panel: dict[str, pd.DataFrame]) -> None:
+        """Store a ``{field: dates x tickers}`` panel as one file."""
+        path = self.panel_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        pd.concat(panel, axis=1).to_parquet(tmp)
+        os.replace(tmp, path)
+
+    def read_panel(self, name: str) -> dict[str, pd.DataFrame]:
+        path = self.panel_path(name)
+        if not os.path.exists(path):
+            return {}
+        wide = pd.read_parquet(path)
+        return {field: wide[field] for field in wide.columns.get_level_values(0).unique()}
+
+    # -------------------- Refresh Bookkeeping --------------------
+    def _meta_path(self) -> str:
+        return os.path.join(self.root, "refreshed.json")
+
+    def refreshed_on(self, interval: str) -> str | None:
+        try:
+            with open(self._meta_path()) as f:
+                return json.load(f).get(interval)
+        except (OSError, ValueError):
+            return None
+
+    def mark_refreshed(self, interval: str, cache_date: str) -> None:
+        try:
+            with open(self._meta_path()) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        meta[interval] = cache_date
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._meta_path(), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def _history_path(self) -> str:
+        return os.path.join(self.root, "history.json")
+
+    def _history(self) -> dict[str, dict[str, str]]:
+        """``{interval: {ticker: period}}``: the longest period fetched in full per ticker."""
+        try:
+            with open(self._history_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _mark_full(self, interval: str, period: str, tickers: list[str]) -> None:
+        with self._lock:
+            history = self._history()
+            fetched = history.setdefault(interval, {})
+            for ticker in tickers:
+                if not _covers(fetched.get(ticker), period):
+                    fetched[ticker] = period
+            os.makedirs(self.root, exist_ok=True)
+            with open(self._history_path(), "w") as f:
+                json.dump(history, f, indent=2)
+
+    # -------------------- Incremental Refresh --------------------
+    def _needs_full(self, df: pd.DataFrame | None, interval: str, period: str, fetched: str | None) -> bool:
+        if df is None or df.empty:
+            return True
+        if interval in FETCH_WINDOW and df.index[-1] < pd.Timestamp.now(tz=df.index.tz) - FETCH_WINDOW[interval]:
+            return True  # too old to fetch from incrementally
+        if period not in PERIODS or _covers(fetched, period):
+            return False  # e.g. a recent listing: the source has nothing older
+        # Stored history is shorter than requested (allow a week of holidays)
+        wanted = df.index[-1] - PERIODS[period] + pd.Timedelta(days=7)
+        return df.index[0] > wanted
+
+    def refresh(self, tickers: list[str], interval: str, period: str, source: Source | None = None,
+                failed: list[str] | None = None, **kwargs) -> Iterator[tuple[list[str], dict[str, pd.DataFrame]]]:
+        """Bring ``tickers`` up to date and yield ``(batch, frames)`` as batches land.
+
+        ``frames`` holds each ticker's stored bars over the trailing ``period``.
+
+        Tickers without enough stored history, or whose last bar is older than
+        the source's intraday window, get the full ``period`` (once: a ticker
+        listed more recently than ``period`` is not re-fetched); the rest
+        are grouped by the day of their last stored bar and fetched from the
+        earliest last bar in the group (overlapping bars are simply replaced).
+        A ticker whose download failed still yields its stored frame, if any,
+        and is appended to ``failed``.
+        """
+        source = source or YFinanceSource()
+        full, since = [], defaultdict(list)
+        history = self._history().get(interval, {})
+        for ticker in tickers:
+            df = self.load([ticker], interval, period).get(ticker)
+            if self._needs_full(df, interval, period, history.get(ticker)):
+                full.append(ticker)
+            else:
+                since[df.index[-1].normalize()].append((df.index[-1], ticker))
+
+        jobs = [(full, dict(period=period))] if full else []
+        jobs += [([t for _, t in group], dict(start=min(ts for ts, _ in group))) for group in since.values()]
+        for group, params in jobs:
+            for batch, frames in fetch_scheduler().fetch(group, source=source, interval=interval, **params, **kwargs):
+                merged = {}
+                for ticker in batch:
+                    if ticker in frames:
+                        self.append(ticker, interval, frames[ticker])
+                    elif failed is not None:
+                        failed.append(ticker)
+                    stored = self.load([ticker], interval, period).get(ticker)
+                    if stored is not None:
+                        merged[ticker] = stored
+                if "period" in params:
+                    self._mark_full(interval, period, [t for t in batch if t in frames])
+                yield batch, merged
+
+
+@lazy_singleton
+def ohlcv_store() -> OHLCVStore:
+    """The stored bars under ``STORE_DIR`` and their frame cache."""
+    store = OHLCVStore()
+    metrics().collect("store_frames", store.frames.stats)
+    return store
@@ -0,0 +1,411 @@
+"""Tick ingestion into fixed-memory 1-minute bars for the live pages.
+
+A feed is any iterable of ``(ticker, ts, price, volume)`` ticks, with ``ts``
+in epoch seconds. ``TickStream`` consumes one on a daemon thread and folds
+the ticks into a ``BarRing``: preallocated (tickers x minutes) arrays per
+field with a write position per ticker, so memory is fixed however long the
+session runs. The pages read bars straight from the ring and only for the
+tickers that changed since their last look.
+
+Feeds:
+
+- ``ReplayFeed``: a recorded CSV (``ticker,ts,price,volume``), paced at
+  ``speed`` x real time (0 = as fast as possible)
+- ``SocketFeed``: the same lines from a TCP socket, e.g. a broker bridge or
+  the local stand-in started with ``python -m core.ticks serve``
+- ``SyntheticTicks``: random-walk ticks stamped with the wall clock
+
+    python -m core.ticks serve --synthetic --port 9009          # local stand-in
+    python -m core.ticks record --synthetic --seconds 600 --out ticks.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import random
+import socket
+import socketserver
+import threading
+import time
+import zlib
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from core.fetch import FIELDS, IST
+from core.instrument import metrics
+from core.singleton import lazy_singleton
+from core.universe import TICKERS_FILE, read_tickers
+
+Tick = tuple[str, float, float, float]
+
+MAX_TICKERS = 1024
+CAPACITY = 420      # minutes per ticker: a 9:15-15:30 session plus pre-open
+DEFAULT_PORT = 9009
+DEFAULT_FEED = os.environ.get("STOCKS_TICK_FEED", f"socket:127.0.0.1:{DEFAULT_PORT}")
+RECONNECT = 5.0     # seconds between socket reconnects
+
+
+# -------------------- Bars --------------------
+class BarRing:
+    """Per-ticker ring buffers of 1-minute OHLCV bars in preallocated arrays."""
+
+    def __init__(self, max_tickers: int = MAX_TICKERS, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self.minute = np.zeros((max_tickers, capacity), dtype="int64")  # bar start, epoch minutes
+        self.bars = np.zeros((max_tickers, len(FIELDS), capacity), dtype="float64")
+        self.count = np.zeros(max_tickers, dtype="int64")  # bars ever written per ticker
+        self.updated = np.zeros(max_tickers, dtype="int64")  # sequence number of the last change
+        self.rows: dict[str, int] = {}
+        self.seq = 0
+        self.ticks = self.late = self.dropped = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return self.minute.nbytes + self.bars.nbytes
+
+    def _row(self, ticker: str) -> int | None:
+        row = self.rows.get(ticker)
+        if row is None and len(self.rows) < len(self.count):
+            row = self.rows[ticker] = len(self.rows)
+        return row
+
+    def push(self, ticker: str, ts: float, price: float, volume: float = 0.0) -> None:
+        minute = int(ts // 60)
+        with self._lock:
+            self.ticks += 1
+            row = self._row(ticker)
+            if row is None:  # more symbols than rows
+                self.dropped += 1
+                return
+            n = self.count[row]
+            last = (n - 1) % self.capacity
+            bar = self.bars[row, :, last]
+            if n and minute == self.minute[row, last]:
+                bar[1] = max(bar[1], price)
+                bar[2] = min(bar[2], price)
+                bar[3] = price
+                bar[4] += volume
+            elif n and minute < self.minute[row, last]:
+                self.late += 1  # the minute it belongs to is already closed
+                return
+            else:
+                slot = n % self.capacity  # overwrites the oldest bar once full
+                self.minute[row, slot] = minute
+                self.bars[row, :, slot] = (price, price, price, price, volume)
+                self.count[row] = n + 1
+            self.seq += 1
+            self.updated[row] = self.seq
+
+    def clear(self) -> None:
+        """Drop every bar and symbol; ``seq`` keeps counting so readers' sequence numbers stay valid."""
+        with self._lock:
+            self.rows.clear()
+            self.count[:] = 0
+            self.updated[:] = 0
+            self.ticks = self.late = self.dropped = 0
+
+    def extend(self, ticks: Iterable[Tick]) -> None:
+        for tick in ticks:
+            self.push(*tick)
+
+    def changed_since(self, seq: int) -> tuple[list[str], int]:
+        """Tickers with new ticks after sequence number ``seq``, and the current one."""
+        with self._lock:
+            rows = set(np.flatnonzero(self.updated[:len(self.rows)] > seq).tolist())
+            return [t for t, row in self.rows.items() if row in rows], self.seq
+
+    def frame(self, ticker: str) -> pd.DataFrame | None:
+        """Bars of ``ticker`` oldest first, indexed like ``yf.download``'s 1m bars (IST)."""
+        with self._lock:
+            row = self.rows.get(ticker)
+            if row is None or not self.count[row]:
+                return None
+            n = self.count[row]
+            order = np.arange(n) if n <= self.capacity else (np.arange(self.capacity) + n) % self.capacity
+            minutes = self.minute[row, order]
+            values = self.bars[row][:, order].T.copy()
+        index = pd.to_datetime(minutes * 60, unit="s", utc=True).tz_convert(IST)
+        return pd.DataFrame(values, index=index.rename("Datetime"), columns=FIELDS)
+
+    def frames(self, tickers: Iterable[str]) -> dict[str, pd.DataFrame]:
+        out = {}
+        for ticker in tickers:
+            df = self.frame(ticker)
+            if df is not None:
+                out[ticker] = df
+        return out
+
+
+def splice(history: pd.DataFrame | None, bars: pd.DataFrame | None) -> pd.DataFrame | None:
+    """``history`` (e.g. the polled backfill) up to the first ticked minute, then the ticked bars."""
+    if history is None or history.empty:
+        return bars
+    if bars is None or bars.empty:
+        return history
+    if history.index.tz is not None:
+        bars = bars.tz_convert(history.index.tz)
+    return pd.concat([history[history.index < bars.index[0]], bars])
+
+
+# -------------------- Feeds --------------------
+class ReplayFeed:
+    """Ticks from a recorded CSV, paced like the original session."""
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+
+    def __iter__(self) -> Iterator[Tick]:
+        while True:
+            start = first = None
+            for chunk in pd.read_csv(self.path, chunksize=50_000):
+                for ticker, ts, price, volume in chunk[["ticker", "ts", "price", "volume"]].itertuples(index=False):
+                    if self.speed:
+                        if first is None:
+                            start, first = time.monotonic(), ts
+                        wait = (ts - first) / self.speed - (time.monotonic() - start)
+                        if wait > 0:
+                            time.sleep(wait)
+                    yield ticker, float(ts), float(price), float(volume)
+            if not self.loop:
+                return
+
+
+class SocketFeed:
+    """``ticker,ts,price,volume`` lines from a TCP socket; reconnects if it drops."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._closed = threading.Event()
+        self._conn: socket.socket | None = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def close(self) -> None:
+        """Stop reconnecting and unblock a reader waiting on the socket."""
+        self._closed.set()
+        conn = self._conn
+        if conn is not None:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __iter__(self) -> Iterator[Tick]:
+        while not self.closed:
+            try:
+                with socket.create_connection((self.host, self.port), timeout=RECONNECT) as conn:
+                    self._conn = conn
+                    if self.closed:  # closed while connecting
+                        return
+                    conn.settimeout(None)
+                    for line in conn.makefile("r", encoding="utf-8"):
+                        ticker, ts, price, volume = line.rstrip("\n").split(",")
+                        yield ticker, float(ts), float(price), float(volume)
+            except (OSError, ValueError):
+                pass
+            finally:
+                self._conn = None
+            self._closed.wait(RECONNECT)
+
+
+class SyntheticTicks:
+    """Random-walk ticks for ``tickers``, about ``rate`` per second, stamped now."""
+
+    def __init__(self, tickers: list[str], rate: float = 200.0, seed: int = 0, seconds: float | None = None):
+        self.tickers = list(tickers)
+        self.rate = rate
+        self.seconds = seconds
+        self._rng = random.Random(seed)
+        self._prices = {t: 20 + zlib.crc32(t.encode()) % 4980 for t in self.tickers}
+
+    def __iter__(self) -> Iterator[Tick]:
+        start = time.time()
+        while self.seconds is None or time.time() - start < self.seconds:
+            ticker = self._rng.choice(self.tickers)
+            price = self._prices[ticker] = round(self._prices[ticker] * (1 + self._rng.gauss(0, 0.0005)), 2)
+            yield ticker, time.time(), price, float(self._rng.randint(1, 500))
+            time.sleep(self._rng.expovariate(self.rate))
+
+
+def open_feed(spec: str, tickers: list[str] | None = None):
+    """``replay:<path>[@speed]``, ``socket:<host>:<port>`` or ``synthetic``."""
+    kind, _, arg = spec.partition(":")
+    if kind == "replay":
+        path, _, speed = arg.partition("@")
+        return ReplayFeed(path, float(speed or 1.0))
+    if kind == "socket":
+        host, _, port = arg.rpartition(":")
+        return SocketFeed(host or "127.0.0.1", int(port or DEFAULT_PORT))
+    if kind == "synthetic":
+        return SyntheticTicks(tickers or [])
+    raise ValueError(f"unknown tick feed {spec!r}")
+
+
+# -------------------- Stream --------------------
+class TickStream:
+    """One feed consumed on a daemon thread into a shared ``BarRing``.
+
+    Switching to another feed clears the ring, so bars of the previous feed
+    (or of a replay) are never mixed into the new feed's session.
+    """
+
+    def __init__(self, ring: BarRing | None = None):
+        self.ring = ring or BarRing()
+        self.spec: str | None = None
+        self.error: str | None = None
+        self._feed = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()  # no push from a stopped feed lands after the ring is cleared
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, spec: str, tickers: list[str] | None = None) -> None:
+        """Consume ``spec`` (see ``open_feed``); a running feed with the same spec is kept."""
+        if self.running and spec == self.spec:
+            return
+        feed = open_feed(spec, tickers)
+        self.stop()
+        if spec != self.spec:
+            self.ring.clear()
+        self.spec, self.error = spec, None
+        self._feed = feed
+        self._thread = threading.Thread(target=self._consume, daemon=True, name="tick-stream")
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            if isinstance(self._feed, SocketFeed):
+                self._feed.close()
+            self._feed = None
+
+    def _consume(self) -> None:
+        feed = self._feed
+        try:
+            for tick in feed:
+                with self._lock:
+                    if self._feed is not feed:
+                        return
+                    self.ring.push(*tick)
+                metrics().count("ticks")
+        except Exception as exc:  # e.g. a missing replay file; shown on the page
+            self.error = repr(exc)
+
+    def stats(self) -> dict:
+        ring = self.ring
+        return {"ticks": ring.ticks, "late": ring.late, "dropped": ring.dropped,
+                "symbols": len(ring.rows), "bytes": ring.nbytes}
+
+    def summary(self) -> str:
+        ring = self.ring
+        state = "running" if self.running else "stopped"
+        if self.error:
+            state = f"failed: {self.error}"
+        return (f"📡 Ticks ({self.spec or 'no feed'}, {state}): {ring.ticks} ticks, {len(ring.rows)} symbols, "
+                f"{ring.late} late | {ring.nbytes / 2**20:.1f} MB fixed")
+
+
+@lazy_singleton
+def tick_stream() -> TickStream:
+    """The live pages' tick feed and its bar ring (one feed at a time)."""
+    stream = TickStream()
+    metrics().collect("tick_stream", stream.stats)
+    return stream
+
+
+def tick_source_sidebar(tickers: list[str], key: str = "tick_source") -> bool:
+    """Sidebar choice between polling yfinance and the tick stream; True for ticks."""
+    import streamlit as st
+
+    source = st.sidebar.radio("Data source", ["yfinance poll", "Tick stream"], key=key, horizontal=True,
+                              help="Tick stream: 1-minute bars built locally from a live or recorded feed")
+    if source != "Tick stream":
+        return False
+    spec = st.sidebar.text_input("Tick feed", value=DEFAULT_FEED, key=f"{key}_feed",
+                                 help="replay:<file.csv>[@speed], socket:<host>:<port> or synthetic")
+    stream = tick_stream()
+    try:
+        stream.start(spec, tickers)
+    except ValueError as exc:
+        st.sidebar.error(str(exc))
+    st.sidebar.caption(stream.summary())
+    return True
+
+
+# -------------------- Local Stand-in --------------------
+def serve(feed: Iterable[Tick], host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> None:
+    """Broadcast ``feed`` as CSV lines to every connected client (blocks)."""
+    clients: list[socket.socket] = []
+    lock = threading.Lock()
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            with lock:
+                clients.append(self.request)
+            while self.request.fileno() != -1 and self.request in clients:
+                time.sleep(1)
+
+    server = socketserver.ThreadingTCPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving ticks on {host}:{port}", flush=True)
+    for ticker, ts, price, volume in feed:
+        line = f"{ticker},{ts:.3f},{price},{volume}\n".encode()
+        with lock:
+            for conn in list(clients):
+                try:
+                    conn.sendall(line)
+                except OSError:
+                    clients.remove(conn)
+
+
+def record(feed: Iterable[Tick], path: str) -> int:
+    """Write ``feed`` to a replay CSV; returns the number of ticks."""
+    n = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ticker", "ts", "price", "volume"])
+        for ticker, ts, price, volume in feed:
+            writer.writerow([ticker, f"{ts:.3f}", price, volume])
+            n += 1
+    return n
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["serve", "record"])
+    parser.add_argument("--replay", help="recorded CSV to play back")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (0 = as fast as possible)")
+    parser.add_argument("--synthetic", action="store_true", help="generate random-walk ticks")
+    parser.add_argument("--tickers", default=TICKERS_FILE)
+    parser.add_argument("--rate", type=float, default=200.0, help="synthetic ticks per second")
+    parser.add_argument("--seconds", type=float, help="stop synthetic ticks after this long")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--out", default="ticks.csv")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        feed = ReplayFeed(args.replay, args.speed, loop=args.command == "serve")
+    elif args.synthetic:
+        feed = SyntheticTicks(read_tickers(args.tickers), args.rate, seconds=args.seconds)
+    else:
+        parser.error("give --replay FILE or --synthetic")
+    if args.command == "serve":
+        serve(feed, args.host, args.port)
+    else:
+        print(f"Recorded {record(feed, args.out)} ticks to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
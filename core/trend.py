@@ -0,0 +1,253 @@
+"""Intraday trend angles for the whole universe.
+
+``calculate_angle`` is the original per-ticker reference. ``compute_trends``
+aligns every ticker's closes into one minutes x tickers array and solves all
+the least-squares fits at once, skipping each ticker's missing minutes.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from core.instrument import metrics
+
+MIN_POINTS = 10     # Need enough data points
+STEEP_ANGLE = 70    # Very steep trends ...
+STEEP_DAMPING = 0.7  # ... are scaled down
+
+# Page 5's trend types: angle range as (low, high, inclusive bounds); None keeps everything
+TREND_BUCKETS = {
+    "All Charts": None,
+    "Strong Uptrend (≈45°)": (35, 55, "both"),
+    "Moderate Uptrend (15-45°)": (15, 35, "left"),
+    "Sideways (-15° to 15°)": (-15, 15, "neither"),
+    "Moderate Downtrend (-15° to -45°)": (-35, -15, "right"),
+    "Strong Downtrend (≈-45°)": (-55, -35, "both"),
+    "Very Steep (>60°)": (60, float("inf"), "neither"),
+    "Very Steep (<-60°)": (float("-inf"), -60, "neither"),
+}
+
+
+def damp_angle(angle, steep=STEEP_ANGLE, damping=STEEP_DAMPING):
+    """Adjust angle sensitivity; works on scalars and arrays."""
+    return np.where(np.abs(angle) > steep, angle * damping, angle)
+
+
+# --- Reference (per ticker) ---
+def calculate_angle(df):
+    from scipy.stats import linregress  # reference path only; slow to import
+
+    try:
+        if len(df) < MIN_POINTS:
+            return 0.0
+
+        # Normalize prices to percentage changes from open
+        open_price = df['Close'].iloc[0]
+        if open_price == 0:
+            return 0.0
+        normalized_prices = (df['Close'] - open_price) / open_price * 100
+
+        # Use time in hours for x-axis
+        time_hours = (df.index - df.index[0]).total_seconds() / 3600
+        if time_hours[-1] == 0:  # Prevent division by zero
+            return 0.0
+
+        # Calculate regression on normalized data
+        slope, _, _, _, _ = linregress(time_hours, normalized_prices)
+        angle = np.degrees(np.arctan(slope))
+        return float(damp_angle(angle))
+
+    except Exception:
+        return 0.0
+
+
+# --- Batched (whole universe) ---
+def align_closes(data: dict[str, pd.DataFrame]) -> tuple[pd.DatetimeIndex, list[str], np.ndarray]:
+    """Minutes x tickers array of closes; NaN where a ticker has no bar."""
+    series = {t: df["Close"] for t, df in data.items() if df is not None and not df.empty}
+    if not series:
+        return pd.DatetimeIndex([]), [], np.empty((0, 0))
+    close = pd.concat(series, axis=1, sort=True)
+    return close.index, list(close.columns), close.to_numpy(dtype="float64")
+
+
+def batch_trends(index: pd.DatetimeIndex, values: np.ndarray) -> dict[str, np.ndarray]:
+    """Least-squares fit of every column of ``values`` against time in hours.
+
+    Returns per-ticker arrays: ``angle`` (as ``calculate_angle``), ``slope`` in
+    % of the first close per hour, ``raw_slope``/``intercept`` in price units
+    with time measured from the ticker's own first bar (for trend overlays),
+    plus ``n`` and the first bar position ``start``.
+    """
+    hours = np.asarray((index - index[0]).total_seconds(), dtype="float64") / 3600
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=0)
+    has = n > 0
+    start = np.where(has, valid.argmax(axis=0), 0)
+    stop = np.where(has, len(index) - 1 - valid[::-1].argmax(axis=0), 0)
+    cols = np.arange(values.shape[1])
+    x0 = hours[start]
+    first = values[start, cols]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = np.where(valid, hours[:, None], 0.0)
+        y = np.where(valid, values, 0.0)
+        mean_x = x.sum(axis=0) / n
+        mean_y = y.sum(axis=0) / n
+        dx = np.where(valid, hours[:, None] - mean_x, 0.0)
+        dy = np.where(valid, values - mean_y, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        raw_slope = (dx * dy).sum(axis=0) / sxx
+        intercept = mean_y - raw_slope * (mean_x - x0)
+        slope = raw_slope / first * 100
+
+        fit = (n >= 2) & (sxx > 0)
+        ok = fit & (n >= MIN_POINTS) & (first != 0) & (hours[stop] > x0) & np.isfinite(slope)
+        angle = np.where(ok, damp_angle(np.degrees(np.arctan(slope))), 0.0)
+    return {
+        "angle": angle,
+        "slope": np.where(ok, slope, 0.0),
+        "raw_slope": np.where(fit, raw_slope, 0.0),
+        "intercept": np.where(fit, intercept, first),
+        "n": n,
+        "start": start,
+    }
+
+
+@metrics().timed("compute_seconds", stage="trends")
+def compute_trends(data: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Trend fit for every ticker in ``data``, indexed by ticker."""
+    index, tickers, values = align_closes(data)
+    if not tickers:
+        return pd.DataFrame(columns=["angle", "slope", "raw_slope", "intercept", "n", "start"])
+    result = batch_trends(index, values)
+    trends = pd.DataFrame(result, index=tickers)
+    trends["start"] = index[result["start"]]
+    return trends
+
+
+def trend_line(df: pd.DataFrame, trend: pd.Series) -> np.ndarray:
+    """Fitted prices at ``df``'s timestamps for one row of ``compute_trends``."""
+    time_hours = np.asarray((df.index - df.index[0]).total_seconds(), dtype="float64") / 3600
+    return trend["raw_slope"] * time_hours + trend["intercept"]
+
+
+# --- Streaming (per new bar) ---
+class RunningTrend:
+    """Running least-squares sums for one ticker, updated in O(1) per bar.
+
+    Time is in hours from the first bar and prices are offset by the first
+    close seen, which keeps the sums well conditioned. Re-pushing the last
+    timestamp replaces that bar (e.g. a minute that was still forming).
+    """
+
+    __slots__ = ("t0", "ref", "first", "n", "sx", "sy", "sxy", "sxx", "last_ts", "last_x", "last_y")
+
+    def __init__(self):
+        self.t0 = self.last_ts = None
+        self.ref = self.first = 0.0
+        self.n = 0
+        self.sx = self.sy = self.sxy = self.sxx = 0.0
+        self.last_x = self.last_y = 0.0
+
+    def _add(self, x: float, y: float, sign: int = 1) -> None:
+        self.n += sign
+        self.sx += sign * x
+        self.sy += sign * y
+        self.sxy += sign * x * y
+        self.sxx += sign * x * x
+
+    def push(self, ts, close: float) -> None:
+        ts = pd.Timestamp(ts)
+        close = float(close)
+        if self.t0 is None:
+            self.t0, self.ref, self.first = ts, close, close
+        elif ts == self.last_ts:
+            self._add(self.last_x, self.last_y, -1)
+            if self.n == 0:
+                self.first = close
+        elif ts < self.last_ts:
+            raise ValueError(f"bar at {ts} is older than the last bar at {self.last_ts}")
+        x = (ts - self.t0).total_seconds() / 3600
+        y = close - self.ref
+        self._add(x, y)
+        self.last_ts, self.last_x, self.last_y = ts, x, y
+
+    def extend(self, closes: pd.Series) -> None:
+        """Push a run of bars; the sums for all but the first are added in bulk."""
+        closes = closes.dropna()
+        if self.last_ts is not None:
+            closes = closes[closes.index >= self.last_ts]
+        if closes.empty:
+            return
+        self.push(closes.index[0], closes.iloc[0])
+        rest = closes.iloc[1:]
+        if rest.empty:
+            return
+        x = np.asarray((rest.index - self.t0).total_seconds(), dtype="float64") / 3600
+        y = rest.to_numpy(dtype="float64") - self.ref
+        self.n += len(x)
+        self.sx += x.sum()
+        self.sy += y.sum()
+        self.sxy += (x * y).sum()
+        self.sxx += (x * x).sum()
+        self.last_ts, self.last_x, self.last_y = rest.index[-1], x[-1], y[-1]
+
+    @property
+    def raw_slope(self) -> float:
+        den = self.n * self.sxx - self.sx * self.sx
+        return (self.n * self.sxy - self.sx * self.sy) / den if self.n >= 2 and den > 0 else 0.0
+
+    @property
+    def intercept(self) -> float:
+        """Fitted price at the first bar's time."""
+        if self.n == 0:
+            return self.first
+        return self.ref + (self.sy - self.raw_slope * self.sx) / self.n
+
+    @property
+    def slope(self) -> float:
+        """Slope in % of the first close per hour."""
+        if self.n < MIN_POINTS or self.first == 0 or self.last_x == 0:
+            return 0.0
+        return self.raw_slope / self.first * 100
+
+    @property
+    def angle(self) -> float:
+        if self.slope == 0.0:
+            return 0.0
+        return float(damp_angle(np.degrees(np.arctan(self.slope))))
+
+    def endpoints(self) -> tuple[tuple[pd.Timestamp, float], tuple[pd.Timestamp, float]]:
+        """Trend-line start and end points for plotting."""
+        return ((self.t0, self.intercept),
+                (self.last_ts, self.intercept + self.raw_slope * self.last_x))
+
+    def as_row(self) -> dict:
+        """Same fields as a ``compute_trends`` row."""
+        return {"angle": self.angle, "slope": self.slope, "raw_slope": self.raw_slope,
+                "intercept": self.intercept, "n": self.n, "start": self.t0}
+
+
+class StreamingTrends:
+    """``RunningTrend`` per ticker, fed with new (or corrected last) bars."""
+
+    def __init__(self):
+        self.states: dict[str, RunningTrend] = {}
+
+    def update(self, ticker: str, bars: pd.DataFrame) -> RunningTrend:
+        """Push ``bars`` (only those at or after the last seen bar are new)."""
+        state = self.states.setdefault(ticker, RunningTrend())
+        state.extend(bars["Close"])
+        return state
+
+    def reset(self, ticker: str, df: pd.DataFrame) -> RunningTrend:
+        self.states.pop(ticker, None)
+        return self.update(ticker, df)
+
+    def angles(self) -> dict[str, float]:
+        return {t: s.angle for t, s in self.states.items()}
+
+    def frame(self) -> pd.DataFrame:
+        """All states as a ``compute_trends``-shaped frame."""
+        return pd.DataFrame.from_dict({t: s.as_row() for t, s in self.states.items()}, orient="index")
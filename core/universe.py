@@ -0,0 +1,40 @@
+"""The Nifty 500 ticker list, read once per process.
+
+Every page used to open and parse ``tickers_Nifty500.txt`` on each rerun.
+``universe()`` keeps the parsed list for the whole server and re-reads the
+file only when its modification time changes.
+"""
+from __future__ import annotations
+
+import os
+import threading
+
+TICKERS_FILE = "data/Charts-data/tickers_Nifty500.txt"
+
+
+def normalize(symbol: str) -> str:
+    """Upper-case NSE symbol with the ``.NS`` suffix yfinance expects."""
+    symbol = symbol.strip().upper()
+    return symbol if symbol.endswith(".NS") else f"{symbol}.NS"
+
+
+def read_tickers(path: str = TICKERS_FILE) -> list[str]:
+    with open(path) as f:
+        return [normalize(line) for line in f if line.strip()]
+
+
+_tickers: dict[str, tuple[float, list[str]]] = {}
+_tickers_lock = threading.Lock()
+
+
+def universe(path: str = TICKERS_FILE) -> list[str]:
+    """Tickers in ``path`` (empty if the file is missing), shared by every session."""
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return []
+    with _tickers_lock:
+        cached = _tickers.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _tickers[path] = (mtime, read_tickers(path))
+        return list(cached[1])
@@ -1,70 +1,124 @@
 import streamlit as st
-import glob, os
+import time
 import pandas as pd
-import yfinance as yf
-import matplotlib.pyplot as plt
-from matplotlib.dates import MinuteLocator, DateFormatter
-from streamlit.components.v1 import html
 
-html("""
-    <script>
-      setTimeout(() => { window.location.reload(); }, 30000);
-    </script>
-""", height=0)
+from core.charts import chart_cache, fingerprint
+from core.fetch import IST
+from core.ingest import gainers_losers
+from core.instrument import diagnostics_sidebar, metrics
+from core.multiples import multiples_spec
+from core.ranking import TOP_K, daily_panel, live_panel, ranking
+from core.renderers import session_chart
+from core.scheduler import fetch_scheduler
+from core.store import ohlcv_store
+from core.ticks import splice, tick_source_sidebar, tick_stream
+from core.universe import universe
+
+REFRESH_SECONDS = 30
+TICK_REFRESH_SECONDS = 5  # tick bars are already in memory
+LIST_SOURCES = ("Live ranking (Nifty 500)", "NSE CSV list")
 
 st.set_page_config(page_title="Live Intraday Charts", layout="wide")
-st.title("🔄 Live Intraday Charts (1-min) — Gainers & Losers from CSV")
+st.title("🔄 Live Intraday Charts (1-min) — Top Gainers & Losers")
 
-GAIN_LOSS_DIR = "data/TOP-Gain-loosers"
+# Every dated T20-GL-* drop is parsed once into a shared, persisted history
+history = gainers_losers()
+tickers = universe()
 
-def newest(pattern):
-    files = glob.glob(os.path.join(GAIN_LOSS_DIR, pattern))
-    return max(files, key=os.path.getmtime) if files else None
+# Ranked from the universe's own 1-minute bars on every refresh; the CSV drops are the fallback
+live = st.sidebar.radio("Gainers & losers from", LIST_SOURCES, index=0 if tickers else 1,
+                        help="Live: % change vs the previous close across the whole universe") == LIST_SOURCES[0]
 
-g_file = newest("*gainers*.csv")
-l_file = newest("*loosers*.csv")
+def csv_lists():
+    """Gainers and losers of the chosen ``T20-GL-*`` drop."""
+    if history.dates().empty:
+        st.error("❌ Missing required CSVs: Ensure at least one `T20-GL-gainers-*.csv` and `T20-GL-loosers-*.csv` are present.")
+        st.stop()
 
-if not g_file or not l_file:
-    st.error("❌ Missing required CSVs: Ensure at least one `*gainers*.csv` and `*loosers*.csv` are present.")
-    st.stop()
+    list_date = st.sidebar.selectbox(
+        "NSE list date", options=sorted(history.dates(), reverse=True), format_func=lambda d: d.strftime("%d-%b-%Y")
+    )
+    gainers = history.tickers(list_date, "gainers")
+    losers  = history.tickers(list_date, "loosers")
+    if not gainers or not losers:
+        st.error(f"❌ Need both the gainers and the losers file for {list_date:%d-%b-%Y}.")
+        st.stop()
 
-st.markdown(
-    f"📄 **Gainers CSV:** `{os.path.basename(g_file)}` &nbsp;&nbsp;&nbsp;&nbsp; "
-    f"📄 **Losers CSV:** `{os.path.basename(l_file)}`"
-)
+    st.markdown(f"📄 **Top 20 gainers & losers of:** `{list_date:%d-%b-%Y}` &nbsp;&nbsp;&nbsp;&nbsp; "
+                f"📚 **History:** {len(history.dates())} trading days")
+    st.success(f"✅ Loaded {len(gainers)} gainers and {len(losers)} losers.")
 
-def load_syms(path):
-    df = pd.read_csv(path)
-    df.columns = df.columns.str.strip().str.upper()
-    if "SYMBOL" not in df.columns:
-        st.error(f"❌ `{os.path.basename(path)}` must contain a `SYMBOL` column.")
-        st.stop()
-    syms = df["SYMBOL"].dropna().astype(str).str.strip().str.upper()
-    return [s if s.endswith(".NS") else f"{s}.NS" for s in syms]
+    with st.sidebar.expander("🔁 Frequent movers this month"):
+        min_days = st.number_input("In the top 20 on at least (days)", min_value=1, value=3, step=1)
+        frequent = history.frequent_symbols(min_days, start=list_date.replace(day=1), end=list_date)
+        if frequent.empty:
+            st.caption("No symbols yet.")
+        else:
+            st.dataframe(frequent.rename("Days"), width="stretch")
+    return gainers, losers
 
-gainers = load_syms(g_file)
-losers  = load_syms(l_file)
-st.success(f"✅ Loaded {len(gainers)} gainers and {len(losers)} losers.")
+if live:
+    # Shared with the NSE 500 Live Charts page, which publishes its panel on every refresh
+    with st.spinner("Ranking the universe..."):
+        panel, _ = live_panel(tickers, REFRESH_SECONDS)
+        daily_panel(tickers)  # the previous closes, (re)built if the daily store moved on
+    if not len(ranking(panel)):
+        st.warning("No intraday bars for the universe yet — showing the latest NSE CSV list instead.")
+        live = False
 
-@st.cache_data(ttl=30)
-def fetch_intraday(sym):
-    return yf.download(sym, period="1d", interval="1m", prepost=True,
-                       progress=False, auto_adjust=True)
+if live:
+    gainers, losers = [], []
+    top_k = st.sidebar.slider("Names per list", min_value=5, max_value=50, value=TOP_K, step=5)
+else:
+    gainers, losers = csv_lists()
 
 all_syms = gainers + losers
-prog = st.progress(0)
-intraday = {}
-for i, sym in enumerate(all_syms):
-    try:
-        intraday[sym] = fetch_intraday(sym)
-    except Exception:
-        intraday[sym] = pd.DataFrame()
-    prog.progress((i + 1) / len(all_syms))
-
-st.success("📊 Intraday data loaded for all tickers.")
-
-def plot_group(title, syms):
+if "gl" not in st.session_state:
+    st.session_state.gl = {"last_refresh": 0.0, "polled": 0.0}
+
+@metrics().timed("compute_seconds", stage="last_session")
+def last_session(df):
+    if df is None or df.empty:
+        return pd.DataFrame()
+    return df[df.index.normalize() == df.index[-1].normalize()]
+
+def refresh_intraday():
+    """Fetch only the regular-session minutes after each symbol's last stored bar."""
+    for _ in ohlcv_store().refresh(all_syms, "1m", "1d"):
+        pass
+
+def last_sessions(bars, syms):
+    """Each symbol's last session from ``bars`` (the shared panel or the stored frames),
+    with any ticked minutes spliced on."""
+    ring = tick_stream().ring if use_ticks else None
+    out = {}
+    for sym in syms:
+        df = bars.get(sym)
+        if df is not None and df.index.tz is None:
+            df = df.tz_localize(IST)
+        if ring is not None:
+            df = splice(df, ring.frame(sym))
+        out[sym] = last_session(df)
+    return out
+
+charts = chart_cache()
+
+def chart_image(sym, df):
+    # Redraw only when the symbol's series changed
+    return charts.get_or_render((sym, fingerprint(df), "gainers-losers"), lambda: session_chart(sym, df))
+
+def plot_group(title, syms, intraday):
     st.header(title)
+    if compact_view:
+        def series(sym):
+            df = intraday.get(sym, pd.DataFrame())
+            return None if df.empty else (sym, df)
+        spec = multiples_spec(syms, series, full=full_resolution)
+        if spec is None:
+            st.warning("No intraday data for this group")
+        else:
+            st.image(charts.get_or_render(*spec), width="stretch")
+        return
     for i in range(0, len(syms), 2):
         cols = st.columns(2)
         for j in (0, 1):
@@ -75,15 +129,55 @@ def plot_group(title, syms):
             if df.empty:
                 cols[j].warning(f"No intraday data for {sym}")
                 continue
-            fig, ax = plt.subplots(figsize=(6, 3))
-            ax.plot(df.index, df["Close"], lw=1)
-            ax.set_title(sym)
-            ax.xaxis.set_major_locator(MinuteLocator(5))
-            ax.xaxis.set_major_formatter(DateFormatter("%H:%M"))
-            ax.tick_params(labelbottom=False)
-            plt.tight_layout()
-            cols[j].pyplot(fig)
-            plt.close(fig)
-
-plot_group("🔼 Top Gainers", gainers)
-plot_group("🔽 Top Losers",  losers)
+            cols[j].image(chart_image(sym, df), width="stretch")
+
+def most_active(ranked, k):
+    """Volume and turnover leaders with their ranks across the universe."""
+    with st.expander("📊 Most active"):
+        for column, label in (("turnover", "By turnover (₹)"), ("volume", "By volume")):
+            st.subheader(label)
+            table = ranked.table(ranked.top(column, k))
+            st.dataframe(table[["last", "pct_change", "volume", "turnover", f"{column}_rank", "pct_change_rank"]]
+                         .round(2), width="stretch")
+
+# Many symbols drawn on one canvas instead of one figure each
+compact_view = st.sidebar.toggle("🧩 Compact view (small multiples)")
+full_resolution = st.sidebar.toggle("🔍 Full resolution", disabled=not compact_view,
+                                   help="Plot every minute in the compact view instead of about one point per pixel")
+use_ticks = tick_source_sidebar(tickers if live else all_syms)
+refresh_seconds = TICK_REFRESH_SECONDS if use_ticks else REFRESH_SECONDS
+
+# Server-side timed rerun of the chart grid only (no full page reload)
+@st.fragment(run_every=refresh_seconds)
+def chart_grid():
+    gl = st.session_state.gl
+    if live:
+        # Re-ranked whenever the shared panel moves on; bars are polled at most every REFRESH_SECONDS
+        panel, gl["last_refresh"] = live_panel(tickers, REFRESH_SECONDS)
+        ranked = ranking(panel)
+        up, down = ranked.gainers(top_k), ranked.losers(top_k)
+        intraday = last_sessions(panel, up + down)
+        if ranked.session is not None:
+            st.markdown(f"📈 **Ranked:** {len(ranked)} of {len(tickers)} tickers, session of "
+                        f"`{ranked.session:%d-%b-%Y}`, % change vs the previous close")
+    else:
+        if time.time() - gl["polled"] >= refresh_seconds:
+            # Ticks only extend the polled session, so the first load still comes from yfinance
+            if not (use_ticks and gl["polled"]):
+                with st.spinner("Fetching new intraday bars..."):
+                    refresh_intraday()
+            gl["polled"] = gl["last_refresh"] = time.time()
+        # Read from the shared store on every rerun; sessions keep no copies of the bars
+        up, down = gainers, losers
+        intraday = last_sessions(ohlcv_store().load(all_syms, "1m", "1d"), all_syms)
+    updated = pd.Timestamp(gl["last_refresh"], unit="s", tz="Asia/Kolkata").strftime("%H:%M:%S")
+    st.caption(f"📊 Intraday data updated {updated} IST — refreshes every {refresh_seconds}s")
+    if live:
+        most_active(ranked, top_k)
+    plot_group("🔼 Top Gainers", up, intraday)
+    plot_group("🔽 Top Losers",  down, intraday)
+    st.caption(charts.summary())
+    st.caption(fetch_scheduler().summary())
+
+chart_grid()
+diagnostics_sidebar()
@@ -1,84 +1,44 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.dates import MinuteLocator, DateFormatter
-from datetime import datetime, timedelta, timezone
-import os
 import numpy as np
-from scipy.stats import linregress
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+
+from core.charts import chart_cache, fingerprint
+from core.correlation import correlation, one_per_cluster
+from core.grid import paginated_grid
+from core.instrument import diagnostics_sidebar, metrics
+from core.panel import MarketPanel, panels
+from core.ranking import LIVE_PANEL, daily_panel
+from core.renderers import live_chart, trend_color
+from core.scheduler import fetch_scheduler
+from core.screener import Screener
+from core.store import ohlcv_store
+from core.ticks import splice, tick_source_sidebar, tick_stream
+from core.trend import TREND_BUCKETS, StreamingTrends, compute_trends
+from core.universe import TICKERS_FILE, universe
 
 # --- Configuration ---
 IST = timezone(timedelta(hours=5, minutes=30))
-now_ist = datetime.now(IST)
-today_str = now_ist.date().isoformat()
+today_str = datetime.now(IST).date().isoformat()
 
 # --- Setup with Error Prevention ---
 st.set_page_config(page_title="NSE500 Live Charts", layout="wide")
 st.title("📡 NSE500 Live Charts (Intraday)")
 st.markdown(f"📅 Showing **{today_str}** data — Starting from first available tick after 9:00 AM IST")
 
-# --- Ticker Loading with Validation ---
-@st.cache_data
-def load_tickers():
-    try:
-        path = "data/Charts-data/tickers_Nifty500.txt"
-        if not os.path.exists(path):
-            st.error(f"Ticker file not found: {path}")
-            return None
-        
-        with open(path) as f:
-            tickers = [
-                line.strip().upper() + ".NS" if not line.strip().upper().endswith(".NS")
-                else line.strip().upper()
-                for line in f if line.strip()
-            ]
-            return tickers if tickers else None
-    except Exception as e:
-        st.error(f"Error loading tickers: {str(e)}")
-        return None
-
-tickers = load_tickers()
+# --- Ticker Loading (parsed once per process) ---
+tickers = universe()
 if not tickers:
-    st.error("No valid tickers loaded. Check your ticker file.")
+    st.error(f"No valid tickers loaded. Check your ticker file: {TICKERS_FILE}")
     st.stop()
 
 st.markdown(f"📈 **Total Tickers:** {len(tickers)}")
 
-# --- Enhanced Angle Calculation ---
-def calculate_angle(df):
-    try:
-        if len(df) < 10:  # Need enough data points
-            return 0.0
-            
-        # Normalize prices to percentage changes from open
-        open_price = df['Close'].iloc[0]
-        if open_price == 0:
-            return 0.0
-        normalized_prices = (df['Close'] - open_price) / open_price * 100
-        
-        # Use time in hours for x-axis
-        time_hours = (df.index - df.index[0]).total_seconds() / 3600
-        if time_hours[-1] == 0:  # Prevent division by zero
-            return 0.0
-            
-        # Calculate regression on normalized data
-        slope, _, _, _, _ = linregress(time_hours, normalized_prices)
-        angle = np.degrees(np.arctan(slope))
-        
-        # Adjust angle sensitivity
-        if abs(angle) > 70:  # Very steep trends
-            return angle * 0.7  # Scale down extreme angles
-        return angle
-        
-    except Exception:
-        return 0.0
-
-# --- Ultra-Safe Data Download ---
-def fetch_intraday_data(ticker):
+# --- Ultra-Safe Data Preparation ---
+def prepare_intraday_data(df, day):
     try:
-        df = yf.download(ticker, period="1d", interval="1m", progress=False, auto_adjust=True)
-        
         # Validate DataFrame structure
         if not isinstance(df, pd.DataFrame) or df.empty:
             return None
@@ -87,171 +47,248 @@ def fetch_intraday_data(ticker):
             
         # Timezone handling
         try:
-            df = df.tz_convert(IST).tz_localize(None)
-            df = df[df.index >= datetime.combine(now_ist.date(), datetime.strptime("09:00", "%H:%M").time())]
+            with metrics().timer("compute_seconds", stage="tz_convert"):
+                df = df.tz_convert(IST).tz_localize(None)
+                df = df[df.index >= datetime.combine(day, datetime.strptime("09:00", "%H:%M").time())]
             return df if not df.empty else None
         except:
             return None
     except:
         return None
 
+def build_screener(data, angles):
+    # Snapshot of last close and angle, rebuilt once per data refresh; intraday
+    # bars have no multi-day return windows
+    return Screener.from_frames(data, angles, windows={})
+
+# --- Live Refresh Controls ---
+st.sidebar.header("Live Refresh")
+use_ticks = tick_source_sidebar(tickers)
+auto_refresh = st.sidebar.toggle("Auto-refresh", value=True, help="Fetch only new minutes and redraw changed charts")
+# Tick bars are read from memory, so they can be picked up far more often than yfinance is polled
+refresh_every = st.sidebar.slider("Refresh every (seconds)", min_value=5 if use_ticks else 30, max_value=600,
+                                  value=15 if use_ticks else 60, step=5 if use_ticks else 30)
+refresh_now = st.sidebar.button("⏩ Refresh now")
+compact_view = st.sidebar.toggle("🧩 Compact view (small multiples)")
+full_resolution = st.sidebar.toggle("🔍 Full resolution", disabled=not compact_view,
+                                   help="Plot every minute in the compact view instead of about one point per pixel")
+
 # --- Main Application Flow ---
-if 'app_state' not in st.session_state:
-    st.session_state.app_state = {
-        'data': {},
+# One live state per data source and universe: every session with the same
+# settings reads the same read-only panel, and whichever session's timer
+# fires first refreshes it for all of them
+state_key = ("ticks" if use_ticks else "poll", tuple(tickers))
+
+@st.cache_resource
+def get_app_state(source, universe):
+    return {
+        'data': MarketPanel.from_frames({}),
         'angles': {},
+        'trends': None,
+        'screener': None,
+        'streams': StreamingTrends(),
+        'last_refresh': 0.0,
+        'tick_seq': 0,
         'loaded': False,
-        'failed_tickers': []
+        'failed_tickers': [],
+        'lock': threading.Lock(),
     }
 
-if not st.session_state.app_state['loaded']:
-    with st.status("🚀 Loading market data...", expanded=True) as status:
-        progress_text = st.empty()
-        progress_bar = st.progress(0)
+app_state = get_app_state(*state_key)
+
+# A session opening while another is loading waits for it instead of loading again
+with app_state['lock']:
+    if not app_state['loaded']:
+        with st.status("🚀 Loading market data...", expanded=True) as status:
+            progress_text = st.empty()
+            progress_bar = st.progress(0)
         
-        successful = 0
-        for i, ticker in enumerate(tickers):
-            progress_text.text(f"Processing {ticker} ({i+1}/{len(tickers)})")
-            progress_bar.progress((i + 1) / len(tickers))
+            successful = 0
+            done = 0
+            loaded = {}
+            today = datetime.now(IST).date()
+            app_state['failed_tickers'] = []
+            # Only the minutes after each ticker's last stored bar are downloaded
+            for batch, frames in ohlcv_store().refresh(tickers, "1m", "1d"):
+                done += len(batch)
+                progress_text.text(f"Processing {batch[-1]} ({done}/{len(tickers)})")
+                progress_bar.progress(done / len(tickers))
             
-            df = fetch_intraday_data(ticker)
-            if df is not None:
-                angle = calculate_angle(df)
-                st.session_state.app_state['data'][ticker] = df
-                st.session_state.app_state['angles'][ticker] = angle
-                successful += 1
-            else:
-                st.session_state.app_state['failed_tickers'].append(ticker)
+                for ticker in batch:
+                    df = prepare_intraday_data(frames.get(ticker), today)
+                    if df is not None:
+                        loaded[ticker] = df
+                        successful += 1
+                    else:
+                        app_state['failed_tickers'].append(ticker)
         
-        if successful > 0:
-            st.session_state.app_state['loaded'] = True
-            status.update(
-                label=f"✅ Loaded {successful}/{len(tickers)} tickers | {len(st.session_state.app_state['failed_tickers'])} failed",
-                state="complete"
-            )
-        else:
-            status.update(label="❌ All tickers failed to load", state="error")
-            st.error("Critical failure. Please check your internet connection and try again.")
-            st.stop()
+            # Published as one shared float32 panel; one batched regression for the whole universe
+            app_state['data'] = MarketPanel.from_frames(loaded)
+            trends = compute_trends(app_state['data'])
+            app_state['trends'] = trends
+            app_state['angles'] = trends['angle'].to_dict()
+            app_state['screener'] = build_screener(
+                app_state['data'], app_state['angles'])
+            for ticker, df in app_state['data'].items():
+                app_state['streams'].update(ticker, df)
+            app_state['last_refresh'] = time.time()
+            # The Gainers/Losers page ranks the universe from this same panel
+            panels().publish(LIVE_PANEL, app_state['data'], app_state['last_refresh'])
+        
+            if successful > 0:
+                app_state['loaded'] = True
+                status.update(
+                    label=f"✅ Loaded {successful}/{len(tickers)} tickers | {len(app_state['failed_tickers'])} failed",
+                    state="complete"
+                )
+            else:
+                status.update(label="❌ All tickers failed to load", state="error")
+                st.error("Critical failure. Please check your internet connection and try again.")
+                st.stop()
 
 # --- Enhanced Filtering Interface ---
 st.sidebar.header("Trend Filters")
-filter_choice = st.sidebar.selectbox(
-    "Select Trend Type:",
-    options=[
-        "All Charts",
-        "Strong Uptrend (≈45°)", 
-        "Moderate Uptrend (15-45°)",
-        "Sideways (-15° to 15°)",
-        "Moderate Downtrend (-15° to -45°)",
-        "Strong Downtrend (≈-45°)",
-        "Very Steep (>60°)",
-        "Very Steep (<-60°)"
-    ],
-    index=0
+filter_choice = st.sidebar.selectbox("Select Trend Type:", options=list(TREND_BUCKETS), index=0)
+
+# Clusters of co-moving names from the stored daily bars (the 2y panel the daily page shares)
+daily = daily_panel(tickers)
+corr = correlation(daily)
+clusters = corr.clusters() if corr is not None else pd.Series(dtype="int64")
+selected_cluster = st.sidebar.selectbox(
+    "Cluster", options=["All", *sorted(clusters.unique())],
+    format_func=lambda c: "All" if c == "All" else f"#{c} ({(clusters == c).sum()} names)",
 )
+one_per_group = st.sidebar.toggle("One chart per cluster", disabled=clusters.empty,
+                                  help="Keep only the strongest trend among names that move together")
+
+def refresh_intraday():
+    """Fetch the minutes after each ticker's last bar and update only the affected angles."""
+    app_state = get_app_state(*state_key)
+    if not app_state['lock'].acquire(blocking=False):
+        return []  # another session is already refreshing the shared state
+    try:
+        return _refresh_intraday(app_state)
+    finally:
+        app_state['lock'].release()
+
+def intraday_batches(app_state):
+    """``(tickers, frames)`` batches from the yfinance poll, or the ticked tickers' bars from the ring."""
+    if not use_ticks:
+        yield from ohlcv_store().refresh(tickers, "1m", "1d")
+        return
+    ring = tick_stream().ring
+    ticked, app_state['tick_seq'] = ring.changed_since(app_state['tick_seq'])
+    universe = set(tickers)
+    ticked = [t for t in ticked if t in universe]
+    # Polled minutes before the stream started stay in front of the ticked ones
+    history = {t: app_state['data'].get(t) for t in ticked}
+    yield ticked, {t: splice(None if history[t] is None else history[t].tz_localize(IST), ring.frame(t))
+                   for t in ticked}
+
+def _refresh_intraday(app_state):
+    frames = dict(app_state['data'])  # views into the current panel
+    today = datetime.now(IST).date()  # fragment reruns outlive the script run that defined them
+    changed = []
+    for batch, fresh in intraday_batches(app_state):
+        for ticker in batch:
+            df = prepare_intraday_data(fresh.get(ticker), today)
+            if df is None:
+                continue
+            if app_state['data'].same_bars(ticker, df):
+                continue
+            old = app_state['data'].get(ticker)
+            frames[ticker] = df
+            if old is None or old.index[0] != df.index[0]:
+                app_state['streams'].reset(ticker, df)  # new ticker or new session
+            else:
+                app_state['streams'].update(ticker, df)
+            changed.append(ticker)
+    
+    if changed:
+        # Copy-on-refresh: build the new panel and results, then swap them in
+        streams = app_state['streams']
+        rows = pd.DataFrame.from_dict({t: streams.states[t].as_row() for t in changed}, orient='index')
+        trends = app_state['trends']
+        app_state['data'] = MarketPanel.from_frames(frames)
+        app_state['trends'] = rows if trends is None else pd.concat([trends.drop(changed, errors='ignore'), rows])
+        app_state['angles'] = {**app_state['angles'], **{t: streams.states[t].angle for t in changed}}
+        app_state['screener'] = build_screener(app_state['data'], app_state['angles'])
+        app_state['failed_tickers'] = [t for t in app_state['failed_tickers'] if t not in app_state['data']]
+    app_state['last_refresh'] = time.time()
+    panels().publish(LIVE_PANEL, app_state['data'], app_state['last_refresh'])
+    return changed
+
+if refresh_now:
+    refresh_intraday()
 
 # --- Enhanced Filter Implementation ---
 def apply_filter():
-    filtered = []
-    angles = st.session_state.app_state['angles']
-    
-    for ticker, df in st.session_state.app_state['data'].items():
-        angle = angles.get(ticker, 0.0)
-        
-        if filter_choice == "All Charts":
-            filtered.append((ticker, angle))
-        elif filter_choice == "Strong Uptrend (≈45°)" and 35 <= angle <= 55:
-            filtered.append((ticker, angle))
-        elif filter_choice == "Moderate Uptrend (15-45°)" and 15 <= angle < 35:
-            filtered.append((ticker, angle))
-        elif filter_choice == "Sideways (-15° to 15°)" and -15 < angle < 15:
-            filtered.append((ticker, angle))
-        elif filter_choice == "Moderate Downtrend (-15° to -45°)" and -35 < angle <= -15:
-            filtered.append((ticker, angle))
-        elif filter_choice == "Strong Downtrend (≈-45°)" and -55 <= angle <= -35:
-            filtered.append((ticker, angle))
-        elif filter_choice == "Very Steep (>60°)" and angle > 60:
-            filtered.append((ticker, angle))
-        elif filter_choice == "Very Steep (<-60°)" and angle < -60:
-            filtered.append((ticker, angle))
-    
+    screener = get_app_state(*state_key)['screener']
+    bucket = TREND_BUCKETS[filter_choice]
+    mask = None if bucket is None else screener.between("angle", *bucket)
     # Sort by absolute angle (strongest trends first)
-    return sorted(filtered, key=lambda x: abs(x[1]), reverse=True)
+    picks = screener.select(mask, by="angle", descending=True, key=np.abs)
+    if selected_cluster != "All":
+        picks = [t for t in picks if clusters.get(t) == selected_cluster]
+    if one_per_group:
+        picks = one_per_cluster(picks, clusters)
+    return picks
 
-filtered_tickers = apply_filter()
+# --- Display Charts ---
+charts = chart_cache()
 
-# --- Enhanced Visualization ---
-def plot_chart(ticker, df, angle):
-    fig, ax = plt.subplots(figsize=(8, 4.5))
-    
-    # Plot trend line
-    time_hours = (df.index - df.index[0]).total_seconds() / 3600
-    try:
-        slope, intercept, *_ = linregress(time_hours, df['Close'])
-        trend_line = slope * time_hours + intercept
-        ax.plot(df.index, trend_line, '--', color='orange', alpha=0.7, linewidth=2, label='Trend Line')
-    except:
-        pass
-    
-    # Plot price
-    color = 'green' if angle > 5 else 'red' if angle < -5 else 'gray'
-    ax.plot(df.index, df['Close'], color=color, linewidth=2.5, label='Price')
+def chart_spec(ticker):
+    # Redrawn only when the ticker received new or corrected bars
+    app_state = get_app_state(*state_key)
+    df = app_state['data'][ticker]
+    angle = app_state['angles'].get(ticker, 0.0)
+    trends = app_state['trends']
+    trend = trends.loc[ticker] if trends is not None and ticker in trends.index else None
+    return (ticker, fingerprint(df), "live"), lambda: live_chart(ticker, df, angle, trend)
+
+def chart_series(ticker):
+    app_state = get_app_state(*state_key)
+    angle = app_state['angles'].get(ticker, 0.0)
+    return f"{ticker} ({angle:.1f}°)", app_state['data'][ticker], trend_color(angle)
+
+def live_view():
+    app_state = get_app_state(*state_key)
+    if auto_refresh and time.time() - app_state['last_refresh'] >= refresh_every:
+        refresh_intraday()
     
-    # Annotate angle
-    ax.annotate(f"Angle: {angle:.1f}°", 
-               xy=(0.02, 0.95), xycoords='axes fraction',
-               bbox=dict(boxstyle='round', alpha=0.2))
+    filtered_tickers = apply_filter()
+    if not filtered_tickers:
+        st.warning("No charts match the selected filter")
+        return
     
-    # Dynamic title with emoji indicators
-    if angle >= 55: emoji = "🚀"
-    elif angle >= 35: emoji = "📈↑↑"
-    elif angle >= 15: emoji = "📈↑"
-    elif angle <= -55: emoji = "💥" 
-    elif angle <= -35: emoji = "📉↓↓"
-    elif angle <= -15: emoji = "📉↓"
-    else: emoji = "➡️"
+    updated = datetime.fromtimestamp(app_state['last_refresh'], IST).strftime("%H:%M:%S")
+    st.success(f"Displaying {len(filtered_tickers)} charts | Updated {updated} IST")
     
-    ax.set_title(
-        f"{emoji} {ticker} ({angle:.1f}°)",
-        fontsize=12,
-        pad=12,
-        color=color
+    paginated_grid(
+        filtered_tickers, chart_spec, key="live_grid",
+        sort_options={
+            "Strongest trend": None,
+            "Angle": app_state['screener'].column("angle").get,
+            "Symbol": lambda t: t,
+        },
+        series=chart_series, compact=compact_view, full=full_resolution,
     )
-    
-    # Axis formatting
-    ax.set_ylabel("Price", fontsize=10)
-    ax.xaxis.set_major_locator(MinuteLocator(byminute=[0, 30]))
-    ax.xaxis.set_major_formatter(DateFormatter("%H:%M"))
-    plt.xticks(rotation=45, ha='right', fontsize=9)
-    plt.grid(alpha=0.2)
-    plt.legend()
-    plt.tight_layout()
-    
-    return fig
 
-# --- Display Charts ---
-if not filtered_tickers:
-    st.warning("No charts match the selected filter")
-else:
-    st.success(f"Displaying {len(filtered_tickers)} charts")
-    
-    cols = st.columns(2)
-    for idx, (ticker, angle) in enumerate(filtered_tickers):
-        df = st.session_state.app_state['data'][ticker]
-        
-        with cols[idx % 2]:
-            try:
-                fig = plot_chart(ticker, df, angle)
-                st.pyplot(fig)
-                plt.close(fig)
-            except:
-                st.warning(f"Couldn't display chart for {ticker}")
+# Timed reruns are scoped to the chart grid; the rest of the page stays put
+st.fragment(run_every=refresh_every if auto_refresh else None)(live_view)()
+
+st.sidebar.caption(charts.summary())
+st.sidebar.caption(fetch_scheduler().summary())
+st.sidebar.caption(f"🧮 Live panel: {app_state['data'].describe()} (shared by all sessions)")
+diagnostics_sidebar()
 
 # --- Debug Information ---
 if st.sidebar.checkbox("Show angle distribution"):
-    angles = list(st.session_state.app_state['angles'].values())
-    fig, ax = plt.subplots(figsize=(8, 4))
+    angles = list(app_state['angles'].values())
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
     ax.hist(angles, bins=30, color='skyblue', edgecolor='black')
     ax.set_title("Angle Distribution Across All Tickers", pad=15)
     ax.set_xlabel("Angle (degrees)", labelpad=10)
@@ -261,17 +298,17 @@ if st.sidebar.checkbox("Show angle distribution"):
     ax.grid(alpha=0.2)
     ax.legend()
     st.pyplot(fig)
-    plt.close(fig)
 
 # --- Refresh Mechanism ---
 st.sidebar.markdown("---")
 if st.sidebar.button("🔄 Full Reset", help="Clear all cached data and reload", type="primary"):
     st.cache_data.clear()
+    get_app_state.clear()
     st.session_state.clear()
     st.rerun()
 
 # --- Failure Reporting ---
-if st.session_state.app_state['failed_tickers']:
+if app_state['failed_tickers']:
     with st.sidebar.expander("⚠️ Failed Tickers"):
-        st.write(f"{len(st.session_state.app_state['failed_tickers'])} tickers failed to load:")
-        st.code("\n".join(st.session_state.app_state['failed_tickers']))
+        st.write(f"{len(app_state['failed_tickers'])} tickers failed to load:")
+        st.code("\n".join(app_state['failed_tickers']))
@@ -0,0 +1,101 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+
+from core.charts import chart_cache, figure_png
+from core.correlation import LOOKBACK, N_CLUSTERS, correlation
+from core.instrument import diagnostics_sidebar
+from core.panel import panels
+from core.ranking import daily_panel
+from core.universe import TICKERS_FILE, universe
+
+# -------------------- Page Setup --------------------
+st.set_page_config(page_title="Correlation Clusters", layout="wide")
+st.title("🧬 Correlation Clusters (Nifty 500)")
+
+# -------------------- Data --------------------
+tickers = universe()
+if not tickers:
+    st.error(f"Ticker file not found: {TICKERS_FILE}")
+
+# Same shared 2y daily panel as the NSE500 Charts page
+data = daily_panel(tickers)
+if not data:
+    st.warning("No daily bars stored yet. Download them on the NSE500 Charts page first.")
+    st.stop()
+
+# -------------------- Sidebar --------------------
+st.sidebar.header("🧬 Clusters")
+lookback = st.sidebar.select_slider("Return window (trading days)", options=[60, 120, 250], value=LOOKBACK)
+n_clusters = st.sidebar.slider("Number of clusters", min_value=2, max_value=50, value=N_CLUSTERS)
+
+# Computed once per data date and lookback, then read from data/store/correlation/
+corr = correlation(data, lookback)
+if corr is None or len(corr.tickers) < 2:
+    st.warning(f"Not enough daily history for a {lookback}-day correlation.")
+    st.stop()
+clusters = corr.clusters(n_clusters)
+table = corr.cluster_table(n_clusters)
+
+selected = st.sidebar.selectbox(
+    "Zoom into cluster", options=["All", *table.index],
+    format_func=lambda c: "All" if c == "All" else f"#{c} ({table.loc[c, 'size']} names)",
+)
+
+st.markdown(f"**🧾 Tickers:** {len(corr.tickers)} &nbsp;&nbsp; **📅 Returns up to:** {corr.date} "
+            f"&nbsp;&nbsp; **🪟 Window:** {lookback} days")
+
+# -------------------- Heatmap --------------------
+def render_heatmap(matrix: np.ndarray, labels: list[str], boundaries: list[int], title: str) -> bytes:
+    from matplotlib.figure import Figure  # only when the heatmap is not cached
+
+    fig = Figure(figsize=(8, 7))
+    ax = fig.subplots()
+    image = ax.imshow(matrix, cmap="RdBu_r", vmin=-1, vmax=1, interpolation="nearest")
+    fig.colorbar(image, ax=ax, shrink=0.8, label="Correlation of daily returns")
+    if len(labels) <= 60:
+        ax.set_xticks(range(len(labels)), labels, rotation=90, fontsize=6)
+        ax.set_yticks(range(len(labels)), labels, fontsize=6)
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
+    for edge in boundaries:
+        ax.axhline(edge - 0.5, color="black", linewidth=0.4)
+        ax.axvline(edge - 0.5, color="black", linewidth=0.4)
+    ax.set_title(title, fontsize=11)
+    fig.tight_layout()
+    return figure_png(fig, dpi=120)
+
+# Dendrogram order, grouped by cluster, puts co-moving names in blocks
+order = sorted(corr.order(), key=clusters.get)
+if selected != "All":
+    order = [t for t in order if clusters[t] == selected]
+positions = [corr.tickers.index(t) for t in order]
+sizes = clusters[order].value_counts(sort=False).reindex(pd.unique(clusters[order]))
+boundaries = list(np.cumsum(sizes.to_numpy())[:-1])
+title = f"{len(order)} tickers, {len(sizes)} clusters" if selected == "All" else f"Cluster #{selected}"
+
+png = chart_cache().get_or_render(
+    ("heatmap", corr.date, corr.universe, lookback, n_clusters, selected),
+    lambda: render_heatmap(corr.matrix[np.ix_(positions, positions)],
+                           [t.removesuffix(".NS") for t in order], boundaries, title),
+)
+left, right = st.columns([3, 2])
+left.image(png, width="stretch")
+
+# -------------------- Cluster Table --------------------
+right.subheader("Clusters")
+right.dataframe(
+    table if selected == "All" else table.loc[[selected]],
+    width="stretch",
+    column_config={"mean_rho": st.column_config.NumberColumn("mean ρ", format="%.2f")},
+)
+if selected != "All":
+    members = corr.frame().loc[order, order]
+    pairs = members.where(np.triu(np.ones(members.shape, dtype=bool), k=1)).stack()
+    right.caption("Most correlated pairs")
+    right.dataframe(pairs.sort_values(ascending=False).head(20).rename("ρ"), width="stretch")
+
+st.sidebar.caption(chart_cache().summary())
+st.sidebar.caption(panels().summary())
+diagnostics_sidebar()
@@ -1,20 +1,26 @@
-import pandas as pd
+"""Write the tickers of an NSE top-20 list to a text file, one per line.
 
-df = pd.read_csv('T20-GL-gainers-allSec-25-Jun-2025.csv')
+    python prepare_tickers.py [--side gainers|loosers] [--date 07-Jul-2025] [--out PATH]
 
-# Strip whitespace from all column names
-df.columns = df.columns.str.strip()
+Defaults to the gainers of the latest T20-GL-* file in data/TOP-Gain-loosers.
+"""
+import argparse
 
-# Lowercase all column names
-df.columns = df.columns.str.lower()
+from core.ingest import SIDES, gainers_losers
 
-# Now extract symbols using lowercase 'symbol'
-symbols = df['symbol'].dropna().unique()
+parser = argparse.ArgumentParser()
+parser.add_argument("--side", choices=SIDES, default="gainers")
+parser.add_argument("--date", default=None, help="list date, e.g. 07-Jul-2025 (default: latest)")
+parser.add_argument("--out", default="data/Charts-data/tickers_gainers_20.txt")
+args = parser.parse_args()
 
-tickers_ns = [str(sym).strip() + '.NS' for sym in symbols]
+history = gainers_losers()
+tickers_ns = history.tickers(args.date, args.side)
+if not tickers_ns:
+    raise SystemExit(f"No {args.side} list found for {args.date or 'the latest date'}")
 
-with open('tickers_gainers_20.txt', 'w') as f:
+with open(args.out, 'w') as f:
     for ticker in tickers_ns:
         f.write(ticker + '\n')
 
-print(f"Saved {len(tickers_ns)} tickers to tickers_from_csv.txt")
+print(f"Saved {len(tickers_ns)} tickers to {args.out}")
@@ -0,0 +1,12 @@
+import pytest
+
+import core.store
+from core.scheduler import FetchScheduler
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    """A scheduler that gives up on the first failure instead of backing off for seconds."""
+    sched = FetchScheduler(retries=1, backoff=0.0)
+    monkeypatch.setattr(core.store, "fetch_scheduler", lambda: sched)
+    return sched
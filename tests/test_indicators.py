@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import numpy as np
+
+from core.fetch import IST, SyntheticSource
+from core.indicators import IndicatorSet, carry_indicators, universe_indicators
+from core.panel import MarketPanel
+
+TODAY = datetime(2026, 10, 16, 18, 0, tzinfo=IST)
+TICKERS = [f"SYN{i:02d}.NS" for i in range(20)]
+BARS = 300
+
+
+def daily(today=TODAY):
+    """A trailing window of daily frames, as ``daily_panel`` loads them; it slides as days pass."""
+    frames = SyntheticSource(today=today)(TICKERS, interval="1d")
+    frames = {t: df.tz_localize(None) if df.index.tz is not None else df for t, df in frames.items()}
+    return {t: df.iloc[-BARS:] for t, df in frames.items()}
+
+
+def test_refresh_extends_the_previous_indicators():
+    previous = MarketPanel.from_frames(daily())
+    assert carry_indicators(previous, previous) is None  # nothing computed yet, nothing to carry
+    universe_indicators(previous)
+
+    panel = MarketPanel.from_frames(daily(TODAY.replace(day=21)))
+    carried = carry_indicators(previous, panel)
+    assert carried is universe_indicators(panel)
+    assert universe_indicators(previous).values["ema"].shape[1] == BARS  # left as it was
+
+    fresh = IndicatorSet.from_panel(panel)
+    for name, values in fresh.values.items():
+        assert carried.values[name].shape == values.shape
+        # By the recent bars the dropped bars' warm-up (longest in Wilder's RSI) has faded out
+        np.testing.assert_allclose(carried.values[name][:, -50:], values[:, -50:], rtol=1e-5, equal_nan=True)
+    np.testing.assert_allclose(carried.latest(), fresh.latest(), rtol=1e-5, equal_nan=True)
+
+
+def test_changed_bars_are_recomputed():
+    previous = MarketPanel.from_frames(daily())
+    universe_indicators(previous)
+    frames = daily(TODAY.replace(day=21))
+    first = frames[TICKERS[0]]
+    first.iloc[-10, first.columns.get_loc("Close")] += 0.5
+    assert carry_indicators(previous, MarketPanel.from_frames(frames)) is None
+    assert carry_indicators(previous, MarketPanel.from_frames({t: frames[t] for t in TICKERS[1:]})) is None
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import numpy as np
+
+from core.fetch import IST, SyntheticSource
+from core.panel import MarketPanel
+
+TODAY = datetime(2026, 10, 16, 12, 0, tzinfo=IST)
+TICKERS = [f"SYN{i:02d}.NS" for i in range(20)]
+
+
+def intraday(today=TODAY):
+    """Prepared 1m frames as the live page keeps them, with some tickers missing minutes."""
+    frames = SyntheticSource(today=today)(TICKERS, interval="1m")
+    frames = {t: df.tz_convert(IST).tz_localize(None) for t, df in frames.items()}
+    for i, t in enumerate(TICKERS[::3]):
+        frames[t] = frames[t].drop(frames[t].index[5 + i::17])
+    return frames
+
+
+def test_unchanged_refresh_changes_nothing():
+    frames = intraday()
+    panel = MarketPanel.from_frames(frames)
+    assert np.isnan(panel.array).any()  # the shared index really has gaps
+    changed = [t for t, df in intraday().items() if not panel.same_bars(t, df)]
+    assert changed == []
+
+
+def test_new_or_corrected_bars_are_changed():
+    frames = intraday()
+    panel = MarketPanel.from_frames(frames)
+    later = intraday(TODAY.replace(minute=5))
+    assert all(not panel.same_bars(t, later[t]) for t in TICKERS)
+
+    corrected = frames[TICKERS[0]].copy()
+    corrected.iloc[-1, corrected.columns.get_loc("Close")] += 0.5
+    assert not panel.same_bars(TICKERS[0], corrected)
+    assert not panel.same_bars("MISSING.NS", frames[TICKERS[0]])
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+
+from core.fetch import IST, SyntheticSource
+from core.prefetch import warm
+from core.store import OHLCVStore
+
+TICKERS = [f"SYN{i:02d}.NS" for i in range(10)]
+YESTERDAY = datetime(2026, 10, 15, 16, 0, tzinfo=IST)
+TODAY = datetime(2026, 10, 16, 16, 0, tzinfo=IST)
+
+
+@pytest.fixture
+def store(tmp_path, scheduler):
+    store = OHLCVStore(str(tmp_path))
+    warm(store, TICKERS, "2026-10-15", source=SyntheticSource(today=YESTERDAY))
+    return store
+
+
+def failing(tickers, **kwargs):
+    raise ConnectionError("offline")
+
+
+def test_failed_warm_keeps_the_store_stale(store):
+    with pytest.raises(RuntimeError, match="10/10 daily downloads failed"):
+        warm(store, TICKERS, "2026-10-16", source=failing)
+    assert store.refreshed_on("1d") == "2026-10-15"
+    assert store.refreshed_on("W") == "2026-10-15"
+
+
+def test_warm_counts_only_advanced_tickers(store):
+    report = warm(store, TICKERS, "2026-10-16", source=SyntheticSource(today=TODAY))
+    assert report["daily"] == len(TICKERS)
+    assert store.refreshed_on("1d") == "2026-10-16"
+
+    report = warm(store, TICKERS, "2026-10-16", source=SyntheticSource(today=TODAY))
+    assert report["daily"] == 0  # nothing new, but nothing failed either
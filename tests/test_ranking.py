@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import core.ranking
+from core.fetch import IST, SyntheticSource
+from core.panel import MarketPanel, PanelRegistry
+from core.ranking import DAILY_PANEL, ranking
+
+TODAY = datetime(2026, 10, 16, 12, 0, tzinfo=IST)
+TICKERS = [f"SYN{i:02d}.NS" for i in range(10)]
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = PanelRegistry()
+    monkeypatch.setattr(core.ranking, "panels", lambda: registry)
+    return registry
+
+
+def daily(today):
+    frames = SyntheticSource(today=today)(TICKERS, interval="1d")
+    # Yesterday's close is the last bar before the session being ranked
+    return MarketPanel.from_frames({t: df[df.index < df.index[-1]] for t, df in frames.items()})
+
+
+def test_a_republished_daily_panel_is_ranked_again(registry):
+    intraday = MarketPanel.from_frames(SyntheticSource(today=TODAY)(TICKERS, interval="1m"))
+    registry.publish(DAILY_PANEL, daily(TODAY.replace(day=9)), "2026-10-15")
+    before = ranking(intraday)
+    assert ranking(intraday) is before  # computed once per daily publish
+
+    # Same version, same bar count and last date: e.g. corrected closes re-downloaded the same day
+    fresh = registry.publish(DAILY_PANEL, daily(TODAY), "2026-10-15")
+    after = ranking(intraday)
+    assert after is not before
+    assert np.allclose(after.columns["prev_close"], fresh.array[:, fresh.fields.index("Close"), -1])
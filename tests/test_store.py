@@ -0,0 +1,102 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.fetch import IST, SyntheticSource
+from core.store import RETENTION, OHLCVStore
+
+TICKERS = ["SYN01.NS", "SYN02.NS"]
+
+
+class Recording(SyntheticSource):
+    """Synthetic bars, remembering the arguments of every request."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = []
+
+    def __call__(self, tickers, **kwargs):
+        self.requests.append(kwargs)
+        return super().__call__(tickers, **kwargs)
+
+
+class Listing(Recording):
+    """Like ``Recording``, but ``NEW.NS`` only listed this year."""
+
+    def __call__(self, tickers, **kwargs):
+        frames = super().__call__(tickers, **kwargs)
+        if "NEW.NS" in frames:
+            frames["NEW.NS"] = frames["NEW.NS"].loc["2026-01-01":]
+        return frames
+
+
+def session(days_ago: int) -> datetime:
+    day = datetime.now(IST).date() - timedelta(days=days_ago)
+    return datetime.combine(day, datetime.min.time(), IST).replace(hour=12)
+
+
+def fill(store, days_ago: int) -> Recording:
+    source = Recording(today=session(days_ago))
+    for _ in store.refresh(TICKERS, "1m", "1d", source=source):
+        pass
+    return source
+
+
+@pytest.fixture
+def store(tmp_path, scheduler):
+    return OHLCVStore(str(tmp_path))
+
+
+def test_recent_1m_bars_are_fetched_incrementally(store):
+    fill(store, 2)
+    source = fill(store, 1)
+    assert [set(r) - {"interval"} for r in source.requests] == [{"start"}]
+
+
+def test_stale_1m_bars_are_fetched_by_period(store):
+    fill(store, 20)
+    source = fill(store, 0)
+    # An incremental start 20 days back is outside yfinance's 1m window
+    assert source.requests == [{"interval": "1m", "period": "1d"}]
+    assert store.last_timestamp(TICKERS[0], "1m").date() == session(0).date()
+
+
+def test_1m_history_is_trimmed(store):
+    for days_ago in (45, 40, 20, 0):
+        fill(store, days_ago)
+    df = store.read(TICKERS[0], "1m")
+    assert df.index[0] > df.index[-1] - RETENTION["1m"]
+    assert sorted(set(df.index.date)) == [session(20).date(), session(0).date()]
+
+
+def test_a_poll_rewrites_only_its_session(store):
+    fill(store, 1)
+    fill(store, 0)
+    yesterday = store.path(TICKERS[0], "1m", session(1).date().isoformat())
+    before = os.stat(yesterday).st_mtime_ns
+    fill(store, 0)
+    assert os.stat(yesterday).st_mtime_ns == before
+    assert store.sessions(TICKERS[0], "1m") == [session(1).date().isoformat(), session(0).date().isoformat()]
+
+
+def test_short_history_is_fetched_in_full_once(store):
+    tickers = TICKERS + ["NEW.NS"]
+    for _ in store.refresh(tickers, "1d", "5y", source=Listing(today=datetime(2026, 10, 15, 16, 0, tzinfo=IST))):
+        pass
+    source = Listing(today=datetime(2026, 10, 16, 16, 0, tzinfo=IST))
+    for _ in store.refresh(tickers, "1d", "5y", source=source):
+        pass
+    assert [set(r) - {"interval"} for r in source.requests] == [{"start"}]
+    assert store.last_timestamp("NEW.NS", "1d").date().isoformat() == "2026-10-16"
+
+
+def test_frame_cache_is_bounded_float32(tmp_path, scheduler):
+    store = OHLCVStore(str(tmp_path), cache_mb=0.01)
+    for days_ago in (3, 2, 1, 0):
+        fill(store, days_ago)
+    stats = store.frames.stats()
+    assert stats["evictions"] and stats["mb"] <= stats["budget_mb"]
+    assert (store.read(TICKERS[0], "1m").dtypes == "float32").all()
+    # The files keep full precision; only the cached copies are float32
+    assert (store._read_exact(TICKERS[0], "1m", session(0).date().isoformat()).dtypes == "float64").all()
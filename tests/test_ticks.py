@@ -0,0 +1,53 @@
+import socket
+import threading
+import time
+
+from core.ticks import SocketFeed, TickStream
+
+T0 = 1_790_000_000.0
+
+
+def wait_for(condition, seconds=5.0):
+    deadline = time.monotonic() + seconds
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_switching_feeds_starts_a_fresh_session(tmp_path):
+    old = tmp_path / "old.csv"
+    old.write_text("ticker,ts,price,volume\n" + "".join(f"OLD.NS,{T0 + 60 * i},100,1\n" for i in range(5)))
+    new = tmp_path / "new.csv"
+    new.write_text("ticker,ts,price,volume\nNEW.NS,{0},50,2\nNEW.NS,{1},51,3\n".format(T0 - 3600, T0 - 3540))
+
+    stream = TickStream()
+    stream.start(f"replay:{old}@0")
+    wait_for(lambda: stream.ring.ticks == 5)
+    _, seq = stream.ring.changed_since(0)
+
+    stream.start(f"replay:{new}@0")
+    wait_for(lambda: stream.ring.ticks == 2)
+    assert stream.ring.frame("OLD.NS") is None
+    assert stream.ring.late == 0  # the new feed's earlier minutes are not rejected as late
+    assert stream.ring.frame("NEW.NS")["Close"].tolist() == [50.0, 51.0]
+    assert stream.ring.changed_since(seq)[0] == ["NEW.NS"]
+
+
+def test_stop_unblocks_a_socket_reader():
+    server = socket.create_server(("127.0.0.1", 0))
+    accepted = []
+    threading.Thread(target=lambda: accepted.append(server.accept()[0]), daemon=True).start()
+
+    stream = TickStream()
+    stream.start(f"socket:127.0.0.1:{server.getsockname()[1]}")
+    wait_for(lambda: accepted)
+    accepted[0].sendall(f"ABC.NS,{T0},10,1\n".encode())
+    wait_for(lambda: stream.ring.ticks == 1)
+
+    feed, thread = stream._feed, stream._thread
+    stream.stop()  # the server stays silent, so the reader is blocked in a read
+    thread.join(timeout=2)
+    assert isinstance(feed, SocketFeed) and feed.closed
+    assert not thread.is_alive()
+    accepted[0].close()
+    server.close()
@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.trend import RunningTrend, StreamingTrends, calculate_angle, compute_trends, trend_line
+
+SESSION = os.path.join(os.path.dirname(__file__), "data", "intraday_1m.csv")
+
+
+def recorded() -> dict[str, pd.DataFrame]:
+    """One session of 1-minute bars per ticker, as the store holds them."""
+    bars = pd.read_csv(SESSION, index_col="Date", parse_dates=["Date"])
+    return {t: df.drop(columns="Ticker") for t, df in bars.groupby("Ticker")}
+
+
+def check(state: RunningTrend, df: pd.DataFrame) -> None:
+    """``state`` after the bars of ``df`` matches the reference and the batched fit."""
+    df = df.dropna(subset=["Close"])
+    assert state.angle == pytest.approx(calculate_angle(df), abs=1e-9)
+    batch = compute_trends({"T": df}).loc["T"]
+    assert state.slope == pytest.approx(batch["slope"], rel=1e-9, abs=1e-12)
+    assert state.n == batch["n"]
+    (t0, y0), (t1, y1) = state.endpoints()
+    line = trend_line(df, batch)
+    assert (t0, t1) == (df.index[0], df.index[-1])
+    assert (y0, y1) == pytest.approx((line[0], line[-1]), rel=1e-9)
+
+
+@pytest.mark.parametrize("ticker", sorted(recorded()))
+def test_streaming_matches_batch_bar_by_bar(ticker):
+    df = recorded()[ticker]
+    closes = df["Close"].dropna()
+    state = RunningTrend()
+    for i, (ts, close) in enumerate(closes.items(), start=1):
+        state.push(ts, close)
+        if i % 25 == 0 or i == len(closes):
+            check(state, df.loc[closes.index[:i]])
+
+
+@pytest.mark.parametrize("ticker", sorted(recorded()))
+def test_corrected_last_bar_is_replaced(ticker):
+    df = recorded()[ticker]
+    closes = df["Close"].dropna()
+    state = RunningTrend()
+    for ts, close in closes.items():
+        state.push(ts, close * 1.01)  # still forming ...
+        state.push(ts, close)         # ... then final
+    check(state, df)
+
+
+def test_replaced_bars_through_update():
+    streams, revised = StreamingTrends(), {}
+    for ticker, df in recorded().items():
+        streams.update(ticker, df.iloc[:-30])
+        # The refresh re-fetches the last stored minute with a revised close, plus the new ones
+        tail = df.iloc[-31:].copy()
+        tail.iloc[0, tail.columns.get_loc("Close")] += 0.35
+        streams.update(ticker, tail)
+        revised[ticker] = pd.concat([df.iloc[:-31], tail])
+        check(streams.states[ticker], revised[ticker])
+    # The whole universe at once, as the live page's first load computes it
+    batch = compute_trends({t: df.dropna(subset=["Close"]) for t, df in revised.items()})
+    stream = streams.frame().loc[batch.index]
+    assert np.allclose(stream["angle"], batch["angle"], rtol=1e-9, atol=1e-12)
+    assert np.allclose(stream["intercept"], batch["intercept"], rtol=1e-9)